@@ -1,5 +1,8 @@
 """Whisper transcription library — Single Source of Truth."""
 
+from .autotune import (
+    autotune as autotune,
+)
 from .core import (
     batch as batch,
 )
@@ -21,14 +24,37 @@
 from .dictionary import (
     dictionary_add as dictionary_add,
 )
+from .dictionary import (
+    dictionary_compact as dictionary_compact,
+)
 from .dictionary import (
     dictionary_list as dictionary_list,
 )
 from .dictionary import (
     load_dictionaries as load_dictionaries,
 )
+from .formats import load_wseg as load_wseg
 from .formats import to_srt as to_srt
 from .formats import to_vtt as to_vtt
+from .metrics import (
+    get_metrics as get_metrics,
+)
+from .search import (
+    rebuild_index as rebuild_search_index,
+)
+from .search import (
+    search as search,
+)
+from .segments import SegmentTable as SegmentTable
+from .storage import (
+    load_transcript_json as load_transcript_json,
+)
+from .storage import (
+    read_output as read_output,
+)
+from .tail import (
+    tail_transcribe as tail_transcribe,
+)
 from .vocabulary import (
     get_vocab_dirs as get_vocab_dirs,
 )
@@ -47,6 +73,7 @@
     "batch",
     "process_voice_memos",
     "get_local_status",
+    "autotune",
     "load_vocabulary",
     "vocabulary_list",
     "vocabulary_add",
@@ -56,6 +83,15 @@
     "apply_dictionary_to_result",
     "dictionary_list",
     "dictionary_add",
+    "dictionary_compact",
     "to_srt",
+    "load_wseg",
     "to_vtt",
+    "SegmentTable",
+    "search",
+    "rebuild_search_index",
+    "get_metrics",
+    "read_output",
+    "load_transcript_json",
+    "tail_transcribe",
 ]
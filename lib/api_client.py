@@ -0,0 +1,210 @@
+"""Shared OpenAI client and a rate-limited dispatcher for API-backend calls.
+
+One openai.OpenAI instance (one keep-alive connection pool) is shared by every
+call. The dispatcher caps in-flight requests, paces request starts with a token
+bucket, and retries 429/5xx/connection errors with backoff that honours the
+server's Retry-After (a 429 pauses every caller, not only the one that got it).
+
+  WHISPER_API_CONCURRENCY=4   (uploads in flight)
+  WHISPER_API_RPM=50          (request starts per minute; bucket holds CONCURRENCY)
+  WHISPER_API_MAX_RETRIES=5
+"""
+
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def _concurrency() -> int:
+    return max(1, int(os.environ.get("WHISPER_API_CONCURRENCY", "4")))
+
+
+def _rpm() -> float:
+    return float(os.environ.get("WHISPER_API_RPM", "50"))
+
+
+def _max_retries() -> int:
+    return int(os.environ.get("WHISPER_API_MAX_RETRIES", "5"))
+
+
+class TokenBucket:
+    """`rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token (possibly going negative) and return how long to wait for it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns seconds waited."""
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+def _status_of(exc: BaseException) -> int | None:
+    """HTTP status from openai.APIStatusError (.status_code) or urllib HTTPError (.code)."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def _headers_of(exc: BaseException):
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    return headers
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Server-requested delay in seconds (retry-after-ms or retry-after), if any."""
+    headers = _headers_of(exc)
+    if headers is None:
+        return None
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms is not None:
+            return float(ms) / 1000
+        s = headers.get("retry-after")
+        if s is not None:
+            return float(s)
+    except (TypeError, ValueError):
+        return None  # HTTP-date form; fall back to exponential backoff
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = _status_of(exc)
+    if status is not None:
+        return status in _RETRY_STATUS
+    # openai.APIConnectionError / APITimeoutError, or socket-level failures
+    name = type(exc).__name__
+    return name in ("APIConnectionError", "APITimeoutError") or isinstance(
+        exc, (ConnectionError, TimeoutError)
+    )
+
+
+class ApiDispatcher:
+    """Run API calls with bounded concurrency, token-bucket pacing and retries."""
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        rpm: float = 50.0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._slots = threading.Semaphore(concurrency)
+        self._bucket = TokenBucket(rpm / 60.0, max(1, concurrency), sleep=sleep)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "paced_seconds": 0.0}
+
+    def _wait_for_pause(self) -> None:
+        with self._lock:
+            delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            self._sleep(delay)
+
+    def _pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run fn() under the limits; retry it on 429/5xx/connection errors.
+
+        fn must be safe to call again (re-open upload files inside it).
+        """
+        with self._slots:
+            attempt = 0
+            while True:
+                self._wait_for_pause()
+                waited = self._bucket.acquire()
+                with self._lock:
+                    self.stats["calls"] += 1
+                    self.stats["paced_seconds"] += waited
+                try:
+                    return fn()
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    hinted = retry_after(e)
+                    delay = (
+                        hinted
+                        if hinted is not None
+                        else min(self.max_delay, self.base_delay * 2**attempt)
+                        * random.uniform(0.5, 1.0)
+                    )
+                    with self._lock:
+                        self.stats["retries"] += 1
+                        if _status_of(e) == 429:
+                            self.stats["throttled"] += 1
+                    if _status_of(e) == 429:
+                        self._pause(delay)  # the whole account is limited, not just this call
+                    else:
+                        self._sleep(delay)
+                    attempt += 1
+
+
+_client = None
+_client_key: tuple | None = None
+_dispatcher: ApiDispatcher | None = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """Shared openai.OpenAI client (rebuilt only if the key or base URL changes)."""
+    global _client, _client_key
+    import openai
+
+    api_key = os.environ.get("OPENAI_API_KEY", "")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not set and no local backend available")
+    key = (api_key, os.environ.get("OPENAI_BASE_URL", ""))
+    with _lock:
+        if _client is None or _client_key != key:
+            # Retries are the dispatcher's job, so they see Retry-After and pause everyone.
+            _client = openai.OpenAI(api_key=api_key, max_retries=0)
+            _client_key = key
+        return _client
+
+
+def get_dispatcher() -> ApiDispatcher:
+    global _dispatcher
+    with _lock:
+        if _dispatcher is None:
+            _dispatcher = ApiDispatcher(_concurrency(), _rpm(), _max_retries())
+        return _dispatcher
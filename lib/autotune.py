@@ -0,0 +1,212 @@
+"""Hardware autotuning for the faster-whisper backend.
+
+autotune() decodes a short sample under candidate (compute_type, cpu_threads,
+num_workers, beam_size) settings and persists the fastest one whose character
+error rate against a float32/beam-5 reference stays within tolerance.
+lib.core reads the profile back through load_profile() when it builds models.
+
+num_workers only helps concurrent transcribe() calls on one model, so trials
+run as many decodes at once as lib.core will put on one model: the
+WHISPER_LOCAL_WORKERS hybrid/batch workers share it in-process, while with
+WHISPER_ISOLATION=process each supervised worker owns a model and decodes one
+job at a time. rtf is wall time per second of audio across those decodes, so
+with one decode at a time it is the latency of a single job.
+
+  WHISPER_PROFILE_PATH=~/.cache/whisper-mcp/profile.json (env override)
+"""
+
+import json
+import os
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+
+_REFERENCE_BEAM_SIZE = 5
+
+_profile_cache: tuple[float, dict] | None = None
+
+
+def profile_path() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_PROFILE_PATH", str(Path.home() / ".cache" / "whisper-mcp" / "profile.json")
+        )
+    ).expanduser()
+
+
+def load_profile(model: str) -> dict | None:
+    """Return the tuned config for `model` on this host, or None.
+
+    The file is re-read only when its mtime changes.
+    """
+    global _profile_cache
+    p = profile_path()
+    try:
+        mtime = p.stat().st_mtime
+    except OSError:
+        return None
+    if _profile_cache is None or _profile_cache[0] != mtime:
+        try:
+            _profile_cache = (mtime, json.loads(p.read_text(encoding="utf-8")))
+        except (json.JSONDecodeError, OSError):
+            return None
+    profile = _profile_cache[1]
+    if profile.get("model") != model or profile.get("cpu_count") != os.cpu_count():
+        return None
+    return profile.get("config")
+
+
+def save_profile(profile: dict) -> Path:
+    p = profile_path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(profile, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return p
+
+
+def char_error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein distance over characters, normalised by reference length."""
+    ref = reference.replace(" ", "")
+    hyp = hypothesis.replace(" ", "")
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, rc in enumerate(ref, 1):
+        cur = [i]
+        for j, hc in enumerate(hyp, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (rc != hc)))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def select_best(trials: list[dict], tolerance: float) -> dict | None:
+    """Fastest trial (lowest rtf) whose cer is within tolerance."""
+    eligible = [t for t in trials if t.get("cer", 1.0) <= tolerance and "error" not in t]
+    return min(eligible, key=lambda t: t["rtf"]) if eligible else None
+
+
+def _concurrency() -> int:
+    """Decodes lib.core runs at once on one model."""
+    from .hybrid import local_workers
+    from .supervisor import isolation
+
+    return 1 if isolation() == "process" else local_workers()
+
+
+def _default_candidates() -> dict:
+    cpus = os.cpu_count() or 4
+    threads = sorted({max(1, cpus // 2), cpus, min(4, cpus)})
+    return {
+        "compute_type": ["int8", "int8_float32", "float32"],
+        "cpu_threads": threads,
+        "num_workers": sorted({1, _concurrency()}),
+        "beam_size": [1, 5],
+    }
+
+
+def _decode(model, audio, language: str, beam_size: int) -> str:
+    segments, _ = model.transcribe(audio, language=language, beam_size=beam_size)
+    return " ".join(s.text.strip() for s in segments)  # segments is lazy: decode happens here
+
+
+def _run_trial(
+    model, audio, language: str, beam_size: int, concurrency: int = 1
+) -> tuple[str, float]:
+    """Decode `audio` `concurrency` times at once; return (text, wall seconds)."""
+    t0 = time.perf_counter()
+    if concurrency <= 1:
+        text = _decode(model, audio, language, beam_size)
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            texts = list(
+                pool.map(lambda _: _decode(model, audio, language, beam_size), range(concurrency))
+            )
+        text = texts[0]
+    return text, time.perf_counter() - t0
+
+
+def autotune(
+    sample_path: str,
+    model: str = "",
+    language: str = "ja",
+    tolerance: float = 0.02,
+    sample_seconds: float = 60.0,
+    candidates: dict | None = None,
+    save: bool = True,
+) -> dict:
+    """Benchmark candidate faster-whisper settings and persist the fastest accurate one."""
+    try:
+        from faster_whisper import WhisperModel, decode_audio
+
+        from .core import _faster_model
+
+        model = model or _faster_model()
+        cand = {**_default_candidates(), **(candidates or {})}
+        audio = decode_audio(str(Path(sample_path).expanduser()))[: int(sample_seconds * 16000)]
+        audio_seconds = len(audio) / 16000
+        if not audio_seconds:
+            return {"status": "error", "message": f"Empty audio: {sample_path}"}
+
+        concurrency = _concurrency()
+        cpus = os.cpu_count() or 4
+        ref_model = WhisperModel(model, device="cpu", compute_type="float32", cpu_threads=cpus)
+        reference, _ = _run_trial(ref_model, audio, language, _REFERENCE_BEAM_SIZE)
+        del ref_model
+
+        trials = []
+        for compute_type, cpu_threads, num_workers in product(
+            cand["compute_type"], cand["cpu_threads"], cand["num_workers"]
+        ):
+            try:
+                m = WhisperModel(
+                    model,
+                    device="cpu",
+                    compute_type=compute_type,
+                    cpu_threads=cpu_threads,
+                    num_workers=num_workers,
+                )
+            except ValueError as e:  # compute_type unsupported on this CPU
+                trials.append({"config": {"compute_type": compute_type}, "error": str(e)})
+                continue
+            for beam_size in cand["beam_size"]:
+                text, wall = _run_trial(m, audio, language, beam_size, concurrency)
+                trials.append(
+                    {
+                        "config": {
+                            "compute_type": compute_type,
+                            "cpu_threads": cpu_threads,
+                            "num_workers": num_workers,
+                            "beam_size": beam_size,
+                        },
+                        "rtf": round(wall / (audio_seconds * concurrency), 4),
+                        "cer": round(char_error_rate(reference, text), 4),
+                    }
+                )
+            del m
+
+        best = select_best(trials, tolerance)
+        if best is None:
+            return {"status": "error", "message": "No candidate within tolerance", "trials": trials}
+
+        profile = {
+            "model": model,
+            "host": platform.node(),
+            "cpu_count": os.cpu_count(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "sample": str(sample_path),
+            "sample_seconds": round(audio_seconds, 1),
+            "tolerance": tolerance,
+            "concurrency": concurrency,
+            "config": best["config"],
+            "rtf": best["rtf"],
+            "cer": best["cer"],
+            "trials": trials,
+        }
+        result = {"status": "success", **profile}
+        if save:
+            result["profile_path"] = str(save_profile(profile))
+        return result
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,341 @@
+"""Warm worker for the openai-whisper CLI backend.
+
+The one-shot CLI path starts `whisper` for every file: torch import, model load
+and a JSON round trip through a temp dir. This keeps a single
+scripts/whisper_cli_worker.py process alive instead. It runs under the
+interpreter that owns the `whisper` CLI (read from the CLI's shebang, or
+WHISPER_CLI_PYTHON), keeps the model loaded, and returns segments over a
+JSON-lines stdin/stdout protocol.
+
+Jobs are serialized (one model). If the worker dies or stops answering it is
+killed, restarted and the job is retried once; a worker that cannot start at
+all makes the caller fall back to the one-shot CLI, and the next start is not
+attempted for WHISPER_CLI_WORKER_RETRY_SECONDS (jobs go straight to the CLI
+instead of each waiting out the start timeout). The process exits after
+WHISPER_CLI_WORKER_IDLE_SECONDS without jobs to give the memory back.
+
+While a worker is alive its float32 model is reserved in the memory governor
+(lib.governor), and jobs for a live worker are admitted without the model.
+
+  WHISPER_CLI_WORKER=1                    (0 = one CLI process per file)
+  WHISPER_CLI_PYTHON=                     (default: the whisper CLI's shebang)
+  WHISPER_CLI_WORKER_START_SECONDS=600    (model load)
+  WHISPER_CLI_WORKER_RETRY_SECONDS=600   (after a failed start)
+  WHISPER_CLI_WORKER_IDLE_SECONDS=600
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from .governor import get_governor, model_bytes
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "whisper_cli_worker.py"
+_JOB_TIMEOUT_SECONDS = 7200.0  # same as the one-shot CLI subprocess
+
+
+class CliWorkerError(RuntimeError):
+    """The worker died, hung or misbehaved. retry: a fresh worker may succeed."""
+
+    def __init__(self, message: str, retry: bool = False):
+        super().__init__(message)
+        self.retry = retry
+
+
+class CliWorkerStartError(CliWorkerError):
+    """The worker could not be started (the caller falls back to the one-shot CLI)."""
+
+
+class CliDecodeError(RuntimeError):
+    """The worker is fine but could not decode this file."""
+
+
+def worker_enabled() -> bool:
+    return os.environ.get("WHISPER_CLI_WORKER", "1") != "0"
+
+
+def _start_seconds() -> float:
+    return float(os.environ.get("WHISPER_CLI_WORKER_START_SECONDS", "600"))
+
+
+def _retry_seconds() -> float:
+    return float(os.environ.get("WHISPER_CLI_WORKER_RETRY_SECONDS", "600"))
+
+
+def _idle_seconds() -> float:
+    return float(os.environ.get("WHISPER_CLI_WORKER_IDLE_SECONDS", "600"))
+
+
+def cli_python() -> str | None:
+    """Interpreter of the whisper CLI install: WHISPER_CLI_PYTHON, else its shebang."""
+    configured = os.environ.get("WHISPER_CLI_PYTHON", "")
+    if configured:
+        return configured
+    cli = shutil.which("whisper") or "/usr/local/bin/whisper"
+    try:
+        with open(cli, "rb") as f:
+            first = f.readline().decode("utf-8", "replace").strip()
+    except OSError:
+        return None
+    if not first.startswith("#!"):
+        return None
+    parts = first[2:].split()
+    if parts and Path(parts[0]).name == "env" and len(parts) > 1:
+        return shutil.which(parts[1])
+    return parts[0] if parts else None
+
+
+class CliWorker:
+    """One long-lived worker process; transcribe() is safe to call from any thread."""
+
+    def __init__(self, cmd: list[str], start_seconds: float | None = None, resident_bytes: int = 0):
+        self.cmd = cmd
+        self.start_seconds = start_seconds if start_seconds is not None else _start_seconds()
+        self.resident_bytes = resident_bytes
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        self._stderr: deque[str] = deque(maxlen=20)
+        self._next_id = 0
+        self.starts = 0
+        self.restarts = 0
+        self.jobs = 0
+        self.last_used = time.monotonic()
+        self.ready: dict = {}
+        self._reservation = ""
+        self._start_error = ""
+        self._failed_at: float | None = None
+
+    @staticmethod
+    def _reader(proc: subprocess.Popen, lines: queue.Queue) -> None:
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)  # EOF: the process is gone
+
+    @staticmethod
+    def _drain(proc: subprocess.Popen, tail: deque) -> None:
+        for line in proc.stderr:
+            tail.append(line.rstrip())
+
+    def _stderr_tail(self) -> str:
+        return " | ".join(list(self._stderr)[-5:])
+
+    def _start(self) -> None:
+        if self._failed_at is not None and time.monotonic() - self._failed_at < _retry_seconds():
+            raise CliWorkerStartError(f"CLI worker start failed recently: {self._start_error}")
+        try:
+            self._spawn()
+        except CliWorkerStartError as e:
+            self._kill()
+            self._failed_at = time.monotonic()
+            self._start_error = str(e)
+            raise
+        self._failed_at = None
+        self._start_error = ""
+        if self.resident_bytes:
+            self._reservation = f"cli worker {self._proc.pid}"
+            get_governor().reserve(self._reservation, self.resident_bytes)
+
+    def _spawn(self) -> None:
+        self._lines = queue.Queue()
+        self._stderr.clear()
+        try:
+            self._proc = subprocess.Popen(
+                self.cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+        except OSError as e:
+            raise CliWorkerStartError(f"cannot start CLI worker: {e}") from e
+        threading.Thread(target=self._reader, args=(self._proc, self._lines), daemon=True).start()
+        threading.Thread(target=self._drain, args=(self._proc, self._stderr), daemon=True).start()
+        self.starts += 1
+        try:
+            ready = self._read(self.start_seconds)
+        except CliWorkerError as e:
+            raise CliWorkerStartError(str(e)) from e
+        if not ready.get("ready"):
+            self._kill()
+            raise CliWorkerStartError(f"CLI worker did not start: {ready}")
+        self.ready = ready
+
+    def _read(self, timeout: float) -> dict:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self._kill()
+            raise CliWorkerError(f"CLI worker gave no answer within {timeout:.0f}s") from None
+        if line is None:
+            code = self._proc.wait() if self._proc else None
+            self._proc = None
+            self._release()
+            time.sleep(0.05)  # let the stderr reader catch the last lines
+            raise CliWorkerError(
+                f"CLI worker exited (code {code}): {self._stderr_tail()}", retry=True
+            )
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            self._kill()
+            raise CliWorkerError(
+                f"CLI worker sent malformed output: {line[:200]!r}", retry=True
+            ) from e
+
+    def _kill(self) -> None:
+        if self._proc is not None:
+            with contextlib.suppress(OSError):
+                self._proc.kill()
+            with contextlib.suppress(subprocess.TimeoutExpired):
+                self._proc.wait(5)
+            self._proc = None
+        self._release()
+
+    def _release(self) -> None:
+        if self._reservation:
+            get_governor().release(self._reservation)
+            self._reservation = ""
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _request(self, request: dict, timeout: float) -> dict:
+        if not self._alive():
+            self._start()
+        try:
+            self._proc.stdin.write(json.dumps(request, ensure_ascii=False) + "\n")
+            self._proc.stdin.flush()
+        except (OSError, ValueError) as e:
+            self._kill()
+            raise CliWorkerError(f"CLI worker pipe closed: {e}", retry=True) from e
+        while True:
+            reply = self._read(timeout)
+            if reply.get("id") == request["id"]:
+                return reply
+
+    def transcribe(
+        self, audio_path: str | Path, language: str, prompt: str, timeout: float = 0
+    ) -> dict:
+        """{"text", "segments", "language"} for one file.
+
+        A worker that dies mid-job is restarted and the job retried once; a hung
+        job (timeout) is not retried. Decode errors reported by the worker (bad
+        file, ...) raise CliDecodeError. CliWorkerStartError means no worker could
+        be started at all.
+        """
+        with self._lock:
+            self._next_id += 1
+            request = {
+                "id": self._next_id,
+                "audio": str(audio_path),
+                "language": language or None,
+                "initial_prompt": prompt or None,
+            }
+            try:
+                reply = self._request(request, timeout or _JOB_TIMEOUT_SECONDS)
+            except CliWorkerError as e:
+                if not e.retry:
+                    raise
+                self._kill()
+                self.restarts += 1
+                reply = self._request(request, timeout or _JOB_TIMEOUT_SECONDS)
+            self.jobs += 1
+            self.last_used = time.monotonic()
+        if not reply.get("ok"):
+            raise CliDecodeError(f"whisper CLI worker failed: {reply.get('error')}")
+        return reply
+
+    def stop_if_idle(self, idle_seconds: float) -> bool:
+        with self._lock:
+            if self._alive() and time.monotonic() - self.last_used >= idle_seconds:
+                with contextlib.suppress(OSError):
+                    self._proc.stdin.close()
+                self._kill()
+                return True
+        return False
+
+    def stop(self) -> None:
+        with self._lock:
+            self._kill()
+
+    def status(self) -> dict:
+        return {
+            "running": self._alive(),
+            "pid": self._proc.pid if self._alive() else None,
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "jobs": self.jobs,
+            "load_seconds": self.ready.get("load_seconds"),
+            "start_error": self._start_error or None,
+        }
+
+
+_workers: dict[tuple[str, str], CliWorker] = {}
+_workers_lock = threading.Lock()
+_reaper: threading.Thread | None = None
+
+
+def _reap() -> None:
+    while True:
+        idle = _idle_seconds()
+        time.sleep(max(1.0, min(60.0, idle / 4)))
+        with _workers_lock:
+            workers = list(_workers.values())
+        for w in workers:
+            w.stop_if_idle(idle)
+
+
+def get_cli_worker(model: str) -> CliWorker:
+    """The shared worker for `model` (started on its first job)."""
+    global _reaper
+    python = cli_python()
+    if not python:
+        raise CliWorkerStartError("cannot find the whisper CLI's Python (set WHISPER_CLI_PYTHON)")
+    key = (python, model)
+    with _workers_lock:
+        worker = _workers.get(key)
+        if worker is None:
+            worker = _workers[key] = CliWorker(
+                [python, str(_SCRIPT), "--model", model],
+                resident_bytes=model_bytes(model, "float32"),
+            )
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap, daemon=True)
+            _reaper.start()
+    return worker
+
+
+def cli_worker_warm(model: str) -> bool:
+    """Whether a live worker already holds `model` (its next job needs no model load)."""
+    python = cli_python()
+    with _workers_lock:
+        worker = _workers.get((python, model)) if python else None
+    return worker is not None and worker._alive()
+
+
+def cli_worker_status() -> dict:
+    with _workers_lock:
+        return {
+            "enabled": worker_enabled(),
+            "workers": {f"{m} ({p})": w.status() for (p, m), w in _workers.items()},
+        }
+
+
+def _stop_all() -> None:
+    with _workers_lock:
+        for w in _workers.values():
+            w.stop()
+
+
+atexit.register(_stop_all)
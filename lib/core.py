@@ -6,6 +6,17 @@
   WHISPER_BACKEND=api              — OpenAI API only
   WHISPER_LOCAL_MODEL=large-v3-turbo (default, env override)
   WHISPER_FASTER_MODEL=large-v3-turbo (faster-whisper model, env override)
+  WHISPER_DECODE_MODE=sequential   (faster-whisper: "sequential" | "batched")
+  WHISPER_BATCH_SIZE=8             (batched mode: windows decoded per batch)
+  WHISPER_PROFILE_PATH=...         (autotuned faster-whisper settings, see lib.autotune)
+  WHISPER_LOOP_GUARD=1             (faster-whisper: abort + re-decode repetition loops)
+  WHISPER_CASCADE=1                (faster-whisper: draft with WHISPER_CASCADE_MODEL=small,
+                                    re-decode low-confidence windows with the main model)
+  WHISPER_MEMORY_BUDGET_MB=4096    (local decodes wait while estimated RSS exceeds this,
+                                    see lib.governor)
+  WHISPER_SCHEDULE=shortest        (batch/voice-memo order, see lib.scheduler)
+  WHISPER_CIRCUIT_FAILURES=3       (local_first: consecutive local failures before routing
+                                    straight to the API, see lib.routing)
 
 Local backend detection priority:
   1. faster-whisper (CTranslate2, CPU 70x RT, recommended)
@@ -14,17 +25,59 @@
   → fallback: OpenAI API
 """
 
+import contextlib
 import importlib
 import json
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-
+from typing import Any
+
+from .api_client import get_client as get_api_client
+from .api_client import get_dispatcher as get_api_dispatcher
+from .autotune import load_profile
+from .cli_worker import (
+    CliDecodeError,
+    CliWorkerStartError,
+    cli_worker_status,
+    cli_worker_warm,
+    get_cli_worker,
+)
+from .cli_worker import worker_enabled as cli_worker_enabled
 from .dictionary import apply_dictionary_to_result, load_dictionaries
-from .formats import to_srt, to_vtt
+from .fingerprint import (
+    copy_rank,
+    dedup_enabled,
+    find_duplicates,
+    link_duplicate,
+    record_transcript,
+    transcript_for,
+)
+from .formats import write_wseg
+from .governor import estimate_job_bytes, get_governor, model_bytes
+from .guard import LoopGuard
+from .hybrid import local_workers as hybrid_local_workers
+from .hybrid import plan_split, run_split
+from .hybrid import price_per_minute as api_price_per_minute
+from .language import lookup_language, probe_audio_seconds, probe_language
+from .metrics import SECONDS_BUCKETS, get_metrics
+from .packing import pack_enabled, pack_max_seconds, transcribe_packed
+from .routing import OPEN, get_breaker, routing_status
+from .scheduler import backend_key, duration_of, plan_jobs, record_rtf, rtf_for
+from .search import index_enabled as search_index_enabled
+from .search import index_transcript
+from .segments import SegmentTable
+from .snapshot import snapshot
+from .storage import compression, glob_outputs, output_exists, write_output
+from .supervisor import WorkerFailure, get_supervisor, isolation, job_timeout, supervisor_status
+from .upload import estimated_upload_bytes, prepared_upload
 from .vocabulary import get_vocab_dirs, load_vocabulary
 
 _IS_DOCKER = os.environ.get("MCP_TRANSPORT") == "sse"
@@ -40,6 +93,9 @@ class _WhisperResult:
     text: str
     segments: list = field(default_factory=list)
     language: str = "ja"
+    duration: float = 0.0
+    decode_mode: str = ""
+    stats: dict = field(default_factory=dict)
 
 
 # ── Local backend detection ──────────────────────────────────────────────
@@ -92,6 +148,14 @@ def _faster_model() -> str:
     return os.environ.get("WHISPER_FASTER_MODEL", "large-v3-turbo")
 
 
+def _decode_mode() -> str:
+    return os.environ.get("WHISPER_DECODE_MODE", "sequential")
+
+
+def _batch_size() -> int:
+    return int(os.environ.get("WHISPER_BATCH_SIZE", "8"))
+
+
 def _resolve_effective_backend(backend: str) -> str:
     """Return effective backend: "local_first" | "local" | "api"."""
     if backend == "auto":
@@ -99,41 +163,345 @@ def _resolve_effective_backend(backend: str) -> str:
     return backend  # "local" | "api"
 
 
+def _expected_backend_key(backend: str = "auto") -> str:
+    """Backend/model key transcribe() will most likely report (for RTF-based ETAs)."""
+    lb = _get_local_backend()
+    effective = _resolve_effective_backend(backend)
+    if effective == "api" or lb is None:
+        return "api"
+    if effective == "local_first" and get_breaker("local").state == OPEN:
+        return "api"
+    model = _faster_model() if lb == "faster_whisper" else _local_model()
+    return f"local:{lb}:{model}"
+
+
 # ── Local transcription ──────────────────────────────────────────────────
 
-_faster_whisper_model_cache = None
+_faster_whisper_models: dict[tuple, object] = {}
+_batched_pipeline_cache: tuple | None = None
+_model_lock = threading.Lock()
 
 
-def _transcribe_faster_whisper(audio_path: Path, language: str, prompt: str) -> _WhisperResult:
-    """Transcribe using faster-whisper (CTranslate2). CPU: ~70x RT, GPU: ~200x RT."""
+def _faster_whisper_settings(model_name: str) -> dict:
+    """Model/decode settings: autotuned profile if present, else static defaults."""
+    settings = {
+        "compute_type": "int8" if _IS_DOCKER else "auto",
+        "cpu_threads": 0,
+        "num_workers": 1,
+        "beam_size": 5,
+    }
+    settings.update(load_profile(model_name) or {})
+    return settings
+
+
+def _get_faster_whisper_model(model_name: str = ""):
+    """Return a cached WhisperModel, keyed by name and tuned load settings."""
     from faster_whisper import WhisperModel
 
-    global _faster_whisper_model_cache
-    if _faster_whisper_model_cache is None:
-        compute_type = "int8" if _IS_DOCKER else "auto"
-        _faster_whisper_model_cache = WhisperModel(
-            _faster_model(), device="cpu", compute_type=compute_type
+    model_name = model_name or _faster_model()
+    s = _faster_whisper_settings(model_name)
+    key = (model_name, s["compute_type"], s["cpu_threads"], s["num_workers"])
+    with _model_lock:  # concurrent jobs must not load the same weights twice
+        hit = key in _faster_whisper_models
+        get_metrics().inc(
+            "whisper_cache_requests_total", cache="model", result="hit" if hit else "miss"
         )
+        if not hit:
+            _faster_whisper_models[key] = WhisperModel(
+                model_name,
+                device="cpu",
+                compute_type=s["compute_type"],
+                cpu_threads=s["cpu_threads"],
+                num_workers=s["num_workers"],
+            )
+        return _faster_whisper_models[key]
+
 
-    kwargs: dict = {"language": language, "beam_size": 5}
+def _get_batched_pipeline():
+    """Return a cached BatchedInferencePipeline, or None if faster-whisper is too old."""
+    global _batched_pipeline_cache
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        return None
+    model = _get_faster_whisper_model()
+    if _batched_pipeline_cache is None or _batched_pipeline_cache[0] is not model:
+        _batched_pipeline_cache = (model, BatchedInferencePipeline(model=model))
+    return _batched_pipeline_cache[1]
+
+
+def _segment_dict(seg) -> dict:
+    """faster-whisper Segment → plain dict, keeping the per-segment confidence fields."""
+    return {
+        "start": seg.start,
+        "end": seg.end,
+        "text": seg.text.strip(),
+        "avg_logprob": seg.avg_logprob,
+        "compression_ratio": seg.compression_ratio,
+        "no_speech_prob": seg.no_speech_prob,
+    }
+
+
+def _faster_whisper_segments(
+    audio, language: str, prompt: str, model_name: str = "", beam_size: int = 0, **extra
+) -> tuple[list[dict], object, dict]:
+    """Sequential faster-whisper decode of a path or 16kHz array.
+
+    Returns (segments, info, loop_guard_stats). Full-file decodes run under the
+    loop guard (WHISPER_LOOP_GUARD=0 disables it); clipped decodes do not.
+    """
+    model_name = model_name or _faster_model()
+    kwargs: dict = {
+        "language": language or None,
+        "beam_size": beam_size or _faster_whisper_settings(model_name)["beam_size"],
+        **extra,
+    }
     if prompt:
         kwargs["initial_prompt"] = prompt
+    model = _get_faster_whisper_model(model_name)
+    segments_raw, info = model.transcribe(audio, **kwargs)
+    if "clip_timestamps" in extra or not _loop_guard_enabled():
+        return [_segment_dict(seg) for seg in segments_raw], info, {}
+    segments, stats = _guarded_decode(model, audio, kwargs, segments_raw, info.duration)
+    return segments, info, stats
+
+
+# ── Hallucination-loop guard ─────────────────────────────────────────────
 
-    segments_raw, info = _faster_whisper_model_cache.transcribe(str(audio_path), **kwargs)
-    segments_list = []
-    texts = []
-    for seg in segments_raw:
-        segments_list.append({
-            "start": seg.start,
-            "end": seg.end,
-            "text": seg.text.strip(),
-        })
-        texts.append(seg.text.strip())
+# Settings the CLI path already uses against loops, plus Whisper's compression check.
+_SAFE_DECODE = {
+    "condition_on_previous_text": False,
+    "no_speech_threshold": 0.6,
+    "compression_ratio_threshold": 2.4,
+}
+_GUARD_WINDOW_SECONDS = 30.0
+_GUARD_MAX_ABORTS = 3
+
+
+def _loop_guard_enabled() -> bool:
+    return os.environ.get("WHISPER_LOOP_GUARD", "1") != "0"
+
+
+def _guarded_decode(
+    model, audio, kwargs: dict, segments_raw, duration: float
+) -> tuple[list[dict], dict]:
+    """Consume a segment generator under LoopGuard.
+
+    On a detected loop the pass is abandoned, the 30s window from the loop start
+    is re-decoded with _SAFE_DECODE, and normal decoding resumes after it. After
+    _GUARD_MAX_ABORTS the rest of the file is decoded with _SAFE_DECODE unguarded.
+    wasted_seconds_saved extrapolates the abandoned pass's decode rate over the
+    audio it had not reached yet.
+    """
+    segments: list[dict] = []
+    stats: dict = {
+        "aborts": 0,
+        "redecoded_windows": [],
+        "dropped_segments": 0,
+        "wasted_seconds_saved": 0.0,
+    }
+    guard: LoopGuard | None = LoopGuard()
+    pass_wall, pass_audio = time.perf_counter(), 0.0
+
+    while True:
+        loop_start = None
+        for raw in segments_raw:
+            seg = _segment_dict(raw)
+            segments.append(seg)
+            if guard is not None:
+                loop_start = guard.check(seg)
+                if loop_start is not None:
+                    break
+        if loop_start is None:
+            break
+
+        segments_raw.close()
+        reached = segments[-1]["end"]
+        if reached > pass_audio:
+            rate = (time.perf_counter() - pass_wall) / (reached - pass_audio)
+            stats["wasted_seconds_saved"] += rate * max(0.0, duration - reached)
+        kept = [seg for seg in segments if seg["start"] < loop_start]
+        stats["dropped_segments"] += len(segments) - len(kept)
+        segments = kept
+        stats["aborts"] += 1
+
+        window_end = min(loop_start + _GUARD_WINDOW_SECONDS, duration)
+        stats["redecoded_windows"].append([round(loop_start, 2), round(window_end, 2)])
+        redo, _ = model.transcribe(
+            audio, **{**kwargs, **_SAFE_DECODE, "clip_timestamps": [loop_start, window_end]}
+        )
+        for raw in redo:
+            seg = _segment_dict(raw)
+            if seg["compression_ratio"] > _SAFE_DECODE["compression_ratio_threshold"]:
+                stats["dropped_segments"] += 1
+            else:
+                segments.append(seg)
+        if window_end >= duration:
+            break
+
+        resume = dict(kwargs)
+        guard = LoopGuard()
+        if stats["aborts"] >= _GUARD_MAX_ABORTS:
+            resume.update(_SAFE_DECODE)
+            guard = None
+        segments_raw, _ = model.transcribe(audio, **{**resume, "clip_timestamps": [window_end]})
+        pass_wall, pass_audio = time.perf_counter(), window_end
+
+    stats["wasted_seconds_saved"] = round(stats["wasted_seconds_saved"], 2)
+    return segments, stats
+
+
+def _transcribe_faster_whisper(
+    audio_path: Path,
+    language: str,
+    prompt: str,
+    decode_mode: str = "sequential",
+    batch_size: int = 8,
+) -> _WhisperResult:
+    """Transcribe using faster-whisper (CTranslate2). CPU: ~70x RT, GPU: ~200x RT.
+
+    decode_mode="batched" decodes VAD-split windows in batches of batch_size via
+    BatchedInferencePipeline (faster-whisper >= 1.1). Older installs fall back to
+    sequential decoding; the mode actually used is recorded on the result.
+    beam_size comes from the autotune profile when one exists (default 5).
+    """
+    used_mode = "sequential"
+    guard_stats: dict = {}
+    pipeline = _get_batched_pipeline() if decode_mode == "batched" else None
+    if pipeline is not None:
+        kwargs: dict = {
+            "language": language or None,
+            "beam_size": _faster_whisper_settings(_faster_model())["beam_size"],
+        }
+        if prompt:
+            kwargs["initial_prompt"] = prompt
+        segments_raw, info = pipeline.transcribe(str(audio_path), batch_size=batch_size, **kwargs)
+        segments_list = [_segment_dict(seg) for seg in segments_raw]
+        used_mode = f"batched:{batch_size}"
+    else:
+        if decode_mode == "batched":
+            used_mode = "sequential (batched unavailable)"
+        segments_list, info, guard_stats = _faster_whisper_segments(
+            str(audio_path), language, prompt
+        )
 
     return _WhisperResult(
-        text=" ".join(texts),
+        text=" ".join(seg["text"] for seg in segments_list),
         segments=segments_list,
         language=info.language,
+        duration=getattr(info, "duration", 0.0),
+        decode_mode=used_mode,
+        stats={"loop_guard": guard_stats} if guard_stats.get("aborts") else {},
+    )
+
+
+# ── Confidence cascade (2-pass) ──────────────────────────────────────────
+
+# A draft segment is re-decoded by the large model when any threshold trips.
+_CASCADE_THRESHOLDS = {"avg_logprob": -0.6, "compression_ratio": 2.2, "no_speech_prob": 0.6}
+
+
+def _cascade_enabled() -> bool:
+    return os.environ.get("WHISPER_CASCADE", "0") == "1"
+
+
+def _cascade_model() -> str:
+    return os.environ.get("WHISPER_CASCADE_MODEL", "small")
+
+
+def _needs_escalation(seg: dict, thresholds: dict) -> bool:
+    return (
+        seg.get("avg_logprob", 0.0) < thresholds["avg_logprob"]
+        or seg.get("compression_ratio", 0.0) > thresholds["compression_ratio"]
+        or seg.get("no_speech_prob", 0.0) > thresholds["no_speech_prob"]
+    )
+
+
+def _escalation_windows(
+    segments: list[dict], thresholds: dict, merge_gap: float = 1.0
+) -> list[tuple[float, float]]:
+    """Time windows covering low-confidence segments; neighbours closer than merge_gap merge."""
+    windows: list[tuple[float, float]] = []
+    for seg in segments:
+        if not _needs_escalation(seg, thresholds):
+            continue
+        if windows and seg["start"] - windows[-1][1] <= merge_gap:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], seg["end"]))
+        else:
+            windows.append((seg["start"], seg["end"]))
+    return windows
+
+
+def _in_windows(seg: dict, windows: list[tuple[float, float]]) -> bool:
+    mid = (seg["start"] + seg["end"]) / 2
+    return any(s <= mid <= e for s, e in windows)
+
+
+def _splice_segments(
+    draft: list[dict], refined: list[dict], windows: list[tuple[float, float]]
+) -> list[dict]:
+    """Replace draft segments inside the windows with the refined ones (by midpoint)."""
+    kept = [seg for seg in draft if not _in_windows(seg, windows)]
+    added = [seg for seg in refined if _in_windows(seg, windows)]
+    return sorted(kept + added, key=lambda seg: seg["start"])
+
+
+def _transcribe_cascade(audio_path: Path, language: str, prompt: str) -> _WhisperResult:
+    """Two-tier faster-whisper decode.
+
+    WHISPER_CASCADE_MODEL (default "small") drafts everything greedily; only the
+    windows whose segments fall below _CASCADE_THRESHOLDS are re-decoded by the
+    main model (via clip_timestamps) and spliced back in. Setting the cascade
+    model to the main model gives a greedy-then-beam cascade on a single model.
+    """
+    from faster_whisper import decode_audio
+
+    audio = decode_audio(str(audio_path))
+    duration = len(audio) / 16000
+
+    t0 = time.perf_counter()
+    draft, info, guard_stats = _faster_whisper_segments(
+        audio, language, prompt, model_name=_cascade_model(), beam_size=1
+    )
+    draft_seconds = time.perf_counter() - t0
+
+    windows = _escalation_windows(draft, _CASCADE_THRESHOLDS)
+    refined: list[dict] = []
+    refine_seconds = 0.0
+    if windows:
+        t1 = time.perf_counter()
+        refined, _, _ = _faster_whisper_segments(
+            audio, language, prompt, clip_timestamps=[t for w in windows for t in w]
+        )
+        refine_seconds = time.perf_counter() - t1
+
+    segments = _splice_segments(draft, refined, windows)
+    escalated = sum(e - s for s, e in windows)
+    stats: dict = {
+        "draft_model": _cascade_model(),
+        "refine_model": _faster_model(),
+        "segments_escalated": sum(1 for seg in draft if _in_windows(seg, windows)),
+        "segments_total": len(draft),
+        "escalated_fraction": round(escalated / duration, 4) if duration else 0.0,
+        "draft_seconds": round(draft_seconds, 2),
+        "refine_seconds": round(refine_seconds, 2),
+        "time_saved_seconds": None,
+    }
+    if escalated:
+        # Extrapolate a full main-model pass from the measured refine rate.
+        full_estimate = refine_seconds / escalated * duration
+        stats["time_saved_seconds"] = round(full_estimate - draft_seconds - refine_seconds, 2)
+
+    result_stats: dict = {"cascade": stats}
+    if guard_stats.get("aborts"):
+        result_stats["loop_guard"] = guard_stats
+    return _WhisperResult(
+        text=" ".join(seg["text"] for seg in segments),
+        segments=segments,
+        language=info.language,
+        duration=duration,
+        decode_mode="cascade",
+        stats=result_stats,
     )
 
 
@@ -142,7 +510,7 @@ def _transcribe_local_python(audio_path: Path, language: str, prompt: str) -> _W
     import whisper as _whisper_pkg
 
     model = _whisper_pkg.load_model(_local_model())
-    kwargs: dict = {"language": language, "verbose": False}
+    kwargs: dict = {"language": language or None, "verbose": False}
     if prompt:
         kwargs["initial_prompt"] = prompt
     result = model.transcribe(str(audio_path), **kwargs)
@@ -154,9 +522,26 @@ def _transcribe_local_python(audio_path: Path, language: str, prompt: str) -> _W
 
 
 def _transcribe_local_cli(audio_path: Path, language: str, prompt: str) -> _WhisperResult:
-    """Transcribe using openai-whisper CLI subprocess (Python 3.10 install)."""
-    cli = shutil.which("whisper") or "/usr/local/bin/whisper"
+    """Transcribe using openai-whisper CLI subprocess (Python 3.10 install).
+
+    Goes to the warm worker (lib.cli_worker) when enabled; one CLI process per
+    file when it is disabled or cannot be started.
+    """
     model = _local_model()
+    if cli_worker_enabled():
+        try:
+            reply = get_cli_worker(model).transcribe(audio_path, language, prompt)
+        except CliWorkerStartError:
+            pass
+        else:
+            return _WhisperResult(
+                text=reply["text"],
+                segments=reply["segments"],
+                language=reply.get("language") or language,
+                stats={"cli_worker": {"decode_seconds": reply.get("seconds")}},
+            )
+
+    cli = shutil.which("whisper") or "/usr/local/bin/whisper"
 
     with tempfile.TemporaryDirectory() as tmp_dir:
         cmd = [
@@ -164,8 +549,6 @@ def _transcribe_local_cli(audio_path: Path, language: str, prompt: str) -> _Whis
             str(audio_path),
             "--model",
             model,
-            "--language",
-            language,
             "--output_dir",
             tmp_dir,
             "--output_format",
@@ -177,6 +560,8 @@ def _transcribe_local_cli(audio_path: Path, language: str, prompt: str) -> _Whis
             "--no_speech_threshold",
             "0.6",  # suppress silence hallucinations
         ]
+        if language:
+            cmd += ["--language", language]
         if prompt:
             cmd += ["--initial_prompt", prompt]
 
@@ -197,50 +582,164 @@ def _transcribe_local_cli(audio_path: Path, language: str, prompt: str) -> _Whis
     )
 
 
-def _transcribe_local(audio_path: Path, language: str, prompt: str) -> _WhisperResult:
-    """Transcribe using the best available local backend."""
+def _transcribe_local(
+    audio_path: Path,
+    language: str,
+    prompt: str,
+    decode_mode: str = "sequential",
+    batch_size: int = 8,
+    cascade: bool = False,
+) -> _WhisperResult:
+    """Transcribe using the best available local backend.
+
+    decode_mode/batch_size/cascade only apply to faster-whisper; other backends ignore them.
+    """
     lb = _get_local_backend()
+    if lb is None:
+        raise RuntimeError(
+            "No local Whisper backend found. Install faster-whisper: pip install faster-whisper"
+        )
+    args = (lb, audio_path, language, prompt, decode_mode, batch_size, cascade)
+    return _run_local_job(
+        lb, _decode_local, args, duration_of(audio_path), audio_path.name, audio_path, cascade
+    )
+
+
+def _run_local_job(
+    lb: str,
+    fn: Callable,
+    args: tuple,
+    duration: float | None,
+    label: str,
+    path: Path | None = None,
+    cascade: bool = False,
+):
+    """fn(*args) admitted by the memory governor: in a supervised worker with
+    WHISPER_ISOLATION=process (lib.supervisor), else in this process.
+
+    Supervised jobs are estimated against the models the worker they get has
+    loaded (_worker_report); those are already reserved in the governor by the
+    supervisor, and the worker's cache metrics are folded into ours.
+    """
+    governor = get_governor()
+    if lb == "cli" or isolation() != "process":
+        key, estimate = _local_job_estimate(lb, duration, cascade)
+        # The CLI decodes in a child process: our RSS says nothing.
+        with governor.admit(key, estimate, label, measure=lb != "cli"):
+            return fn(*args)
+
+    def _admit(loaded: list | None):
+        key, estimate = _local_job_estimate(lb, duration, cascade, loaded=loaded or [])
+        return governor.admit(key, estimate, label, measure=False)
+
+    supervisor = get_supervisor(_warm_local_model, _worker_report)
+    return supervisor.run(fn, args, path=path or "", timeout=job_timeout(duration), admit=_admit)
+
+
+def _decode_local(
+    lb: str,
+    audio_path: Path,
+    language: str,
+    prompt: str,
+    decode_mode: str,
+    batch_size: int,
+    cascade: bool,
+) -> _WhisperResult:
+    """One local decode; runs in-process or in a supervised worker (lib.supervisor)."""
     if lb == "faster_whisper":
-        return _transcribe_faster_whisper(audio_path, language, prompt)
+        if cascade:
+            return _transcribe_cascade(audio_path, language, prompt)
+        return _transcribe_faster_whisper(audio_path, language, prompt, decode_mode, batch_size)
     elif lb == "openai_whisper":
         return _transcribe_local_python(audio_path, language, prompt)
-    elif lb == "cli":
-        return _transcribe_local_cli(audio_path, language, prompt)
-    raise RuntimeError(
-        "No local Whisper backend found. Install faster-whisper: pip install faster-whisper"
-    )
+    return _transcribe_local_cli(audio_path, language, prompt)
 
 
-# ── OpenAI API transcription ─────────────────────────────────────────────
+def _warm_local_model() -> None:
+    """Load the model in a freshly started worker before its first job."""
+    if _get_local_backend() == "faster_whisper":
+        _get_faster_whisper_model()
+
+
+def _loaded_models() -> list[tuple[str, str]]:
+    """(model, compute_type) of every faster-whisper model loaded in this process."""
+    return sorted({(k[0], k[1]) for k in _faster_whisper_models})
 
 
-def _get_api_client():
-    import openai
+def _worker_report() -> tuple[list[tuple[str, str]], int]:
+    """Run in a supervised worker after each job: its loaded models and their resident
+    bytes (openai-whisper loads its weights per call and keeps nothing)."""
+    loaded = _loaded_models()
+    return loaded, sum(model_bytes(m, ct) for m, ct in loaded)
 
-    api_key = os.environ.get("OPENAI_API_KEY", "")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not set and no local backend available")
-    return openai.OpenAI(api_key=api_key)
+
+def _local_job_estimate(
+    lb: str, duration: float | None, cascade: bool = False, loaded: list | None = None
+) -> tuple[str, int]:
+    """(governor key, estimated peak RSS bytes) for one local decode of `duration` seconds.
+
+    loaded: the (model, compute_type) pairs the decoding process already holds
+    (a supervised worker's report); None means this process's model cache. The
+    CLI's model counts as loaded while its warm worker is alive (lib.cli_worker
+    reserves it).
+    """
+    if lb == "cli":
+        model = _local_model()
+        resident = cli_worker_enabled() and cli_worker_warm(model)
+        warmth = "warm" if resident else "cold"
+        return f"cli:{model}:{warmth}", estimate_job_bytes(model, "float32", duration, resident)
+    if lb != "faster_whisper":
+        # openai-whisper loads float32 weights for every call.
+        model = _local_model()
+        return f"{lb}:{model}", estimate_job_bytes(model, "float32", duration, False)
+    model = _faster_model()
+    s = _faster_whisper_settings(model)
+    loaded = _loaded_models() if loaded is None else [tuple(m) for m in loaded]
+    resident = (model, s["compute_type"]) in loaded
+    estimate = estimate_job_bytes(model, s["compute_type"], duration, resident)
+    if cascade:
+        draft = _cascade_model()
+        if not any(m == draft for m, _ in loaded):
+            estimate += model_bytes(draft, s["compute_type"])
+    warmth = "warm" if resident else "cold"
+    return f"faster_whisper:{model}:{s['compute_type']}:{warmth}", estimate
+
+
+# ── OpenAI API transcription ─────────────────────────────────────────────
 
 
 def _transcribe_api(audio_path: Path, language: str, prompt: str) -> _WhisperResult:
-    """Transcribe using OpenAI Whisper API (cloud, 25MB limit)."""
-    client = _get_api_client()
-    with open(audio_path, "rb") as f:
-        kwargs: dict = {
-            "model": "whisper-1",
-            "file": f,
-            "language": language,
-            "response_format": "verbose_json",
-        }
-        if prompt:
-            kwargs["prompt"] = prompt
-        result = client.audio.transcriptions.create(**kwargs)
+    """Transcribe using OpenAI Whisper API (cloud, 25MB limit).
 
+    Uses the shared client and goes through the rate-limited dispatcher (lib.api_client).
+    The upload is the compact audio-only copy from lib.upload when that is smaller.
+    """
+    client = get_api_client()
+    with prepared_upload(audio_path) as prepared:  # held: concurrent prunes skip it
+        upload_path = prepared["path"]
+
+        def _upload():
+            with open(upload_path, "rb") as f:  # reopened per attempt so retries resend the file
+                kwargs: dict = {
+                    "model": "whisper-1",
+                    "file": f,
+                    "response_format": "verbose_json",
+                }
+                if language:
+                    kwargs["language"] = language
+                if prompt:
+                    kwargs["prompt"] = prompt
+                return client.audio.transcriptions.create(**kwargs)
+
+        t0 = time.perf_counter()
+        result = get_api_dispatcher().call(_upload)
+    upload = {k: v for k, v in prepared.items() if k != "path"}
+    upload["request_seconds"] = round(time.perf_counter() - t0, 3)
     return _WhisperResult(
         text=result.text,
         segments=getattr(result, "segments", []),
         language=getattr(result, "language", language),
+        stats={"upload": upload},
     )
 
 
@@ -248,35 +747,25 @@ def _transcribe_api(audio_path: Path, language: str, prompt: str) -> _WhisperRes
 
 
 def _write_outputs(result: _WhisperResult, stem: str, out_dir: Path, formats: list) -> dict:
-    """Write transcription result to output files. Returns {format: path}."""
-    output_files = {}
-
-    if "txt" in formats:
-        p = out_dir / f"{stem}.txt"
-        p.write_text(result.text, encoding="utf-8")
-        output_files["txt"] = str(p)
-
-    if "json" in formats:
-        p = out_dir / f"{stem}.json"
-        p.write_text(
-            json.dumps(
-                {"text": result.text, "segments": result.segments, "language": result.language},
-                ensure_ascii=False,
-                indent=2,
-            ),
-            encoding="utf-8",
-        )
-        output_files["json"] = str(p)
+    """Write transcription result to output files. Returns {format: path}.
 
-    if "srt" in formats:
-        p = out_dir / f"{stem}.srt"
-        p.write_text(to_srt(result.segments), encoding="utf-8")
-        output_files["srt"] = str(p)
+    Segments are converted to a SegmentTable once and every format is rendered
+    from it in a single pass. "wseg" writes the binary sidecar (lib.formats.load_wseg).
+    With WHISPER_OUTPUT_COMPRESSION, configured formats get a .gz/.zst suffix (lib.storage).
+    """
+    table = SegmentTable.from_segments(result.segments)
+    rendered = table.emit(formats, result.text, result.language)
+    output_files = {}
+    codec = compression()
+    for fmt in ("txt", "json", "srt", "vtt"):
+        if fmt in rendered:
+            p = write_output(out_dir / f"{stem}.{fmt}", rendered[fmt], fmt, codec)
+            output_files[fmt] = str(p)
 
-    if "vtt" in formats:
-        p = out_dir / f"{stem}.vtt"
-        p.write_text(to_vtt(result.segments), encoding="utf-8")
-        output_files["vtt"] = str(p)
+    if "wseg" in formats:
+        p = out_dir / f"{stem}.wseg"
+        write_wseg(p, table, result.text, result.language)
+        output_files["wseg"] = str(p)
 
     return output_files
 
@@ -288,33 +777,87 @@ def get_local_status() -> dict:
     """Return local backend availability info for status tools."""
     lb = _get_local_backend()
     model = _faster_model() if lb == "faster_whisper" else _local_model()
-    cached = []
-    # Check openai-whisper cache
     cache_dir = Path.home() / ".cache" / "whisper"
-    if cache_dir.exists():
-        cached = [f.stem for f in sorted(cache_dir.glob("*.pt"))]
-    # Check faster-whisper cache (huggingface hub)
     fw_cache = Path.home() / ".cache" / "huggingface" / "hub"
-    fw_cached = []
-    if fw_cache.exists():
-        fw_cached = [d.name for d in fw_cache.iterdir()
-                     if d.is_dir() and "whisper" in d.name.lower()]
+    cached, fw_cached = snapshot(
+        "model_caches",
+        lambda: [cache_dir, fw_cache],
+        lambda: _list_model_caches(cache_dir, fw_cache),
+    )
     return {
         "local_backend": lb or "none",
         "local_model": model,
-        "local_model_cached": (
-            bool(fw_cached) if lb == "faster_whisper"
-            else (model in cached or f"{model}.pt" in [f.name for f in cache_dir.glob("*.pt")]
-                  if cache_dir.exists() else False)
-        ),
+        "local_model_cached": bool(fw_cached) if lb == "faster_whisper" else model in cached,
         "cached_models": cached + fw_cached,
+        "tuning_profile": load_profile(model) if lb == "faster_whisper" else None,
+        "memory": get_governor().snapshot(),
+        "routing": routing_status(),
+        "api_dispatcher": {
+            "concurrency": get_api_dispatcher().concurrency,
+            **get_api_dispatcher().stats,
+        },
+        "supervisor": supervisor_status(),
+        "cli_worker": cli_worker_status() if lb == "cli" else None,
         "is_docker": _IS_DOCKER,
     }
 
 
+def _list_model_caches(cache_dir: Path, fw_cache: Path) -> tuple[list[str], list[str]]:
+    """(openai-whisper *.pt model names, faster-whisper HF hub repos)."""
+    cached = [f.stem for f in sorted(cache_dir.glob("*.pt"))] if cache_dir.exists() else []
+    fw_cached = []
+    if fw_cache.exists():
+        fw_cached = [d.name for d in fw_cache.iterdir()
+                     if d.is_dir() and "whisper" in d.name.lower()]
+    return cached, fw_cached
+
+
 # ── Main transcribe() ────────────────────────────────────────────────────
 
 
+def _finish(
+    result: _WhisperResult,
+    apath: Path,
+    out_dir: Path,
+    formats: list,
+    extra_vocab_dirs: list[Path] | None,
+    language: str,
+    prompt: str,
+    used_backend: str,
+) -> dict:
+    """Apply dictionary post-processing, write outputs, update the search index and
+    build the success response."""
+    replacements = load_dictionaries(extra_vocab_dirs, language)
+    if replacements:
+        apply_dictionary_to_result(result, replacements)
+
+    stem = apath.stem
+    if stem.endswith(".compressed"):
+        stem = stem[: -len(".compressed")]
+
+    output_files = _write_outputs(result, stem, out_dir, formats)
+    if "json" in output_files and search_index_enabled():
+        # The index is a cache; whisper_search_rebuild catches up after failures.
+        with contextlib.suppress(Exception):
+            index_transcript(output_files["json"])
+    preview = result.text[:300] + "..." if len(result.text) > 300 else result.text
+
+    response = {
+        "status": "success",
+        "audio_file": str(apath),
+        "output_dir": str(out_dir),
+        "output_files": output_files,
+        "language": language,
+        "vocabulary_used": bool(prompt),
+        "backend": used_backend,
+        "text_preview": preview,
+    }
+    if result.decode_mode:
+        response["decode_mode"] = result.decode_mode
+    response.update(result.stats)
+    return response
+
+
 def transcribe(
     audio_path: str,
     output_dir: str = "",
@@ -324,6 +867,10 @@ def transcribe(
     output_formats: str = "txt,srt,vtt,json",
     extra_vocab_dirs: list[Path] | None = None,
     backend: str = "auto",
+    decode_mode: str = "",
+    batch_size: int = 0,
+    cascade: bool | None = None,
+    vocabulary_namespaces: list[str] | None = None,
 ) -> dict:
     """Transcribe an audio file.
 
@@ -332,14 +879,24 @@ def transcribe(
         output_dir: Output directory (default: audio_path's parent/transcripts/)
         vocabulary_path: Vocabulary file for improved recognition
         vocabulary_prompt: Pre-built prompt string (overrides vocabulary_path)
-        language: Language code (default: ja)
-        output_formats: Comma-separated: txt, srt, vtt, json (default: all)
+        language: Language code (default: ja). "auto" probes a few short windows
+            (lib.language, cached per directory) and picks the language before decoding
+        output_formats: Comma-separated: txt, srt, vtt, json, wseg
+            (default: txt,srt,vtt,json — wseg is the binary sidecar for fast reload)
         extra_vocab_dirs: Additional vocabulary directories to search
         backend: "auto" | "local" | "api"
             "auto"  — local-first on Mac, API in Docker (default)
             "local" — local model only (no API call, no 25MB limit)
             "api"   — OpenAI API only
+        decode_mode: "sequential" | "batched" (faster-whisper only,
+            default: WHISPER_DECODE_MODE or "sequential")
+        batch_size: Windows per batch in batched mode (default: WHISPER_BATCH_SIZE or 8)
+        cascade: Small-model draft + main-model re-decode of low-confidence segments
+            (faster-whisper only, default: WHISPER_CASCADE=1)
+        vocabulary_namespaces: Project namespaces whose {namespace}_vocabulary.txt
+            terms are added to the prompt (e.g. ["general", "uranairo"])
     """
+    used_backend = ""
     try:
         apath = Path(audio_path).expanduser()
         if not apath.exists():
@@ -348,113 +905,305 @@ def transcribe(
         out_dir = Path(output_dir).expanduser() if output_dir else apath.parent / "transcripts"
         out_dir.mkdir(parents=True, exist_ok=True)
 
-        prompt = vocabulary_prompt
-        if not prompt and vocabulary_path:
-            prompt = load_vocabulary(vocabulary_path)
-
         formats = [f.strip() for f in output_formats.split(",") if f.strip()]
+        compression()  # a bad WHISPER_OUTPUT_COMPRESSION fails here, not after the decode
         effective = _resolve_effective_backend(backend)
 
+        language_probe = None
+        if language == "auto":
+            language, language_probe = _resolve_auto_language(apath, effective)
+
+        prompt = vocabulary_prompt
+        if not prompt and (vocabulary_path or vocabulary_namespaces):
+            prompt = load_vocabulary(
+                _language_vocabulary(vocabulary_path, language) if vocabulary_path else "",
+                vocabulary_namespaces,
+                extra_vocab_dirs,
+            )
+
+        mode = decode_mode or _decode_mode()
+        bsize = batch_size or _batch_size()
+        use_cascade = _cascade_enabled() if cascade is None else cascade
+
         result: _WhisperResult
-        used_backend: str
 
+        def _local() -> _WhisperResult:
+            return _tracked(
+                "local",
+                _transcribe_local,
+                apath,
+                language,
+                prompt,
+                mode,
+                bsize,
+                use_cascade,
+                record=effective == "local_first",
+            )
+
+        def _api() -> _WhisperResult:
+            return _tracked("api", _transcribe_api, apath, language, prompt)
+
+        t0 = time.monotonic()
         if effective == "local_first":
-            try:
-                result = _transcribe_local(apath, language, prompt)
-                lb = _get_local_backend()
-                model = _faster_model() if lb == "faster_whisper" else _local_model()
-                used_backend = f"local:{lb}:{model}"
-            except Exception as e:
-                result = _transcribe_api(apath, language, prompt)
-                used_backend = f"api (local failed: {e})"
+            if get_breaker("local").allow():
+                try:
+                    result = _local()
+                    used_backend = _local_backend_label()
+                except Exception as e:
+                    get_metrics().inc("whisper_errors_total", stage="local_fallback")
+                    result = _api()
+                    used_backend = f"api (local failed: {e})"
+            else:
+                result = _api()
+                used_backend = "api (local circuit open)"
         elif effective == "local":
-            result = _transcribe_local(apath, language, prompt)
-            lb = _get_local_backend()
-            model = _faster_model() if lb == "faster_whisper" else _local_model()
-            used_backend = f"local:{lb}:{model}"
+            result = _local()
+            used_backend = _local_backend_label()
         else:  # "api"
-            result = _transcribe_api(apath, language, prompt)
+            result = _api()
             used_backend = "api"
+        wall = time.monotonic() - t0
+        audio_seconds = duration_of(apath) or result.duration or None
+        record_rtf(backend_key(used_backend), audio_seconds, wall)
+        _record_job_metrics(backend_key(used_backend), audio_seconds, wall)
+
+        response = _finish(
+            result,
+            apath,
+            out_dir,
+            formats,
+            extra_vocab_dirs,
+            language or result.language,
+            prompt,
+            used_backend,
+        )
+        if language_probe is not None:
+            response["language_probe"] = language_probe
+        response["timing"] = {
+            "audio_seconds": round(audio_seconds, 1) if audio_seconds else None,
+            "wall_seconds": round(wall, 2),
+            "rtf": round(wall / audio_seconds, 4) if audio_seconds else None,
+        }
+        return response
+    except Exception as e:
+        key = backend_key(used_backend) if used_backend else _expected_backend_key(backend)
+        get_metrics().inc("whisper_jobs_total", backend=key, status="error")
+        get_metrics().inc("whisper_errors_total", stage="transcribe")
+        response = {"status": "error", "message": str(e)}
+        if isinstance(e, WorkerFailure):
+            response["failure"] = e.info
+        return response
+
+
+def _record_job_metrics(key: str, audio_seconds: float | None, wall: float) -> None:
+    m = get_metrics()
+    m.inc("whisper_jobs_total", backend=key, status="success")
+    m.observe("whisper_job_seconds", wall, SECONDS_BUCKETS, backend=key)
+    if audio_seconds:
+        m.inc("whisper_audio_seconds_total", audio_seconds, backend=key)
+        m.observe("whisper_rtf", wall / audio_seconds, backend=key)
+
+
+def _resolve_auto_language(apath: Path, effective: str) -> tuple[str, dict]:
+    """language="auto" → (language code, probe report).
+
+    Probing needs faster-whisper; without it (or if the probe fails) the code is
+    "" and the backend detects the language during the full decode. Under
+    local_first the probe goes through the local circuit breaker like a decode:
+    it is skipped while the circuit is open, and its outcome is recorded.
+    """
+    if effective == "api" or _get_local_backend() != "faster_whisper":
+        return "", {"method": "backend"}
+    try:
+        probe = lookup_language(apath)
+        if probe is None:
+            if effective == "local_first" and not get_breaker("local").allow():
+                return "", {"method": "backend", "probe_skipped": "local circuit open"}
+            probe = _tracked(
+                "local",
+                _run_local_job,
+                "faster_whisper",
+                _probe_language_local,
+                (apath, duration_of(apath)),
+                probe_audio_seconds(),
+                f"language probe: {apath.name}",
+                apath,
+                record=effective == "local_first",
+            )
+    except Exception as e:
+        return "", {"method": "backend", "probe_error": str(e)}
+    return probe["language"], {"method": "probe", **probe}
 
-        # Post-processing: apply dictionary corrections
-        replacements = load_dictionaries(extra_vocab_dirs)
-        if replacements:
-            apply_dictionary_to_result(result, replacements)
 
-        stem = apath.stem
-        if stem.endswith(".compressed"):
-            stem = stem[: -len(".compressed")]
+def _probe_language_local(apath: Path, duration: float | None) -> dict:
+    """Uncached language probe with the local model (in-process or in a supervised worker)."""
+    return probe_language(apath, _get_faster_whisper_model(), duration, use_cache=False)
 
-        output_files = _write_outputs(result, stem, out_dir, formats)
-        preview = result.text[:300] + "..." if len(result.text) > 300 else result.text
 
-        return {
-            "status": "success",
-            "audio_file": str(apath),
-            "output_dir": str(out_dir),
-            "output_files": output_files,
-            "language": language,
-            "vocabulary_used": bool(prompt),
-            "backend": used_backend,
-            "text_preview": preview,
-        }
+def _language_vocabulary(vocabulary_path: str, language: str) -> str:
+    """foo.txt → foo.<language>.txt when that variant exists."""
+    p = Path(vocabulary_path).expanduser()
+    if language:
+        variant = p.with_name(f"{p.stem}.{language}{p.suffix}")
+        if variant.exists():
+            return str(variant)
+    return vocabulary_path
+
+
+# Failures that are about the input, not the backend (corrupt or unsupported container, ...).
+_INPUT_ERRORS = (ValueError, FileNotFoundError, IsADirectoryError, CliDecodeError)
+
+
+def _is_backend_failure(e: Exception) -> bool:
+    """Does this failure say the backend is unhealthy (vs. a problem with one file)?"""
+    if isinstance(e, WorkerFailure):
+        return e.reason != "quarantined"
+    if isinstance(e, _INPUT_ERRORS):
+        return False
+    status = getattr(e, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500  # a 4xx rejects this upload, not the service
+    return True
+
+
+def _tracked(name: str, fn: Callable[..., Any], *args, record: bool = True) -> Any:
+    """Call a backend and record the outcome on its circuit breaker (lib.routing).
+
+    record=False (the breaker was not consulted) leaves the breaker alone.
+    """
+    if not record:
+        return fn(*args)
+    breaker = get_breaker(name)
+    try:
+        result = fn(*args)
     except Exception as e:
-        return {"status": "error", "message": str(e)}
+        if _is_backend_failure(e):
+            breaker.record_failure(e)
+        else:
+            breaker.release()
+        raise
+    breaker.record_success()
+    return result
+
+
+def _local_backend_label() -> str:
+    lb = _get_local_backend()
+    model = _faster_model() if lb == "faster_whisper" else _local_model()
+    return f"local:{lb}:{model}"
 
 
 # ── Batch / process_voice_memos ──────────────────────────────────────────
 
 
+def _has_transcript(transcripts_dir: Path, stem: str = "") -> bool:
+    """A .txt output (plain or compressed) or a duplicate pointer (lib.fingerprint) for
+    `stem`, or for any file when stem is empty. The .live.txt of a tail run still in
+    progress (lib.tail) does not count."""
+    if not transcripts_dir.exists():
+        return False
+    if stem:
+        return (
+            output_exists(transcripts_dir / f"{stem}.txt")
+            or (transcripts_dir / f"{stem}.duplicate.json").exists()
+        )
+    return any(
+        not p.name.endswith(".live.txt") for p in glob_outputs(transcripts_dir, "*.txt")
+    ) or any(transcripts_dir.glob("*.duplicate.json"))
+
+
+def _find_unprocessed_meetings(base: Path) -> list[dict]:
+    """Meeting dirs (base/YYYYMM/meeting/) with audio but no transcripts/*.txt yet."""
+    unprocessed = []
+    for month_dir in sorted(base.iterdir()):
+        if not month_dir.is_dir():
+            continue
+        for meeting_dir in sorted(month_dir.iterdir()):
+            if not meeting_dir.is_dir():
+                continue
+            if not _has_transcript(meeting_dir / "transcripts"):
+                audio_files = (
+                    list(meeting_dir.rglob("*.m4a"))
+                    + list(meeting_dir.rglob("*.mp4"))
+                    + list(meeting_dir.rglob("*.mp3"))
+                    + list(meeting_dir.rglob("*.wav"))
+                )
+                if audio_files:
+                    unprocessed.append(
+                        {
+                            "path": str(meeting_dir),
+                            "name": meeting_dir.name,
+                            "audio_files": [str(f) for f in audio_files],
+                        }
+                    )
+    return unprocessed
+
+
 def batch(
     meetings_base_dir: str,
     vocabulary_path: str = "",
     extra_vocab_dirs: list[Path] | None = None,
+    policy: str = "",
+    deadline_minutes: float = 0,
+    max_api_cost_usd: float | None = None,
 ) -> dict:
-    """Batch transcribe unprocessed meetings in a directory."""
+    """Batch transcribe unprocessed meetings in a directory.
+
+    policy: "shortest" | "oldest" | "deadline" | "path" (default: WHISPER_SCHEDULE,
+        see lib.scheduler). Each result carries its planned ETA.
+    deadline_minutes: > 0 splits the run across the local backend and the API
+        concurrently to finish within the deadline (lib.hybrid), spending at most
+        max_api_cost_usd on the API (None = no cap).
+    """
     try:
         base = Path(meetings_base_dir).expanduser()
         if not base.exists():
             return {"status": "error", "message": f"Directory not found: {meetings_base_dir}"}
 
-        unprocessed = []
-        for month_dir in sorted(base.iterdir()):
-            if not month_dir.is_dir():
-                continue
-            for meeting_dir in sorted(month_dir.iterdir()):
-                if not meeting_dir.is_dir():
-                    continue
-                transcripts = meeting_dir / "transcripts"
-                has_transcripts = transcripts.exists() and any(transcripts.glob("*.txt"))
-                if not has_transcripts:
-                    audio_files = (
-                        list(meeting_dir.rglob("*.m4a"))
-                        + list(meeting_dir.rglob("*.mp4"))
-                        + list(meeting_dir.rglob("*.mp3"))
-                        + list(meeting_dir.rglob("*.wav"))
-                    )
-                    if audio_files:
-                        unprocessed.append(
-                            {
-                                "path": str(meeting_dir),
-                                "name": meeting_dir.name,
-                                "audio_files": [str(f) for f in audio_files],
-                            }
-                        )
-
+        unprocessed = _find_unprocessed_meetings(base)
         if not unprocessed:
             return {"status": "success", "message": "No unprocessed meetings found", "total": 0}
 
+        duplicates, fingerprint_seconds = _find_duplicate_recordings(
+            [f for m in unprocessed for f in m["audio_files"]]
+        )
+        if duplicates:
+            unprocessed = _pick_meeting_recordings(unprocessed, duplicates)
+
+        if deadline_minutes > 0:
+            out = _batch_hybrid(
+                unprocessed,
+                deadline_minutes * 60,
+                max_api_cost_usd,
+                vocabulary_path,
+                extra_vocab_dirs,
+            )
+            out["dedup"] = _link_duplicates(duplicates, out["results"], fingerprint_seconds)
+            return out
+
+        parallel = _job_parallelism()
+        schedule = plan_jobs(
+            [{"audio_path": m["audio_files"][0], "meeting": m["name"]} for m in unprocessed],
+            _expected_backend_key(),
+            policy,
+            parallel=parallel,
+        )
+        started = time.time()
         results = []
         success = 0
         failed = 0
-        for meeting in unprocessed:
-            audio_path = meeting["audio_files"][0]
-            result = transcribe(
-                audio_path=audio_path,
+
+        def _run(job: dict) -> dict:
+            return transcribe(
+                audio_path=job["audio_path"],
                 vocabulary_path=vocabulary_path,
                 extra_vocab_dirs=extra_vocab_dirs,
             )
-            result["meeting"] = meeting["name"]
+
+        for job, result in zip(
+            schedule["jobs"], _map_jobs(_run, schedule["jobs"], parallel), strict=True
+        ):
+            result["meeting"] = job["meeting"]
+            result["schedule"] = _job_schedule(job)
             results.append(result)
             if result.get("status") == "success":
                 success += 1
@@ -466,17 +1215,238 @@ def batch(
             "total": len(unprocessed),
             "processed": success,
             "failed": failed,
+            "schedule": _schedule_summary(schedule, started),
+            "dedup": _link_duplicates(duplicates, results, fingerprint_seconds),
             "results": results,
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
+def _find_duplicate_recordings(paths: list[str]) -> tuple[dict, float]:
+    """lib.fingerprint duplicates among paths (and earlier transcripts); empty when disabled."""
+    if not dedup_enabled() or not paths:
+        return {}, 0.0
+    found = find_duplicates(paths)
+    return found["duplicates"], found["fingerprint_seconds"]
+
+
+def _pick_meeting_recordings(unprocessed: list[dict], duplicates: dict) -> list[dict]:
+    """Put each meeting's best distinct recording first (batch transcribes audio_files[0]);
+    meetings whose recordings are all copies of recordings elsewhere need no job."""
+    picked = []
+    for m in unprocessed:
+        distinct = [f for f in m["audio_files"] if f not in duplicates]
+        if not distinct:
+            continue
+        first = min(distinct, key=lambda f: copy_rank(Path(f)))
+        picked.append({**m, "audio_files": [first] + [f for f in m["audio_files"] if f != first]})
+    return picked
+
+
+def _link_duplicates(duplicates: dict, results: list[dict], fingerprint_seconds: float) -> dict:
+    """Point duplicates at the transcript of their original once it exists, and report
+    the audio and compute time that was not spent on them."""
+    for r in results:
+        txt = r.get("output_files", {}).get("txt")
+        if r.get("status") == "success" and txt:
+            with contextlib.suppress(OSError):
+                record_transcript(r["audio_file"], txt)
+    linked = []
+    unlinked = []
+    skipped_seconds = 0.0
+    for dup, info in duplicates.items():
+        transcript = info["transcript"] or transcript_for(info["of"])
+        if not transcript:
+            unlinked.append({"audio_file": dup, "duplicate_of": info["of"]})
+            continue
+        pointer = link_duplicate(dup, info["of"], transcript, info["bit_error_rate"])
+        skipped_seconds += info.get("duration") or 0.0
+        linked.append(
+            {
+                "audio_file": dup,
+                "duplicate_of": info["of"],
+                "bit_error_rate": info["bit_error_rate"],
+                "pointer": pointer,
+            }
+        )
+    rtf = rtf_for(_expected_backend_key())
+    return {
+        "duplicates": len(linked),
+        "unlinked": unlinked,
+        "audio_hours_skipped": round(skipped_seconds / 3600, 3),
+        "compute_hours_avoided": round(skipped_seconds * rtf / 3600, 3),
+        "fingerprint_seconds": fingerprint_seconds,
+        "linked": linked,
+    }
+
+
+def _batch_hybrid(
+    unprocessed: list[dict],
+    deadline_seconds: float,
+    spend_cap: float | None,
+    vocabulary_path: str,
+    extra_vocab_dirs: list[Path] | None,
+) -> dict:
+    """batch() with a deadline: local and API backends work the backlog at the same time."""
+    if _get_local_backend() is None:
+        raise RuntimeError("Hybrid batch needs a local backend (none found)")
+    jobs = [
+        {
+            "audio_path": m["audio_files"][0],
+            "meeting": m["name"],
+            "duration": duration_of(m["audio_files"][0]),
+            "size": estimated_upload_bytes(m["audio_files"][0]),
+        }
+        for m in unprocessed
+    ]
+    local_workers = hybrid_local_workers()
+    api_workers = get_api_dispatcher().concurrency
+    price = api_price_per_minute()
+    split = plan_split(
+        jobs,
+        deadline_seconds,
+        local_rtf=rtf_for(_local_backend_label()),
+        api_rtf=rtf_for("api"),
+        local_workers=local_workers,
+        api_workers=api_workers,
+        spend_cap=spend_cap,
+        price_per_minute=price,
+    )
+    run = run_split(
+        split,
+        transcribe,
+        deadline_seconds,
+        local_workers,
+        api_workers,
+        spend_cap,
+        price,
+        vocabulary_path=vocabulary_path,
+        extra_vocab_dirs=extra_vocab_dirs,
+    )
+    success = sum(1 for r in run["results"] if r.get("status") == "success")
+    return {
+        "status": "success",
+        "mode": "hybrid",
+        "total": len(jobs),
+        "processed": success,
+        "failed": len(jobs) - success,
+        "hybrid": run["summary"],
+        "results": run["results"],
+    }
+
+
+def _job_parallelism() -> int:
+    """Jobs run at once by batch()/process_voice_memos(): API uploads overlap (bounded by
+    the dispatcher), local decodes run one at a time."""
+    return get_api_dispatcher().concurrency if _expected_backend_key() == "api" else 1
+
+
+def _map_jobs(fn: Callable[[dict], dict], jobs: list[dict], parallel: int) -> Iterator[dict]:
+    """fn over jobs with up to `parallel` in flight; results come back in job order."""
+    if parallel <= 1:
+        yield from map(fn, jobs)
+        return
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        yield from pool.map(fn, jobs)
+
+
+def _job_schedule(job: dict) -> dict:
+    """Planning fields of a lib.scheduler job, for the per-result report."""
+    keys = ("duration", "estimated_seconds", "eta_seconds", "deadline", "late")
+    return {k: job[k] for k in keys if k in job}
+
+
+def _schedule_summary(schedule: dict, started: float) -> dict:
+    elapsed = time.time() - started
+    return {
+        "policy": schedule["policy"],
+        "rtf": schedule["rtf"],
+        "estimated_total_seconds": schedule["estimated_total_seconds"],
+        "estimated_finish": time.strftime(
+            "%Y-%m-%dT%H:%M:%S", time.localtime(started + schedule["estimated_total_seconds"])
+        ),
+        "actual_total_seconds": round(elapsed, 1),
+    }
+
+
+def _transcribe_memos_packed(
+    memos: list[Path], vocab_path: str, extra_vocab_dirs: list[Path] | None
+) -> tuple[list[dict], list[Path]]:
+    """Transcribe short memos through shared batched decodes (see lib.packing).
+
+    Returns (results, memos still to transcribe individually). Anything that cannot
+    be packed — long or unprobeable files, or no batched faster-whisper — is left over.
+    """
+    if _get_local_backend() != "faster_whisper":
+        return [], memos
+    max_seconds = pack_max_seconds()
+    short: list[tuple[Path, float]] = []
+    rest: list[Path] = []
+    for af in memos:
+        d = duration_of(af)
+        if d is not None and 0 < d <= max_seconds:
+            short.append((af, d))
+        else:
+            rest.append(af)
+    if len(short) < 2:
+        return [], memos
+
+    prompt = load_vocabulary(vocab_path) if vocab_path else ""
+    packed_seconds = sum(d for _, d in short)
+    t0 = time.monotonic()
+    try:
+        decoded = _run_local_job(
+            "faster_whisper",
+            transcribe_packed,
+            (short, "ja", prompt, _batch_size()),
+            packed_seconds,
+            f"{len(short)} packed memos",
+        )
+    except Exception:
+        return [], memos
+    wall = time.monotonic() - t0
+
+    used_backend = f"local:faster_whisper:{_faster_model()}"
+    key = backend_key(used_backend)
+    results = []
+    for af, d in short:
+        try:
+            result = decoded[af]
+            # The shared decode's wall time, split by each memo's share of the audio.
+            memo_wall = wall * d / packed_seconds
+            record_rtf(key, d, memo_wall)
+            _record_job_metrics(key, d, memo_wall)
+            out_dir = af.parent / "transcripts"
+            out_dir.mkdir(parents=True, exist_ok=True)
+            results.append(
+                _finish(
+                    result,
+                    af,
+                    out_dir,
+                    ["txt", "srt", "vtt", "json"],
+                    extra_vocab_dirs,
+                    "ja",
+                    prompt,
+                    used_backend,
+                )
+            )
+        except Exception as e:
+            results.append({"status": "error", "audio_file": str(af), "message": str(e)})
+    return results, rest
+
+
 def process_voice_memos(
     meetings_dir: str | Path | None = None,
     extra_vocab_dirs: list[Path] | None = None,
+    pack: bool | None = None,
+    policy: str = "",
 ) -> dict:
-    """Scan and transcribe unprocessed voice memos in the Meetings directory."""
+    """Scan and transcribe unprocessed voice memos in the Meetings directory.
+
+    pack: decode short memos together in shared batches (default: WHISPER_PACK=1).
+    policy: order of the remaining memos, as in batch() (default: WHISPER_SCHEDULE).
+    """
     try:
         if meetings_dir:
             meetings_dir = Path(meetings_dir)
@@ -518,29 +1488,63 @@ def process_voice_memos(
                 vocab_path = str(general_vocab)
                 break
 
-        results = []
+        pending = []
         for af in audio_files:
             af_str = str(af)
             if af_str in processed:
                 continue
 
-            transcripts_dir = af.parent / "transcripts"
-            if transcripts_dir.exists() and (transcripts_dir / f"{af.stem}.txt").exists():
+            if _has_transcript(af.parent / "transcripts", af.stem):
                 with open(processed_file, "a", encoding="utf-8") as pf:
                     pf.write(af_str + "\n")
                 continue
+            pending.append(af)
 
-            result = transcribe(
-                audio_path=af_str,
+        duplicates, fingerprint_seconds = _find_duplicate_recordings([str(af) for af in pending])
+        pending = [af for af in pending if str(af) not in duplicates]
+
+        results = []
+        use_pack = pack_enabled() if pack is None else pack
+        if use_pack and _resolve_effective_backend("auto") != "api":
+            results, pending = _transcribe_memos_packed(pending, vocab_path, extra_vocab_dirs)
+            with open(processed_file, "a", encoding="utf-8") as pf:
+                for r in results:
+                    if r.get("status") == "success":
+                        pf.write(r["audio_file"] + "\n")
+
+        parallel = _job_parallelism()
+        schedule = plan_jobs(
+            [{"audio_path": str(af)} for af in pending],
+            _expected_backend_key(),
+            policy,
+            parallel=parallel,
+        )
+        started = time.time()
+
+        def _run(job: dict) -> dict:
+            return transcribe(
+                audio_path=job["audio_path"],
                 vocabulary_path=vocab_path,
                 extra_vocab_dirs=extra_vocab_dirs,
             )
+
+        for job, result in zip(
+            schedule["jobs"], _map_jobs(_run, schedule["jobs"], parallel), strict=True
+        ):
+            af_str = job["audio_path"]
             if result.get("status") == "success":
                 with open(processed_file, "a", encoding="utf-8") as pf:
                     pf.write(af_str + "\n")
+            result["schedule"] = _job_schedule(job)
             results.append(result)
 
-        if not results:
+        dedup = _link_duplicates(duplicates, results, fingerprint_seconds)
+        if dedup["linked"]:
+            with open(processed_file, "a", encoding="utf-8") as pf:
+                for d in dedup["linked"]:
+                    pf.write(d["audio_file"] + "\n")
+
+        if not results and not dedup["linked"]:
             return {
                 "status": "success",
                 "message": "No unprocessed voice memos found",
@@ -555,6 +1559,8 @@ def process_voice_memos(
             "processed": success,
             "failed": len(results) - success,
             "meetings_dir": str(meetings_dir),
+            "schedule": _schedule_summary(schedule, started),
+            "dedup": dedup,
             "results": results,
         }
     except Exception as e:
@@ -1,15 +1,105 @@
-"""Post-processing dictionary management for Whisper transcription."""
+"""Post-processing dictionary management for Whisper transcription.
 
+dictionary_add() never rewrites foo.dict.json: new entries are appended as
+JSON lines to foo.dict.json.journal under an exclusive flock on
+foo.dict.json.lock, so concurrent adds (threads or processes) cannot lose each
+other's entries. Readers merge base + journal. Once the journal holds
+WHISPER_DICT_JOURNAL_MAX entries it is compacted into the JSON (atomic
+replace, then the journal is removed); dictionary_compact() does it on demand.
+
+  WHISPER_DICT_JOURNAL_MAX=200
+"""
+
+import contextlib
+import fcntl
 import json
+import os
+import threading
 from pathlib import Path
 
 from .vocabulary import get_vocab_dirs
 
+# dict file → {"base": (mtime_ns, size), "froms", "entries", "offset", "journal_entries"}
+_state: dict[str, dict] = {}
+_state_lock = threading.Lock()
+
+
+def _journal_max() -> int:
+    return max(1, int(os.environ.get("WHISPER_DICT_JOURNAL_MAX", "200")))
+
+
+def journal_path(dict_file: Path) -> Path:
+    return dict_file.with_name(dict_file.name + ".journal")
+
+
+@contextlib.contextmanager
+def _locked(dict_file: Path):
+    """Exclusive flock on a sidecar .lock file (the base file itself gets replaced)."""
+    with open(dict_file.with_name(dict_file.name + ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _signature(p: Path) -> tuple[int, int] | None:
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_journal(journal: Path, offset: int = 0) -> tuple[list[dict], int]:
+    """Complete JSON lines after `offset`; returns (entries, offset after the last line).
+
+    A line still being written (no trailing newline) is left for the next read.
+    """
+    try:
+        with open(journal, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+    except OSError:
+        return [], offset
+    end = chunk.rfind(b"\n") + 1
+    entries = []
+    for line in chunk[:end].splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict) and "from" in entry and "to" in entry:
+            entries.append(entry)
+    return entries, offset + end
+
+
+def _merged(data: dict, journal_entries: list[dict]) -> list[dict]:
+    """Base replacements plus journal entries whose "from" is new (a journal that
+    survived an interrupted compaction repeats entries already in the base)."""
+    entries = list(data.get("replacements", []))
+    seen = {e.get("from") for e in entries}
+    for e in journal_entries:
+        if e["from"] not in seen:
+            seen.add(e["from"])
+            entries.append(e)
+    return entries
+
+
+def read_dictionary(dict_file: str | Path) -> dict:
+    """A dictionary's JSON with its journal merged into "replacements"."""
+    p = Path(dict_file).expanduser()
+    data = json.loads(p.read_text(encoding="utf-8"))
+    journal_entries, _ = _read_journal(journal_path(p))
+    return {**data, "replacements": _merged(data, journal_entries)}
 
-def load_dictionaries(extra_dirs: list[Path] | None = None) -> list[dict]:
+
+def load_dictionaries(extra_dirs: list[Path] | None = None, language: str = "") -> list[dict]:
     """Load all *.dict.json files from vocab dirs.
 
-    Merge and sort by 'from' length (longest first).
+    Merge and sort by 'from' length (longest first). A dictionary or entry with a
+    "language" field only applies to that language; when `language` is empty
+    (unknown) every entry applies.
     """
     replacements = []
     for vdir in get_vocab_dirs(extra_dirs):
@@ -17,9 +107,13 @@ def load_dictionaries(extra_dirs: list[Path] | None = None) -> list[dict]:
             continue
         for f in sorted(vdir.glob("*.dict.json")):
             try:
-                data = json.loads(f.read_text(encoding="utf-8"))
+                data = read_dictionary(f)
+                if language and data.get("language", language) != language:
+                    continue
                 for entry in data.get("replacements", []):
                     if "from" in entry and "to" in entry:
+                        if language and entry.get("language", language) != language:
+                            continue
                         replacements.append(entry)
             except (json.JSONDecodeError, OSError):
                 continue
@@ -56,12 +150,14 @@ def dictionary_list(extra_dirs: list[Path] | None = None) -> dict:
                 continue
             for f in sorted(vdir.glob("*.dict.json")):
                 try:
-                    data = json.loads(f.read_text(encoding="utf-8"))
+                    data = read_dictionary(f)
+                    journal_entries, _ = _read_journal(journal_path(f))
                     dicts.append(
                         {
                             "name": data.get("name", f.stem),
                             "description": data.get("description", ""),
                             "entries": len(data.get("replacements", [])),
+                            "journal_entries": len(journal_entries),
                             "path": str(f),
                         }
                     )
@@ -78,41 +174,123 @@ def dictionary_list(extra_dirs: list[Path] | None = None) -> dict:
         return {"status": "error", "message": str(e)}
 
 
-def dictionary_add(dict_file: str, entries: list[dict]) -> dict:
-    """Add replacement entries to a dictionary file. Duplicates are skipped."""
+def _refresh(p: Path) -> dict:
+    """Known "from" keys for p (call under _locked). The base is re-read only when it
+    changed; the journal is read from where the last call stopped."""
+    key = str(p.absolute())
+    journal = journal_path(p)
+    base = _signature(p)
+    journal_size = (_signature(journal) or (0, 0))[1]
+    with _state_lock:
+        st = _state.get(key)
+    if st is None or st["base"] != base or journal_size < st["offset"]:
+        data = json.loads(p.read_text(encoding="utf-8")) if base else {}
+        replacements = data.get("replacements", [])
+        st = {
+            "base": base,
+            "froms": {e["from"] for e in replacements if "from" in e},
+            "entries": len(replacements),
+            "offset": 0,
+            "journal_entries": 0,
+        }
+    if journal_size > st["offset"]:
+        entries, st["offset"] = _read_journal(journal, st["offset"])
+        for e in entries:
+            st["journal_entries"] += 1
+            if e["from"] not in st["froms"]:
+                st["froms"].add(e["from"])
+                st["entries"] += 1
+    with _state_lock:
+        _state[key] = st
+    return st
+
+
+def _write_base(p: Path, data: dict) -> None:
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    tmp.replace(p)
+
+
+def _compact(p: Path) -> int:
+    """Merge the journal into the base file (call under _locked). Returns entries merged."""
+    journal = journal_path(p)
+    journal_entries, _ = _read_journal(journal)
+    if not journal_entries:
+        return 0
+    data = json.loads(p.read_text(encoding="utf-8"))
+    before = len(data.get("replacements", []))
+    data["replacements"] = _merged(data, journal_entries)
+    _write_base(p, data)  # journal still present: a crash here only leaves duplicates
+    journal.unlink()
+    with _state_lock:
+        _state.pop(str(p.absolute()), None)
+    return len(data["replacements"]) - before
+
+
+def dictionary_compact(dict_file: str) -> dict:
+    """Fold a dictionary's journal into its JSON file."""
     try:
         p = Path(dict_file).expanduser()
-        p.parent.mkdir(parents=True, exist_ok=True)
+        if not p.exists():
+            return {"status": "error", "message": f"Dictionary not found: {dict_file}"}
+        with _locked(p):
+            merged = _compact(p)
+        return {"status": "success", "merged": merged, "file": str(p)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
 
-        if p.exists():
-            data = json.loads(p.read_text(encoding="utf-8"))
-        else:
-            data = {"name": p.stem.replace(".dict", ""), "description": "", "replacements": []}
 
-        existing_froms = {e["from"] for e in data.get("replacements", [])}
+def dictionary_add(dict_file: str, entries: list[dict]) -> dict:
+    """Add replacement entries to a dictionary (via its journal). Duplicates are skipped."""
+    try:
+        p = Path(dict_file).expanduser()
+        p.parent.mkdir(parents=True, exist_ok=True)
 
         added = []
         skipped = []
-        for entry in entries:
-            fr = entry.get("from", "").strip()
-            to = entry.get("to", "").strip()
-            if not fr or not to:
-                skipped.append(entry)
-                continue
-            if fr in existing_froms:
-                skipped.append(entry)
-                continue
-            data["replacements"].append({"from": fr, "to": to})
-            existing_froms.add(fr)
-            added.append(entry)
+        compacted = False
+        with _locked(p):
+            if not p.exists():
+                name = p.stem.replace(".dict", "")
+                _write_base(p, {"name": name, "description": "", "replacements": []})
+            st = _refresh(p)
 
-        p.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            lines = []
+            for entry in entries:
+                fr = entry.get("from", "").strip()
+                to = entry.get("to", "").strip()
+                if not fr or not to or fr in st["froms"]:
+                    skipped.append(entry)
+                    continue
+                record = {"from": fr, "to": to}
+                if entry.get("language"):
+                    record["language"] = entry["language"]
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+                st["froms"].add(fr)
+                added.append(entry)
+
+            if lines:
+                payload = "".join(lines).encode("utf-8")
+                fd = os.open(journal_path(p), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, payload)  # one write: readers see whole lines or nothing new
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                st["offset"] += len(payload)
+                st["journal_entries"] += len(lines)
+                st["entries"] += len(lines)
+            total = st["entries"]
+            if st["journal_entries"] >= _journal_max():
+                _compact(p)
+                compacted = True
 
         return {
             "status": "success",
             "added": len(added),
             "skipped": len(skipped),
-            "total_entries": len(data["replacements"]),
+            "total_entries": total,
+            "compacted": compacted,
             "file": str(p),
         }
     except Exception as e:
@@ -0,0 +1,373 @@
+"""Coordinator/worker transcription over HTTP.
+
+The coordinator owns meeting discovery (same rules as batch()) and job state.
+Workers keep a warm model, lease one job at a time, heartbeat while decoding
+and post the result as soon as the job finishes. A lease that is not renewed
+within lease_seconds is reclaimed and the job re-queued, so a dead worker
+only delays its current job. Audio and transcript paths must resolve the same
+way on every node (shared mount).
+
+Endpoints (JSON):
+  POST /lease      {"worker"}                         → {"job": {...} | null}
+  POST /heartbeat  {"job_id", "token"}                 → {"ok"}
+  POST /complete   {"job_id", "token", "result"}       → {"ok"}
+  GET  /status                                         → counts + jobs
+  GET  /results?since=N                                → results in completion order
+
+The coordinator listens on 127.0.0.1 by default. /status and /results expose
+local paths and full transcripts, so binding any other address requires the
+shared secret.
+
+  WHISPER_CLUSTER_TOKEN=...  (shared secret, sent as X-Whisper-Token; required
+                              unless the coordinator binds a loopback address)
+"""
+
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+_MAX_ATTEMPTS = 3
+
+
+def _cluster_token() -> str:
+    return os.environ.get("WHISPER_CLUSTER_TOKEN", "")
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Coordinator:
+    """Thread-safe job table with leases."""
+
+    def __init__(
+        self,
+        meetings_base_dir: str = "",
+        vocabulary_path: str = "",
+        lease_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.vocabulary_path = vocabulary_path
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}
+        self._results: list[dict] = []
+        if meetings_base_dir:
+            self.discover(meetings_base_dir)
+
+    def discover(self, meetings_base_dir: str, policy: str = "") -> int:
+        """Queue unprocessed meetings under meetings_base_dir in schedule order
+        (lib.scheduler, default WHISPER_SCHEDULE). Returns jobs added."""
+        from .core import _expected_backend_key, _find_unprocessed_meetings
+        from .scheduler import plan_jobs
+
+        base = Path(meetings_base_dir).expanduser()
+        schedule = plan_jobs(
+            [
+                {"id": m["path"], "meeting": m["name"], "audio_path": m["audio_files"][0]}
+                for m in _find_unprocessed_meetings(base)
+            ],
+            _expected_backend_key(),
+            policy,
+        )
+        added = 0
+        for job in schedule["jobs"]:
+            added += self.add_job(
+                job["id"], job["meeting"], job["audio_path"], job["estimated_seconds"]
+            )
+        return added
+
+    def add_job(
+        self, job_id: str, name: str, audio_path: str, estimated_seconds: float | None = None
+    ) -> bool:
+        """Queue one job; leases are handed out in insertion order."""
+        with self._lock:
+            if job_id in self._jobs:
+                return False
+            self._jobs[job_id] = {
+                "id": job_id,
+                "meeting": name,
+                "audio_path": audio_path,
+                "status": "pending",
+                "attempts": 0,
+                "worker": None,
+                "token": None,
+                "lease_expires": 0.0,
+                "estimated_seconds": estimated_seconds,
+            }
+            return True
+
+    def _reap(self) -> None:
+        now = self._clock()
+        for job in self._jobs.values():
+            if job["status"] == "leased" and job["lease_expires"] < now:
+                job["status"] = "pending" if job["attempts"] < _MAX_ATTEMPTS else "failed"
+                job["worker"] = job["token"] = None
+                if job["status"] == "failed":
+                    self._record(job, {"status": "error", "message": "lease expired too often"})
+
+    def lease(self, worker: str) -> dict | None:
+        with self._lock:
+            self._reap()
+            for job in self._jobs.values():
+                if job["status"] == "pending":
+                    job.update(
+                        status="leased",
+                        worker=worker,
+                        token=secrets.token_hex(8),
+                        lease_expires=self._clock() + self.lease_seconds,
+                        attempts=job["attempts"] + 1,
+                    )
+                    return {
+                        "job_id": job["id"],
+                        "token": job["token"],
+                        "meeting": job["meeting"],
+                        "audio_path": job["audio_path"],
+                        "vocabulary_path": self.vocabulary_path,
+                        "lease_seconds": self.lease_seconds,
+                    }
+            return None
+
+    def heartbeat(self, job_id: str, token: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != "leased" or job["token"] != token:
+                return False
+            job["lease_expires"] = self._clock() + self.lease_seconds
+            return True
+
+    def complete(self, job_id: str, token: str, result: dict) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != "leased" or job["token"] != token:
+                return False  # lease was reclaimed; another worker owns the job now
+            job["status"] = "done" if result.get("status") == "success" else "failed"
+            job["token"] = None
+            self._record(job, result)
+            return True
+
+    def _record(self, job: dict, result: dict) -> None:
+        self._results.append({**result, "meeting": job["meeting"], "worker": job["worker"]})
+
+    def results(self, since: int = 0) -> list[dict]:
+        with self._lock:
+            return self._results[since:]
+
+    def status(self) -> dict:
+        with self._lock:
+            self._reap()
+            counts: dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            jobs = [
+                {k: v for k, v in job.items() if k not in ("token", "lease_expires")}
+                for job in self._jobs.values()
+            ]
+            # Pending work drains across the workers currently holding leases.
+            leased = {j["worker"] for j in self._jobs.values() if j["status"] == "leased"}
+            workers = max(1, len(leased))
+            queued = 0.0
+            for job in jobs:
+                if job["status"] == "pending" and job["estimated_seconds"] is not None:
+                    queued += job["estimated_seconds"]
+                    job["eta_seconds"] = round(queued / workers, 1)
+            return {
+                "status": "success",
+                "total": len(self._jobs),
+                "counts": counts,
+                "results": len(self._results),
+                "eta_seconds": round(queued / workers, 1),
+                "jobs": jobs,
+            }
+
+    def finished(self) -> bool:
+        with self._lock:
+            self._reap()
+            return all(j["status"] in ("done", "failed") for j in self._jobs.values())
+
+
+# ── HTTP transport ───────────────────────────────────────────────────────
+
+
+def _make_handler(coord: Coordinator, token: str):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # keep stderr quiet
+
+        def _reply(self, code: int, body: dict) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            sent = self.headers.get("X-Whisper-Token", "")
+            if token and not hmac.compare_digest(sent.encode(), token.encode()):
+                self._reply(403, {"error": "forbidden"})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            url = urlparse(self.path)
+            if url.path == "/status":
+                self._reply(200, coord.status())
+            elif url.path == "/results":
+                try:
+                    since = int(parse_qs(url.query).get("since", ["0"])[0])
+                except ValueError:
+                    self._reply(400, {"error": "since must be an integer"})
+                    return
+                self._reply(200, {"results": coord.results(since)})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:  # bad Content-Length, malformed JSON or UTF-8
+                self._reply(400, {"error": "malformed JSON body"})
+                return
+            if not isinstance(body, dict):
+                self._reply(400, {"error": "JSON body must be an object"})
+                return
+            try:
+                if self.path == "/lease":
+                    self._reply(200, {"job": coord.lease(str(body.get("worker", "?")))})
+                elif self.path == "/heartbeat":
+                    self._reply(200, {"ok": coord.heartbeat(body["job_id"], body["token"])})
+                elif self.path == "/complete":
+                    ok = coord.complete(body["job_id"], body["token"], body.get("result", {}))
+                    self._reply(200, {"ok": ok})
+                else:
+                    self._reply(404, {"error": "not found"})
+            except KeyError as e:
+                self._reply(400, {"error": f"missing field: {e.args[0]}"})
+
+    return Handler
+
+
+def serve_coordinator(
+    coord: Coordinator, host: str = "127.0.0.1", port: int = 8765
+) -> ThreadingHTTPServer:
+    """Start the coordinator HTTP server on a background thread and return it.
+
+    Raises ValueError for a non-loopback host without WHISPER_CLUSTER_TOKEN.
+    """
+    token = _cluster_token()
+    if not token and not _is_loopback(host):
+        raise ValueError(
+            f"refusing to serve on {host} without WHISPER_CLUSTER_TOKEN "
+            "(transcripts and paths would be readable by anyone who can connect)"
+        )
+    server = ThreadingHTTPServer((host, port), _make_handler(coord, token))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _post(url: str, path: str, body: dict, timeout: float = 30.0) -> dict:
+    req = urllib.request.Request(
+        url.rstrip("/") + path,
+        data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json", "X-Whisper-Token": _cluster_token()},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+# ── Worker ───────────────────────────────────────────────────────────────
+
+
+def _warm_model() -> None:
+    from .core import _get_faster_whisper_model, _get_local_backend
+
+    if _get_local_backend() == "faster_whisper":
+        _get_faster_whisper_model()
+
+
+def run_worker(
+    coordinator_url: str,
+    worker_id: str = "",
+    transcribe_fn: Callable[..., dict] | None = None,
+    heartbeat_seconds: float = 10.0,
+    idle_seconds: float = 5.0,
+    max_jobs: int = 0,
+    stop: threading.Event | None = None,
+    warm: bool = True,
+) -> int:
+    """Lease and run jobs until `stop` is set or max_jobs have run (idle polls otherwise).
+
+    transcribe_fn defaults to lib.core.transcribe. Returns the number of jobs run.
+    """
+    if transcribe_fn is None:
+        from .core import transcribe as transcribe_fn
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    if warm:
+        _warm_model()
+
+    done = 0
+    while not stop.is_set() and (not max_jobs or done < max_jobs):
+        try:
+            job = _post(coordinator_url, "/lease", {"worker": worker_id})["job"]
+        except (urllib.error.URLError, OSError):
+            job = None
+        if job is None:
+            if stop.wait(idle_seconds):
+                break
+            continue
+
+        finished = threading.Event()
+
+        def _beat(job: dict = job, finished: threading.Event = finished) -> None:
+            interval = min(heartbeat_seconds, job["lease_seconds"] / 3)
+            while not finished.wait(interval):
+                try:
+                    beat = {"job_id": job["job_id"], "token": job["token"]}
+                    if not _post(coordinator_url, "/heartbeat", beat)["ok"]:
+                        return
+                except (urllib.error.URLError, OSError):
+                    continue
+
+        beater = threading.Thread(target=_beat, daemon=True)
+        beater.start()
+        try:
+            result = transcribe_fn(
+                audio_path=job["audio_path"], vocabulary_path=job["vocabulary_path"]
+            )
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+        finished.set()
+        beater.join()
+        result["worker"] = worker_id
+        try:
+            body = {"job_id": job["job_id"], "token": job["token"], "result": result}
+            _post(coordinator_url, "/complete", body)
+        except (urllib.error.URLError, OSError):
+            pass  # lease will expire and the job is re-queued
+        done += 1
+    return done
@@ -0,0 +1,406 @@
+"""Acoustic fingerprints for finding the same recording twice before transcribing.
+
+A fingerprint is the energy envelope of 8kHz mono PCM, reduced to one bit per
+100ms frame: did the log energy clearly rise from the previous frame. It is
+taken over WHISPER_FINGERPRINT_SECONDS windows at fixed offsets spread over the
+whole file (0, then WHISPER_FINGERPRINT_STRIDE seconds, doubling: 0, 60, 120,
+240, ... by default), so a shared intro or silence cannot decide the match on
+its own. That survives re-encoding, container changes (Zoom .mp4 vs its .m4a),
+bitrate and gain, and each window packs into a Python int, so a comparison is
+an XOR and a popcount per window over a few ±5s alignments.
+
+Deadbanded bits are sparse, so a plain bit error rate is low for any two quiet
+recordings. The score is normalised instead: differing bits divided by the
+number expected by chance for bit strings of the same densities (about 1.0 for
+unrelated audio, near 0 for copies), and windows with too few set bits to say
+anything are not scored. Two files are treated as the same recording only when
+both durations are known and agree within 2% and the score is at most
+WHISPER_FINGERPRINT_MAX_BER; byte-identical copies are caught by a size +
+head/tail hash without decoding at all.
+
+Fingerprints are cached by path, size and mtime. Transcribed recordings are
+remembered with their transcript, so a copy that turns up in another folder
+later is linked to the existing transcript instead of being decoded again.
+
+  WHISPER_DEDUP=1                        (0 disables)
+  WHISPER_FINGERPRINT_SECONDS=20         (per window)
+  WHISPER_FINGERPRINT_STRIDE=60
+  WHISPER_FINGERPRINT_MAX_BER=0.4        (normalised: 1.0 = chance)
+  WHISPER_FINGERPRINT_CACHE=~/.cache/whisper-mcp/fingerprints.json (env override)
+"""
+
+import contextlib
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import threading
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+from .scheduler import duration_of
+from .storage import find_output
+
+RATE = 8000
+FRAME = 800  # 100ms
+_MAX_SHIFT = 50  # frames (±5s of start offset between copies)
+_MIN_OVERLAP = 100  # frames
+_MIN_BITS = 40  # set bits per side over the compared windows; fewer is not evidence
+_RISE = 0.1  # log-energy step (~10%) that counts as "louder"
+_DURATION_TOLERANCE = 0.02
+_HASH_BYTES = 1 << 20
+# Preferred copy to transcribe: audio-only containers before video.
+_EXT_RANK = {".wav": 0, ".m4a": 1, ".mp3": 2, ".mp4": 3}
+
+_lock = threading.Lock()
+
+
+def dedup_enabled() -> bool:
+    return os.environ.get("WHISPER_DEDUP", "1") != "0"
+
+
+def _seconds() -> float:
+    return float(os.environ.get("WHISPER_FINGERPRINT_SECONDS", "20"))
+
+
+def _stride() -> float:
+    return float(os.environ.get("WHISPER_FINGERPRINT_STRIDE", "60"))
+
+
+def _max_ber() -> float:
+    return float(os.environ.get("WHISPER_FINGERPRINT_MAX_BER", "0.4"))
+
+
+def cache_path() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_FINGERPRINT_CACHE",
+            str(Path.home() / ".cache" / "whisper-mcp" / "fingerprints.json"),
+        )
+    ).expanduser()
+
+
+def _load_cache() -> dict:
+    try:
+        return json.loads(cache_path().read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_cache(cache: dict) -> None:
+    p = cache_path()
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(p)
+    except OSError:
+        pass
+
+
+def quick_hash(path: Path, size: int) -> str:
+    """Size plus the first and last MiB: equal for byte-identical copies."""
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(_HASH_BYTES))
+        if size > 2 * _HASH_BYTES:
+            f.seek(-_HASH_BYTES, os.SEEK_END)
+            h.update(f.read(_HASH_BYTES))
+    return h.hexdigest()
+
+
+def window_starts(duration: float, seconds: float, stride: float) -> list[float]:
+    """Fixed window offsets (0, stride, 2*stride, 4*stride, ...) that fit in duration.
+
+    They do not depend on the duration itself, so two copies of a recording get
+    windows at the same offsets and can be compared window by window.
+    """
+    starts = [0.0]
+    start = stride
+    while stride > 0 and start + seconds <= duration:
+        starts.append(start)
+        start *= 2
+    return starts
+
+
+def _read_pcm(path: str, start: float, seconds: float) -> array | None:
+    """`seconds` of the file from `start` as 8kHz mono int16 samples (PyAV, else ffmpeg)."""
+    try:
+        import av
+    except ImportError:
+        return _ffmpeg_pcm(path, start, seconds)
+    samples = array("h")
+    need = int(seconds * RATE)
+    skip = 0
+    try:
+        with av.open(path) as container:
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(format="s16", layout="mono", rate=RATE)
+            if start > 0:
+                container.seek(int(start * av.time_base), any_frame=False, backward=True)
+            for frame in container.decode(stream):
+                if (
+                    frame.time is not None
+                    and frame.time + frame.samples / frame.sample_rate < start
+                ):
+                    continue
+                if not samples and frame.time is not None and frame.time < start:
+                    skip = int((start - frame.time) * RATE)  # seek landed before the window
+                for out in resampler.resample(frame):
+                    samples.frombytes(out.to_ndarray().tobytes())
+                if len(samples) >= skip + need:
+                    break
+    except Exception:
+        return None
+    return samples[skip : skip + need]
+
+
+def _ffmpeg_pcm(path: str, start: float, seconds: float) -> array | None:
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    try:
+        proc = subprocess.run(
+            [
+                ffmpeg,
+                "-v",
+                "error",
+                "-ss",
+                str(start),
+                "-t",
+                str(seconds),
+                "-i",
+                path,
+                "-ac",
+                "1",
+                "-ar",
+                str(RATE),
+                "-f",
+                "s16le",
+                "-",
+            ],
+            capture_output=True,
+            timeout=120,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if proc.returncode != 0:
+        return None
+    samples = array("h")
+    samples.frombytes(proc.stdout[: len(proc.stdout) // 2 * 2])
+    return samples
+
+
+def envelope_bits(samples) -> tuple[int, int]:
+    """(frame count, bits): bit i is set when frame i+1 is clearly louder than frame i.
+
+    The deadband keeps frames of equal loudness (silence, steady tones) at 0 in
+    every copy instead of letting codec noise decide the bit.
+    """
+    energies = []
+    for start in range(0, len(samples) - FRAME + 1, FRAME):
+        chunk = samples[start : start + FRAME]
+        energies.append(math.log(sum(s * s for s in chunk) / FRAME + 1.0))
+    bits = 0
+    for i in range(1, len(energies)):
+        if energies[i] > energies[i - 1] + _RISE:
+            bits |= 1 << (i - 1)
+    return max(0, len(energies) - 1), bits
+
+
+def match_score(
+    a: dict[float, tuple[int, int]],
+    b: dict[float, tuple[int, int]],
+    max_shift: int = _MAX_SHIFT,
+) -> float | None:
+    """Density-normalised bit error rate of the best alignment over the shared windows.
+
+    a and b map window start → (frame count, bits). One shift is applied to every
+    window (a copy is offset by the same amount throughout). The score is the
+    number of differing bits divided by the number expected between independent
+    bit strings of the same densities: ~1.0 for unrelated audio, near 0 for the
+    same recording. None when the shared windows hold fewer than _MIN_BITS set
+    bits on either side (silence, steady noise): that is no evidence either way.
+    """
+    pairs = [(a[start], b[start]) for start in sorted(a.keys() & b.keys())]
+    best = None
+    for shift in range(-max_shift, max_shift + 1):
+        diff = ones_a = ones_b = 0
+        expected = 0.0
+        for (na, ba), (nb, bb) in pairs:
+            if shift >= 0:
+                x, y, overlap = ba >> shift, bb, min(na - shift, nb)
+            else:
+                x, y, overlap = ba, bb >> -shift, min(na, nb + shift)
+            if overlap < _MIN_OVERLAP:
+                continue
+            mask = (1 << overlap) - 1
+            x, y = x & mask, y & mask
+            ca, cb = x.bit_count(), y.bit_count()
+            diff += (x ^ y).bit_count()
+            expected += (ca * (overlap - cb) + cb * (overlap - ca)) / overlap
+            ones_a += ca
+            ones_b += cb
+        if min(ones_a, ones_b) < _MIN_BITS or expected <= 0:
+            continue
+        score = diff / expected
+        if best is None or score < best:
+            best = score
+    return best
+
+
+def _entry(path: Path, cache: dict) -> dict | None:
+    """Cached {size, mtime, hash, duration} for path (a stat when unchanged)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    key = str(path.resolve())
+    entry = cache.get(key)
+    if not entry or entry["size"] != st.st_size or entry["mtime"] != st.st_mtime:
+        entry = {"size": st.st_size, "mtime": st.st_mtime, "hash": quick_hash(path, st.st_size)}
+        entry["duration"] = duration_of(path)
+        cache[key] = entry
+    return entry
+
+
+def _windows(path: Path, entry: dict) -> dict[float, tuple[int, int]] | None:
+    """The entry's fingerprint windows, decoding the file the first time they are needed."""
+    if "windows" not in entry:
+        entry.pop("bits", None)  # single-window fingerprint of an older cache
+        entry.pop("frames", None)
+        seconds = _seconds()
+        windows = []
+        for start in window_starts(entry.get("duration") or 0.0, seconds, _stride()):
+            samples = _read_pcm(str(path), start, seconds)
+            if samples is not None and len(samples) >= FRAME * (_MIN_OVERLAP + 1):
+                frames, bits = envelope_bits(samples)
+                windows.append([start, frames, format(bits, "x")])
+        entry["windows"] = windows  # empty when undecodable: byte-identical matches only
+    if not entry["windows"]:
+        return None
+    return {start: (frames, int(bits, 16)) for start, frames, bits in entry["windows"]}
+
+
+def _same_recording(a: tuple[Path, dict], b: tuple[Path, dict], use_fingerprint: bool):
+    """Match score if a and b hold the same recording, else None (0.0 for identical
+    bytes). Files are only decoded once their hashes differ and both durations are
+    known and agree."""
+    (pa, ea), (pb, eb) = a, b
+    if ea["hash"] == eb["hash"]:
+        return 0.0
+    da, db = ea.get("duration"), eb.get("duration")
+    if not use_fingerprint or not (da and db):
+        return None
+    if abs(da - db) > _DURATION_TOLERANCE * max(da, db):
+        return None
+    fa, fb = _windows(pa, ea), _windows(pb, eb)
+    if fa is None or fb is None:
+        return None
+    score = match_score(fa, fb)
+    return score if score is not None and score <= _max_ber() else None
+
+
+def copy_rank(path: Path) -> tuple:
+    """Sort key for which copy of a recording to transcribe."""
+    return (_EXT_RANK.get(path.suffix.lower(), 9), str(path))
+
+
+def find_duplicates(paths: list[str | Path], use_fingerprint: bool = True) -> dict:
+    """Group paths that hold the same recording.
+
+    Returns {"duplicates": {dup path: {"of", "transcript", "bit_error_rate",
+    "duration"}}, "fingerprint_seconds"}. "of" is the copy that
+    gets (or got) transcribed: a recording transcribed on an earlier run
+    ("transcript" is set), else the best copy in `paths` (audio-only containers
+    first, then path order). "bit_error_rate" is the normalised match_score().
+    """
+    t0 = time.perf_counter()
+    duplicates: dict[str, dict] = {}
+    with _lock:
+        cache = _load_cache()
+        entries = []
+        for p in sorted((Path(p) for p in paths), key=copy_rank):
+            entry = _entry(p, cache)
+            if entry is not None:
+                entries.append((p.resolve(), str(p), entry))
+        known = [
+            (Path(k), e)
+            for k, e in cache.items()
+            if e.get("transcript") and Path(e["transcript"]).exists()
+        ]
+        canonical: list[tuple[Path, dict]] = []
+        for resolved, name, entry in entries:
+            match = None
+            for other in known + canonical:
+                if other[0] == resolved:
+                    continue
+                ber = _same_recording((resolved, entry), other, use_fingerprint)
+                if ber is not None:
+                    match = (other, ber)
+                    break
+            if match is None:
+                canonical.append((resolved, entry))
+                continue
+            (other_path, other_entry), ber = match
+            duplicates[name] = {
+                "of": str(other_path),
+                "transcript": other_entry.get("transcript"),
+                "bit_error_rate": round(ber, 4),
+                "duration": entry.get("duration"),
+            }
+        _save_cache(cache)
+    return {
+        "duplicates": duplicates,
+        "fingerprint_seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def transcript_for(audio_path: str | Path) -> str | None:
+    """The .txt output of a transcribed audio file (plain or compressed), if any."""
+    p = Path(audio_path)
+    found = find_output(p.parent / "transcripts" / f"{p.stem}.txt")
+    return str(found) if found else None
+
+
+def record_transcript(audio_path: str | Path, transcript: str) -> None:
+    """Remember that this recording has a transcript (for duplicates found later)."""
+    key = str(Path(audio_path).resolve())
+    with _lock:
+        cache = _load_cache()
+        if key in cache:
+            cache[key]["transcript"] = transcript
+            _save_cache(cache)
+
+
+def pointer_path(audio_path: str | Path) -> Path:
+    p = Path(audio_path)
+    return p.parent / "transcripts" / f"{p.stem}.duplicate.json"
+
+
+def link_duplicate(audio_path: str | Path, duplicate_of: str, transcript: str, ber: float) -> str:
+    """Write transcripts/<stem>.duplicate.json pointing at the existing transcript."""
+    pointer = pointer_path(audio_path)
+    pointer.parent.mkdir(parents=True, exist_ok=True)
+    pointer.write_text(
+        json.dumps(
+            {
+                "audio_file": str(audio_path),
+                "duplicate_of": duplicate_of,
+                "transcript": transcript,
+                "bit_error_rate": ber,
+                "linked_at": datetime.now().isoformat(timespec="seconds"),
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    with contextlib.suppress(OSError):
+        record_transcript(audio_path, transcript)
+    return str(pointer)
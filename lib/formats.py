@@ -1,5 +1,14 @@
 """Format conversion utilities for Whisper transcription output."""
 
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from .segments import CONFIDENCE_FIELDS, SegmentTable
+
 
 def seconds_to_srt_time(seconds: float) -> str:
     """Convert seconds to SRT time format (HH:MM:SS,mmm)."""
@@ -46,3 +55,103 @@ def to_vtt(segments: list) -> str:
         text = (seg_val(seg, "text", "") or "").strip()
         lines.append(f"{i}\n{start} --> {end}\n{text}\n")
     return "\n".join(lines)
+
+
+# ── Binary segment sidecar (.wseg) ───────────────────────────────────────
+#
+# Little-endian, every section 8-byte aligned:
+#   header   magic "WSEG", version u16, confidence mask u16, n u64,
+#            segment-text bytes u64, full-text bytes u64, meta bytes u64
+#   start    float64[n]
+#   end      float64[n]
+#   offsets  int64[n+1]   code-point offsets into the segment text
+#   conf     float64[n]   per CONFIDENCE_FIELDS bit set in the mask (NaN = missing)
+#   text     utf-8 segment texts, concatenated
+#   full     utf-8 full transcript text
+#   meta     utf-8 JSON: {"language": ..., "words": [[...], ...] | null}
+
+_WSEG_MAGIC = b"WSEG"
+_WSEG_VERSION = 1
+_WSEG_HEADER = struct.Struct("<4sHHQQQQ")
+
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+
+def write_wseg(path: str | Path, table: SegmentTable, text: str, language: str) -> None:
+    """Write a SegmentTable (plus full text and language) as a .wseg sidecar."""
+    seg_text = table.buffer.encode("utf-8")
+    full = text.encode("utf-8")
+    words = None
+    if table.words is not None:
+        words = [d.get("words") for d in table.to_dicts()]
+    meta = json.dumps({"language": language, "words": words}, ensure_ascii=False).encode("utf-8")
+    mask = 0
+    for bit, k in enumerate(CONFIDENCE_FIELDS):
+        if k in table.confidence:
+            mask |= 1 << bit
+
+    columns = [array("d", table.start), array("d", table.end), array("q", table.offsets)]
+    columns += [array("d", table.confidence[k]) for k in CONFIDENCE_FIELDS if k in table.confidence]
+    if sys.byteorder != "little":
+        for col in columns:
+            col.byteswap()
+
+    with open(path, "wb") as f:
+        f.write(
+            _WSEG_HEADER.pack(
+                _WSEG_MAGIC, _WSEG_VERSION, mask, len(table), len(seg_text), len(full), len(meta)
+            )
+        )
+        f.write(b"\0" * _pad8(_WSEG_HEADER.size))
+        for col in columns:
+            f.write(col.tobytes())
+        for blob in (seg_text, full, meta):
+            f.write(blob)
+            f.write(b"\0" * _pad8(len(blob)))
+
+
+def load_wseg(path: str | Path, use_mmap: bool = True) -> dict:
+    """Load a .wseg sidecar. Returns {"text", "language", "table": SegmentTable}.
+
+    With use_mmap the numeric columns are zero-copy memoryviews over the mapped
+    file (only the text buffers are decoded), so reloading large archives costs
+    roughly one utf-8 decode instead of a JSON parse.
+    """
+    with open(path, "rb") as f:
+        if use_mmap:
+            buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            buf = memoryview(f.read())
+
+    magic, version, mask, n, seg_len, full_len, meta_len = _WSEG_HEADER.unpack_from(buf)
+    if magic != _WSEG_MAGIC or version != _WSEG_VERSION:
+        raise ValueError(f"Not a v{_WSEG_VERSION} .wseg file: {path}")
+    pos = _WSEG_HEADER.size + _pad8(_WSEG_HEADER.size)
+
+    def column(fmt: str, count: int):
+        nonlocal pos
+        view = buf[pos : pos + 8 * count].cast(fmt)
+        pos += 8 * count
+        if sys.byteorder != "little":
+            col = array(fmt, view)
+            col.byteswap()
+            return col
+        return view
+
+    def blob(length: int) -> str:
+        nonlocal pos
+        data = str(buf[pos : pos + length], "utf-8")
+        pos += length + _pad8(length)
+        return data
+
+    start = column("d", n)
+    end = column("d", n)
+    offsets = column("q", n + 1)
+    confidence = {k: column("d", n) for bit, k in enumerate(CONFIDENCE_FIELDS) if mask & (1 << bit)}
+    seg_text = blob(seg_len)
+    full = blob(full_len)
+    meta = json.loads(blob(meta_len))
+    table = SegmentTable(start, end, offsets, seg_text, confidence, meta.get("words"))
+    return {"text": full, "language": meta.get("language", ""), "table": table}
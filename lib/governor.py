@@ -0,0 +1,253 @@
+"""Memory-aware admission control for concurrent transcription jobs.
+
+Each job's peak RSS is estimated from the model size, compute_type and audio
+duration; a job is admitted only while the estimates of running jobs plus its
+own fit the budget (a job larger than the whole budget still runs, alone).
+When a job ran without company, its measured RSS growth corrects later
+estimates for the same backend/model/compute_type. Memory held outside any
+job — a model kept loaded by a worker process between jobs — is reserved
+with reserve()/release() and counts against the budget like a running job.
+
+  WHISPER_MEMORY_BUDGET_MB=4096  (same default as scripts/batch_transcribe.sh)
+"""
+
+import contextlib
+import os
+import resource
+import sys
+import threading
+import time
+from collections.abc import Iterator
+
+from .metrics import get_metrics
+
+_MB = 1024 * 1024
+
+# Parameter counts (millions) of the Whisper checkpoints we load.
+_MODEL_PARAMS_M = {
+    "tiny": 39,
+    "base": 74,
+    "small": 244,
+    "medium": 769,
+    "large": 1550,
+    "large-v1": 1550,
+    "large-v2": 1550,
+    "large-v3": 1550,
+    "large-v3-turbo": 809,
+    "turbo": 809,
+    "distil-large-v3": 756,
+}
+
+# Resident bytes per weight. CTranslate2's "auto" on CPU resolves to an int8 variant.
+_BYTES_PER_PARAM = {
+    "int8": 1.0,
+    "int8_float32": 1.0,
+    "int8_float16": 1.0,
+    "int8_bfloat16": 1.0,
+    "auto": 1.0,
+    "float16": 2.0,
+    "bfloat16": 2.0,
+    "float32": 4.0,
+}
+
+_RUNTIME_OVERHEAD = 300 * _MB  # interpreter, CTranslate2/torch runtime, buffers
+# 16kHz float32 PCM plus log-mel features and resampling copies.
+_BYTES_PER_AUDIO_SECOND = 16000 * 4 * 3
+
+
+def _budget_bytes() -> int:
+    return int(float(os.environ.get("WHISPER_MEMORY_BUDGET_MB", "4096")) * _MB)
+
+
+def current_rss() -> int:
+    """Current resident set size in bytes (peak RSS where current is unavailable)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def model_bytes(model: str, compute_type: str) -> int:
+    """Resident size of a model's weights plus ~20% for CTranslate2/torch buffers."""
+    params = _MODEL_PARAMS_M.get(model, 1550) * 1_000_000
+    return int(params * _BYTES_PER_PARAM.get(compute_type, 4.0) * 1.2)
+
+
+def estimate_job_bytes(
+    model: str, compute_type: str, duration: float | None, model_resident: bool
+) -> int:
+    """Static peak-RSS estimate for one decode (before correction).
+
+    Unknown durations are treated as one hour so a job we cannot probe is not
+    admitted as if it were free.
+    """
+    seconds = duration if duration is not None else 3600.0
+    est = _RUNTIME_OVERHEAD + int(seconds * _BYTES_PER_AUDIO_SECOND)
+    if not model_resident:
+        est += model_bytes(model, compute_type)
+    return est
+
+
+class ResourceGovernor:
+    """Budgeted admission with FIFO waiting and measured-RSS correction."""
+
+    def __init__(self, budget_bytes: int | None = None, sample_seconds: float = 0.2):
+        self.budget_bytes = budget_bytes if budget_bytes is not None else _budget_bytes()
+        self.sample_seconds = sample_seconds
+        self._cond = threading.Condition()
+        self._running: dict[int, dict] = {}
+        self._waiting: list[dict] = []
+        self._reserved: dict[str, int] = {}
+        self._corrections: dict[str, float] = {}
+        self._next_id = 0
+        self.admitted = 0
+        self.waited_seconds = 0.0
+
+    def correction(self, key: str) -> float:
+        with self._cond:
+            return self._corrections.get(key, 1.0)
+
+    def _in_use(self) -> int:
+        return sum(t["estimate"] for t in self._running.values()) + sum(self._reserved.values())
+
+    def reserve(self, name: str, nbytes: int) -> None:
+        """Hold nbytes outside any job (e.g. a worker's resident model) until release(name)."""
+        with self._cond:
+            self._reserved[name] = nbytes
+            self._publish()
+
+    def release(self, name: str) -> None:
+        with self._cond:
+            if self._reserved.pop(name, None) is not None:
+                self._publish()
+                self._cond.notify_all()
+
+    def _publish(self) -> None:
+        """Export queue state as gauges (caller holds the condition's lock)."""
+        m = get_metrics()
+        m.set_gauge("whisper_queue_depth", len(self._waiting))
+        m.set_gauge("whisper_running_jobs", len(self._running))
+        m.set_gauge("whisper_memory_in_use_bytes", self._in_use())
+
+    @contextlib.contextmanager
+    def admit(
+        self, key: str, estimate: int, label: str = "", measure: bool = True
+    ) -> Iterator[dict]:
+        """Block until the (corrected) estimate fits, then hold it for the with-block.
+
+        measure=False skips RSS sampling (work done in a child process).
+        """
+        with self._cond:
+            ticket = {
+                "id": self._next_id,
+                "key": key,
+                "label": label,
+                "estimate": int(estimate * self._corrections.get(key, 1.0)),
+                "raw_estimate": estimate,
+                "queued_at": time.monotonic(),
+                "solo": measure,
+            }
+            self._next_id += 1
+            self._waiting.append(ticket)
+            self._publish()
+            try:
+                while not (
+                    self._waiting[0] is ticket
+                    and (
+                        not self._running
+                        or self._in_use() + ticket["estimate"] <= self.budget_bytes
+                    )
+                ):
+                    self._cond.wait()
+            except BaseException:  # interrupted while queued: don't block the tickets behind
+                self._waiting.remove(ticket)
+                self._publish()
+                self._cond.notify_all()
+                raise
+            self._waiting.pop(0)
+            waited = time.monotonic() - ticket["queued_at"]
+            self.waited_seconds += waited
+            self.admitted += 1
+            for other in self._running.values():
+                other["solo"] = False
+            ticket["solo"] = measure and not self._running
+            self._running[ticket["id"]] = ticket
+            self._publish()
+            self._cond.notify_all()
+
+        baseline = current_rss()
+        peak = [baseline]
+        done = threading.Event()
+
+        def _sample() -> None:
+            while not done.wait(self.sample_seconds):
+                peak[0] = max(peak[0], current_rss())
+
+        sampler = threading.Thread(target=_sample, daemon=True) if measure else None
+        if sampler:
+            sampler.start()
+        try:
+            yield ticket
+        finally:
+            done.set()
+            if sampler:
+                sampler.join()
+                peak[0] = max(peak[0], current_rss())
+                ticket["measured"] = peak[0] - baseline
+            with self._cond:
+                del self._running[ticket["id"]]
+                # Only a job that ran alone can be credited with the whole RSS growth.
+                if ticket["solo"] and ticket["raw_estimate"] > 0:
+                    self._learn(ticket["key"], ticket["measured"] / ticket["raw_estimate"])
+                self._publish()
+                self._cond.notify_all()
+
+    def _learn(self, key: str, ratio: float) -> None:
+        """EWMA of measured/estimated, clamped both ways: one odd run must not starve
+        the queue, and allocator reuse must not talk the estimate down to nothing."""
+        ratio = min(max(ratio, 0.5), 4.0)
+        prev = self._corrections.get(key)
+        self._corrections[key] = ratio if prev is None else 0.7 * prev + 0.3 * ratio
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "budget_mb": round(self.budget_bytes / _MB),
+                "in_use_mb": round(self._in_use() / _MB),
+                "reserved": {k: round(v / _MB) for k, v in self._reserved.items()},
+                "running": [
+                    {
+                        "label": t["label"],
+                        "key": t["key"],
+                        "estimate_mb": round(t["estimate"] / _MB),
+                    }
+                    for t in self._running.values()
+                ],
+                "queued": [
+                    {
+                        "label": t["label"],
+                        "estimate_mb": round(t["estimate"] / _MB),
+                        "waiting_seconds": round(now - t["queued_at"], 1),
+                    }
+                    for t in self._waiting
+                ],
+                "admitted": self.admitted,
+                "waited_seconds": round(self.waited_seconds, 1),
+                "corrections": {k: round(v, 3) for k, v in self._corrections.items()},
+                "rss_mb": round(current_rss() / _MB),
+            }
+
+
+_governor: ResourceGovernor | None = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> ResourceGovernor:
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor()
+        return _governor
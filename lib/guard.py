@@ -0,0 +1,61 @@
+"""Streaming hallucination-loop detection over decoded segments."""
+
+import re
+from collections import Counter, deque
+
+_STRIP = re.compile(r"[\s\W_]+")
+
+
+def _normalize(text: str) -> str:
+    """Drop whitespace and punctuation so 「はい。はい。」 and 「はい はい」 compare equal."""
+    return _STRIP.sub("", text)
+
+
+class LoopGuard:
+    """Flags a repetition loop as segments stream out of the decoder.
+
+    check(seg) returns the start time of the suspected loop, or None. Two signals:
+      - compression_ratio above compression_limit on two consecutive segments
+        (the same signal Whisper's own temperature fallback uses), or
+      - a character n-gram repeated max_ngram_repeats+ times while the text of
+        the last `window` segments has at most half as many distinct n-grams as
+        n-gram positions (i.e. it is mostly periodic).
+    """
+
+    def __init__(
+        self,
+        window: int = 8,
+        ngram: int = 6,
+        max_ngram_repeats: int = 4,
+        compression_limit: float = 2.4,
+    ):
+        self.ngram = ngram
+        self.max_ngram_repeats = max_ngram_repeats
+        self.compression_limit = compression_limit
+        self._recent: deque[dict] = deque(maxlen=window)
+        self._high_compression = 0
+
+    def check(self, seg: dict) -> float | None:
+        self._recent.append(seg)
+
+        if seg.get("compression_ratio", 0.0) > self.compression_limit:
+            self._high_compression += 1
+        else:
+            self._high_compression = 0
+        if self._high_compression >= 2:
+            return self._recent[-2]["start"]
+
+        texts = [_normalize(s.get("text", "")) for s in self._recent]
+        joined = "".join(texts)
+        n = self.ngram
+        if len(joined) < n * self.max_ngram_repeats:
+            return None
+        grams = Counter(joined[i : i + n] for i in range(len(joined) - n + 1))
+        gram, count = grams.most_common(1)[0]
+        # Looping text is periodic: few distinct n-grams relative to its length.
+        if count >= self.max_ngram_repeats and len(grams) <= grams.total() / 2:
+            for s, t in zip(self._recent, texts, strict=True):
+                if gram in t:
+                    return s["start"]
+            return self._recent[0]["start"]
+        return None
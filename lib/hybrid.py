@@ -0,0 +1,187 @@
+"""Deadline-driven batch split across the local backend and the OpenAI API.
+
+plan_split() packs files onto local worker lanes longest-first (measured local
+RTF) and sends whatever would finish after the deadline to the API (measured
+API RTF, which includes upload latency), as long as the spend cap allows and
+the file is under the API's 25MB limit. run_split() runs both queues at the same
+time; idle API workers also take files off the tail of the local queue while
+the local backlog is projected to overshoot the deadline.
+
+  WHISPER_API_PRICE_PER_MINUTE=0.006  (whisper-1 list price, USD)
+  WHISPER_LOCAL_WORKERS=1             (local decodes in flight)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+API_MAX_BYTES = 25 * 1024 * 1024
+
+
+def price_per_minute() -> float:
+    return float(os.environ.get("WHISPER_API_PRICE_PER_MINUTE", "0.006"))
+
+
+def local_workers() -> int:
+    return max(1, int(os.environ.get("WHISPER_LOCAL_WORKERS", "1")))
+
+
+def api_cost(audio_seconds: float, price_per_minute: float) -> float:
+    return audio_seconds / 60.0 * price_per_minute
+
+
+def _seconds(job: dict) -> float:
+    return job.get("duration") or 600.0  # unprobeable files are budgeted at 10 minutes
+
+
+def plan_split(
+    jobs: list[dict],
+    deadline_seconds: float,
+    local_rtf: float,
+    api_rtf: float,
+    local_workers: int = 1,
+    api_workers: int = 4,
+    spend_cap: float | None = None,
+    price_per_minute: float = 0.006,
+) -> dict:
+    """Assign each job (needs "duration" seconds or None, and "size" bytes) to local or api.
+
+    Returns {"local": [...], "api": [...], "predicted_seconds", "predicted_cost",
+    "feasible"}; local jobs are in the order the local lanes should take them.
+    """
+    local_lanes = [0.0] * max(1, local_workers)
+    api_lanes = [0.0] * max(1, api_workers)
+    local: list[dict] = []
+    api: list[dict] = []
+    cost = 0.0
+    for job in sorted(jobs, key=lambda j: -_seconds(j)):
+        d = _seconds(job)
+        li = local_lanes.index(min(local_lanes))
+        ai = api_lanes.index(min(api_lanes))
+        local_finish = local_lanes[li] + d * local_rtf
+        api_finish = api_lanes[ai] + d * api_rtf
+        c = api_cost(d, price_per_minute)
+        api_ok = job.get("size", 0) <= API_MAX_BYTES and (
+            spend_cap is None or cost + c <= spend_cap
+        )
+        if api_ok and local_finish > deadline_seconds and api_finish < local_finish:
+            api_lanes[ai] = api_finish
+            api.append({**job, "estimated_seconds": round(d * api_rtf, 1)})
+            cost += c
+        else:
+            local_lanes[li] = local_finish
+            local.append({**job, "estimated_seconds": round(d * local_rtf, 1)})
+    predicted = max(max(local_lanes), max(api_lanes))
+    return {
+        "local": local,
+        "api": api,
+        "predicted_seconds": round(predicted, 1),
+        "predicted_cost": round(cost, 4),
+        "feasible": predicted <= deadline_seconds,
+    }
+
+
+def run_split(
+    split: dict,
+    transcribe_fn: Callable[..., dict],
+    deadline_seconds: float,
+    local_workers: int = 1,
+    api_workers: int = 4,
+    spend_cap: float | None = None,
+    price_per_minute: float = 0.006,
+    poll_seconds: float = 1.0,
+    **transcribe_kwargs,
+) -> dict:
+    """Run a plan_split() result; returns {"results", "summary"}.
+
+    transcribe_fn(audio_path=..., backend="local"|"api", **transcribe_kwargs) is
+    lib.core.transcribe in production. Idle API workers re-check the local
+    backlog every poll_seconds until the local queue is empty.
+    """
+    lock = threading.Lock()
+    local_q = deque(split["local"])
+    api_q = deque(split["api"])
+    local_workers = max(1, local_workers)
+    results: list[dict] = []
+    spent = [split["predicted_cost"]]  # committed API spend (planned + stolen)
+    totals = {
+        "local": {"files": 0, "audio_seconds": 0.0},
+        "api": {"files": 0, "audio_seconds": 0.0},
+        "stolen": 0,
+    }
+    started = time.monotonic()
+
+    def _steal() -> dict | None:
+        """Take the shortest queued local job if the local backlog will overshoot."""
+        if not local_q:
+            return None
+        remaining = deadline_seconds - (time.monotonic() - started)
+        backlog = sum(j["estimated_seconds"] for j in local_q) / local_workers
+        job = local_q[-1]
+        c = api_cost(_seconds(job), price_per_minute)
+        if backlog <= remaining or job.get("size", 0) > API_MAX_BYTES:
+            return None
+        if spend_cap is not None and spent[0] + c > spend_cap:
+            return None
+        spent[0] += c
+        totals["stolen"] += 1
+        return local_q.pop()
+
+    def _worker(backend: str) -> None:
+        while True:
+            with lock:
+                if backend == "local":
+                    job = local_q.popleft() if local_q else None
+                else:
+                    job = api_q.popleft() if api_q else _steal()
+            if job is None:
+                if backend == "api" and local_q:
+                    time.sleep(poll_seconds)  # local may still fall behind; look again
+                    continue
+                return
+            t0 = time.monotonic()
+            try:
+                result = transcribe_fn(
+                    audio_path=job["audio_path"], backend=backend, **transcribe_kwargs
+                )
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            result.update(
+                {
+                    "meeting": job.get("meeting", ""),
+                    "assigned_backend": backend,
+                    "estimated_seconds": job["estimated_seconds"],
+                    "wall_seconds": round(time.monotonic() - t0, 2),
+                }
+            )
+            with lock:
+                results.append(result)
+                if result.get("status") == "success":
+                    totals[backend]["files"] += 1
+                    totals[backend]["audio_seconds"] += _seconds(job)
+
+    threads = [threading.Thread(target=_worker, args=("local",)) for _ in range(local_workers)] + [
+        threading.Thread(target=_worker, args=("api",)) for _ in range(max(1, api_workers))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    wall = time.monotonic() - started
+    cost = api_cost(totals["api"]["audio_seconds"], price_per_minute)
+    for side in ("local", "api"):
+        totals[side]["audio_seconds"] = round(totals[side]["audio_seconds"], 1)
+    summary = {
+        "deadline_seconds": round(deadline_seconds, 1),
+        "wall_seconds": round(wall, 1),
+        "met_deadline": wall <= deadline_seconds,
+        "predicted_seconds": split["predicted_seconds"],
+        "planned_feasible": split["feasible"],
+        **totals,
+        "cost_usd": round(cost, 4),
+        "spend_cap_usd": spend_cap,
+    }
+    return {"results": results, "summary": summary}
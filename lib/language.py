@@ -0,0 +1,200 @@
+"""Language probe for language="auto".
+
+Instead of letting the full decode auto-detect (or assuming "ja"), a few short
+windows spread over the file are decoded to 16kHz PCM with PyAV seeks and run
+through faster-whisper's language detection. Per-window probabilities are
+summed and the top language wins. Results are cached per source file and per
+directory: a confident result for one recording in a meeting directory is
+reused for its siblings without probing them.
+
+  WHISPER_LANGUAGE_PROBE_WINDOWS=3
+  WHISPER_LANGUAGE_PROBE_SECONDS=10
+  WHISPER_LANGUAGE_CACHE=~/.cache/whisper-mcp/languages.json (env override)
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .metrics import get_metrics
+
+# Directory results at or above this probability are reused for sibling files.
+_DIR_CONFIDENCE = 0.8
+
+_lock = threading.Lock()
+
+
+def cache_path() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_LANGUAGE_CACHE",
+            str(Path.home() / ".cache" / "whisper-mcp" / "languages.json"),
+        )
+    ).expanduser()
+
+
+def _windows() -> int:
+    return max(1, int(os.environ.get("WHISPER_LANGUAGE_PROBE_WINDOWS", "3")))
+
+
+def _window_seconds() -> float:
+    return float(os.environ.get("WHISPER_LANGUAGE_PROBE_SECONDS", "10"))
+
+
+def probe_audio_seconds() -> float:
+    """Audio one probe decodes (for admission estimates)."""
+    return _windows() * _window_seconds()
+
+
+def _load_cache() -> dict:
+    try:
+        return json.loads(cache_path().read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {"files": {}, "dirs": {}}
+
+
+def _store(path: Path, mtime: float, entry: dict) -> None:
+    with _lock:
+        cache = _load_cache()
+        cache.setdefault("files", {})[str(path)] = {**entry, "mtime": mtime}
+        if entry["probability"] >= _DIR_CONFIDENCE:
+            cache.setdefault("dirs", {})[str(path.parent)] = {**entry, "source": path.name}
+        p = cache_path()
+        try:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            tmp = p.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp.replace(p)
+        except OSError:
+            pass
+
+
+def cached_language(path: str | Path) -> dict | None:
+    """Cached probe for this file (same mtime), else a confident one for its directory."""
+    p = Path(path).expanduser().resolve()
+    cache = _load_cache()
+    hit = cache.get("files", {}).get(str(p))
+    try:
+        if hit and hit.get("mtime") == p.stat().st_mtime:
+            return {**hit, "cached": "file"}
+    except OSError:
+        pass
+    hit = cache.get("dirs", {}).get(str(p.parent))
+    return {**hit, "cached": "directory"} if hit else None
+
+
+def lookup_language(path: str | Path) -> dict | None:
+    """cached_language(), counted in the language cache metrics."""
+    hit = cached_language(path)
+    get_metrics().inc(
+        "whisper_cache_requests_total", cache="language", result="hit" if hit else "miss"
+    )
+    return hit
+
+
+def window_starts(duration: float, windows: int, seconds: float) -> list[float]:
+    """Window start offsets spread over the file (10%..90%), skipping intros/outros."""
+    if duration <= seconds * windows:
+        return [0.0]
+    if windows == 1:
+        return [max(0.0, duration / 2 - seconds / 2)]
+    span = duration * 0.8 - seconds
+    return [round(duration * 0.1 + span * i / (windows - 1), 2) for i in range(windows)]
+
+
+def _read_window(path: str, start: float, seconds: float):
+    """16kHz mono float32 PCM for [start, start + seconds), decoded via PyAV seek."""
+    import av
+    import numpy as np
+
+    chunks = []
+    need = int(seconds * 16000)
+    got = 0
+    with av.open(path) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=16000)
+        if start > 0:
+            container.seek(int(start * av.time_base), any_frame=False, backward=True)
+        for frame in container.decode(stream):
+            if frame.time is not None and frame.time + frame.samples / frame.sample_rate < start:
+                continue
+            for out in resampler.resample(frame):
+                arr = out.to_ndarray().reshape(-1)
+                chunks.append(arr)
+                got += len(arr)
+            if got >= need:
+                break
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return (np.concatenate(chunks)[:need].astype(np.float32)) / 32768.0
+
+
+def _detect(model, audio) -> tuple[str, float, dict]:
+    """(language, probability, all probabilities) for one window."""
+    if hasattr(model, "detect_language"):  # faster-whisper >= 1.1
+        try:
+            lang, prob, all_probs = model.detect_language(audio)
+            return lang, prob, dict(all_probs or [])
+        except TypeError:
+            pass
+    # Older releases: transcribe() detects up front; the segment generator is never consumed.
+    _, info = model.transcribe(audio, language=None, vad_filter=False)
+    return info.language, info.language_probability, dict(info.all_language_probs or [])
+
+
+def probe_language(
+    audio_path: str | Path,
+    model,
+    duration: float | None,
+    windows: int = 0,
+    window_seconds: float = 0,
+    use_cache: bool = True,
+) -> dict:
+    """Detect the language from a few short windows.
+
+    Returns {"language", "probability", "windows", "probe_seconds",
+    "detection_seconds_per_window", "cached"}. detection_seconds_per_window is the
+    mean measured cost of one detection, without the window's audio read.
+    """
+    p = Path(audio_path).expanduser().resolve()
+    if use_cache:
+        hit = lookup_language(p)
+        if hit:
+            return hit
+    windows = windows or _windows()
+    window_seconds = window_seconds or _window_seconds()
+
+    t0 = time.perf_counter()
+    scores: dict[str, float] = {}
+    per_window = []
+    detect_seconds = 0.0
+    starts = window_starts(duration or 0.0, windows, window_seconds)
+    for start in starts:
+        audio = _read_window(str(p), start, window_seconds)
+        if not len(audio):
+            continue
+        t_detect = time.perf_counter()
+        lang, prob, all_probs = _detect(model, audio)
+        detect_seconds += time.perf_counter() - t_detect
+        for code, pr in (all_probs or {lang: prob}).items():
+            scores[code] = scores.get(code, 0.0) + pr
+        per_window.append({"start": start, "language": lang, "probability": round(prob, 3)})
+    probe_seconds = time.perf_counter() - t0
+    if not scores:
+        raise RuntimeError(f"Language probe read no audio from {p}")
+
+    language = max(scores, key=scores.get)
+    probability = scores[language] / max(1, len(per_window))
+    entry = {
+        "language": language,
+        "probability": round(probability, 3),
+        "windows": per_window,
+        "probe_seconds": round(probe_seconds, 3),
+        "detection_seconds_per_window": round(detect_seconds / len(per_window), 3),
+    }
+    with contextlib.suppress(OSError):
+        _store(p, p.stat().st_mtime, entry)
+    return {**entry, "cached": None}
@@ -0,0 +1,52 @@
+"""Audio container helpers (metadata only — no full decode)."""
+
+import shutil
+import subprocess
+import wave
+from pathlib import Path
+
+
+def probe_duration(path: str | Path) -> float | None:
+    """Return duration in seconds from container metadata, or None if unknown.
+
+    WAV headers are read with the stdlib; everything else goes through PyAV
+    (installed with faster-whisper), or ffprobe when PyAV is missing. No audio
+    samples are decoded.
+    """
+    p = Path(path)
+    if p.suffix.lower() == ".wav":
+        try:
+            with wave.open(str(p), "rb") as w:
+                return w.getnframes() / w.getframerate()
+        except (wave.Error, EOFError, OSError):
+            pass
+    try:
+        import av
+    except ImportError:
+        return _ffprobe_duration(p)
+    try:
+        with av.open(str(p)) as container:
+            if container.duration:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration and stream.time_base:
+                return float(stream.duration * stream.time_base)
+    except Exception:
+        return None
+    return None
+
+
+def _ffprobe_duration(p: Path) -> float | None:
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    try:
+        proc = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(p)],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        return float(proc.stdout.strip())
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None
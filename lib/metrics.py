@@ -0,0 +1,216 @@
+"""In-process metrics: lifetime counters, rolling-window counters, histograms, gauges.
+
+render_prometheus() emits the Prometheus text exposition format (0.0.4).
+Rolling counters are exported as gauges named <counter>_window with a
+window="<seconds>" label, so one scrape shows both totals and recent activity.
+
+  WHISPER_METRICS_WINDOW_SECONDS=3600
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+
+# RTF (wall / audio seconds) and per-job wall-clock buckets.
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+SECONDS_BUCKETS = (1, 5, 15, 60, 300, 900, 3600)
+
+_HELP = {
+    "whisper_jobs_total": ("counter", "Transcription jobs by backend and outcome."),
+    "whisper_audio_seconds_total": ("counter", "Audio seconds transcribed."),
+    "whisper_errors_total": ("counter", "Errors by stage."),
+    "whisper_cache_requests_total": ("counter", "Cache lookups by cache and result."),
+    "whisper_rtf": ("histogram", "Real-time factor (wall seconds / audio seconds) per job."),
+    "whisper_job_seconds": ("histogram", "Wall-clock seconds per transcription job."),
+    "whisper_queue_depth": ("gauge", "Jobs waiting for memory admission."),
+    "whisper_running_jobs": ("gauge", "Jobs admitted and decoding."),
+    "whisper_memory_in_use_bytes": ("gauge", "Estimated RSS held by admitted jobs."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _window_seconds() -> float:
+    return float(os.environ.get("WHISPER_METRICS_WINDOW_SECONDS", "3600"))
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, le in enumerate(self.buckets):
+            if value <= le:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self, window_seconds: float | None = None, clock=time.monotonic):
+        self.window_seconds = window_seconds if window_seconds is not None else _window_seconds()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._events: deque[tuple[float, str, Labels, float]] = deque()
+        self._histograms: dict[tuple[str, Labels], _Histogram] = {}
+        self._gauges: dict[tuple[str, Labels], float] = {}
+        self.started = time.time()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, _labels(labels))
+        now = self._clock()
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+            self._events.append((now, name, key[1], value))
+            self._prune(now)
+
+    def observe(self, name: str, value: float, buckets: tuple = RTF_BUCKETS, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    def counters(self) -> dict[tuple[str, Labels], float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def merge_counters(self, delta: dict[tuple[str, Labels], float]) -> None:
+        """Add counter increments recorded elsewhere (a supervised worker process)."""
+        for (name, labels), value in delta.items():
+            self.inc(name, value, **dict(labels))
+
+    def window_counters(self) -> dict[tuple[str, Labels], float]:
+        with self._lock:
+            self._prune(self._clock())
+            out: dict[tuple[str, Labels], float] = {}
+            for _, name, labels, value in self._events:
+                out[(name, labels)] = out.get((name, labels), 0.0) + value
+            return out
+
+    def cache_hit_rates(self) -> dict[str, float]:
+        with self._lock:
+            hits: dict[str, list[float]] = {}
+            for (name, labels), v in self._counters.items():
+                if name != "whisper_cache_requests_total":
+                    continue
+                d = dict(labels)
+                pair = hits.setdefault(d.get("cache", "?"), [0.0, 0.0])
+                pair[0 if d.get("result") == "hit" else 1] += v
+            return {c: round(h / (h + m), 4) for c, (h, m) in hits.items() if h + m}
+
+    def snapshot(self) -> dict:
+        """JSON-friendly view: totals, window totals, histograms (count/sum/mean), gauges."""
+
+        def _flat(d: dict) -> list[dict]:
+            return [
+                {"name": n, **dict(lb), "value": round(v, 3)} for (n, lb), v in sorted(d.items())
+            ]
+
+        window = self.window_counters()
+        with self._lock:
+            hists = [
+                {
+                    "name": n,
+                    **dict(lb),
+                    "count": h.count,
+                    "sum": round(h.sum, 3),
+                    "mean": round(h.sum / h.count, 4) if h.count else None,
+                }
+                for (n, lb), h in sorted(self._histograms.items())
+            ]
+            totals = _flat(self._counters)
+            gauges = _flat(self._gauges)
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "window_seconds": self.window_seconds,
+            "counters": totals,
+            "window": _flat(window),
+            "histograms": hists,
+            "gauges": gauges,
+            "cache_hit_rates": self.cache_hit_rates(),
+        }
+
+    def render_prometheus(self) -> str:
+        window = self.window_counters()
+        lines: list[str] = []
+        with self._lock:
+            names = sorted(
+                {n for n, _ in self._counters}
+                | {n for n, _ in self._histograms}
+                | {n for n, _ in self._gauges}
+            )
+            for name in names:
+                kind, help_text = _HELP.get(name, ("untyped", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for (n, lb), v in sorted(self._counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_fmt_labels(lb)} {_num(v)}")
+                for (n, lb), v in sorted(self._gauges.items()):
+                    if n == name:
+                        lines.append(f"{name}{_fmt_labels(lb)} {_num(v)}")
+                for (n, lb), h in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    for le, c in zip(h.buckets, h.counts, strict=True):
+                        lines.append(f"{name}_bucket{_fmt_labels(lb + (('le', _num(le)),))} {c}")
+                    lines.append(f"{name}_bucket{_fmt_labels(lb + (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{name}_sum{_fmt_labels(lb)} {_num(h.sum)}")
+                    lines.append(f"{name}_count{_fmt_labels(lb)} {h.count}")
+            win = f"{self.window_seconds:g}"
+            win_label = (("window", win),)
+            for name in sorted({n for n, _ in window}):
+                lines.append(f"# HELP {name}_window {name} over the last {win}s.")
+                lines.append(f"# TYPE {name}_window gauge")
+                for (n, lb), v in sorted(window.items()):
+                    if n == name:
+                        lines.append(f"{name}_window{_fmt_labels(lb + win_label)} {_num(v)}")
+        return "\n".join(lines) + "\n"
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    esc = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, esc, strict=True)) + "}"
+
+
+def _num(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return str(int(v)) if v == int(v) and abs(v) < 1e15 else repr(float(v))
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
@@ -0,0 +1,128 @@
+"""Pack short recordings into shared batched faster-whisper decodes.
+
+Each short file (≤ one 30s Whisper window) is laid end to end on a single
+16kHz timeline and marked with its own clip_timestamps entry, so
+BatchedInferencePipeline decodes many memos per call without any clip
+straddling two files. Segments are then split back per file by offset.
+
+  WHISPER_PACK=1                 (process_voice_memos packs short memos)
+  WHISPER_PACK_MAX_SECONDS=30    (longer files are transcribed individually)
+  WHISPER_PACK_CLIPS=64          (files per packed decode call)
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+_SAMPLE_RATE = 16000
+_WINDOW_SECONDS = 30.0
+
+
+def pack_enabled() -> bool:
+    return os.environ.get("WHISPER_PACK", "0") == "1"
+
+
+def pack_max_seconds() -> float:
+    return min(float(os.environ.get("WHISPER_PACK_MAX_SECONDS", "30")), _WINDOW_SECONDS)
+
+
+def _pack_clips() -> int:
+    return int(os.environ.get("WHISPER_PACK_CLIPS", "64"))
+
+
+@dataclass
+class _Clip:
+    """One file's placement on the packed timeline (seconds)."""
+
+    path: Path
+    offset: float
+    duration: float
+
+
+def plan_packs(files: list[tuple[Path, float]], max_clips: int) -> list[list[_Clip]]:
+    """Group (path, duration) pairs into packs of ≤ max_clips with timeline offsets."""
+    packs: list[list[_Clip]] = []
+    for i in range(0, len(files), max_clips):
+        offset = 0.0
+        pack = []
+        for path, duration in files[i : i + max_clips]:
+            pack.append(_Clip(path, offset, duration))
+            offset += duration
+        packs.append(pack)
+    return packs
+
+
+def split_segments(segments: list[dict], clips: list[_Clip]) -> dict[Path, list[dict]]:
+    """Assign packed-timeline segments to clips by midpoint and rebase their times."""
+    out: dict[Path, list[dict]] = {c.path: [] for c in clips}
+    for seg in segments:
+        mid = (seg["start"] + seg["end"]) / 2
+        for c in clips:
+            if c.offset <= mid <= c.offset + c.duration:
+                out[c.path].append(
+                    {
+                        **seg,
+                        "start": max(0.0, seg["start"] - c.offset),
+                        "end": min(c.duration, seg["end"] - c.offset),
+                    }
+                )
+                break
+    return out
+
+
+def transcribe_packed(
+    files: list[tuple[Path, float]], language: str, prompt: str, batch_size: int = 8
+) -> dict:
+    """Decode short files in shared batches. Returns {path: _WhisperResult}.
+
+    Raises RuntimeError when the installed faster-whisper has no batched pipeline;
+    callers fall back to per-file transcription.
+    """
+    import numpy as np
+    from faster_whisper import decode_audio
+
+    from .core import (
+        _faster_model,
+        _faster_whisper_settings,
+        _get_batched_pipeline,
+        _segment_dict,
+        _WhisperResult,
+    )
+
+    pipeline = _get_batched_pipeline()
+    if pipeline is None:
+        raise RuntimeError("faster-whisper BatchedInferencePipeline unavailable")
+
+    results: dict = {}
+    for pack in plan_packs(files, _pack_clips()):
+        audio = [decode_audio(str(c.path), sampling_rate=_SAMPLE_RATE) for c in pack]
+        # Re-derive offsets from decoded lengths so the timeline is sample-exact.
+        offset = 0
+        clip_timestamps = []
+        for c, a in zip(pack, audio, strict=True):
+            c.offset, c.duration = offset / _SAMPLE_RATE, len(a) / _SAMPLE_RATE
+            clip_timestamps.append({"start": offset, "end": offset + len(a)})  # samples
+            offset += len(a)
+
+        kwargs: dict = {
+            "language": language,
+            "beam_size": _faster_whisper_settings(_faster_model())["beam_size"],
+            "batch_size": batch_size,
+            "vad_filter": False,
+            "clip_timestamps": clip_timestamps,
+        }
+        if prompt:
+            kwargs["initial_prompt"] = prompt
+        segments_raw, info = pipeline.transcribe(np.concatenate(audio), **kwargs)
+        per_file = split_segments([_segment_dict(s) for s in segments_raw], pack)
+
+        for c in pack:
+            segs = per_file[c.path]
+            results[c.path] = _WhisperResult(
+                text=" ".join(s["text"] for s in segs),
+                segments=segs,
+                language=info.language,
+                duration=c.duration,
+                decode_mode=f"packed:{len(pack)}",
+            )
+    return results
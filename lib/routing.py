@@ -0,0 +1,133 @@
+"""Backend health tracking and a circuit breaker for local_first routing.
+
+Backend calls record their outcome here: API calls always, local calls when
+local_first consulted the breaker (an explicit backend="local" does not).
+Only backend-health failures count (model load, crash, timeout, API 5xx or
+connection errors); a bad input file or a quarantined file does not. After
+WHISPER_CIRCUIT_FAILURES consecutive local failures the local circuit opens
+and local_first goes straight to the API; after WHISPER_CIRCUIT_RESET_SECONDS
+one call is let through as a half-open probe. If it succeeds the circuit closes,
+if it fails the circuit re-opens for another reset period.
+
+  WHISPER_CIRCUIT_FAILURES=3
+  WHISPER_CIRCUIT_RESET_SECONDS=300
+"""
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _failure_threshold() -> int:
+    return max(1, int(os.environ.get("WHISPER_CIRCUIT_FAILURES", "3")))
+
+
+def _reset_seconds() -> float:
+    return float(os.environ.get("WHISPER_CIRCUIT_RESET_SECONDS", "300"))
+
+
+class CircuitBreaker:
+    """closed → open after `failure_threshold` consecutive failures; open → half_open
+    after `reset_seconds`, admitting a single probe call."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.last_error = ""
+        self.last_failure_at = ""
+        self.last_success_at = ""
+
+    def allow(self) -> bool:
+        """May a call go to this backend now? A True in half_open claims the probe."""
+        with self._lock:
+            if self.state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.last_success_at = datetime.now().isoformat(timespec="seconds")
+            self.state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, error: BaseException | str = "") -> None:
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:300]
+            self.last_failure_at = datetime.now().isoformat(timespec="seconds")
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """The call's outcome says nothing about the backend (e.g. a corrupt input):
+        record nothing, but free the half-open probe slot if the call held it."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.reset_seconds - (self._clock() - self._opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "successes": self.successes,
+                "failures": self.failures,
+                "short_circuited": self.short_circuited,
+                "last_error": self.last_error or None,
+                "last_failure_at": self.last_failure_at or None,
+                "last_success_at": self.last_success_at or None,
+                "probe_in_seconds": round(retry_in, 1) if retry_in is not None else None,
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, _failure_threshold(), _reset_seconds())
+        return _breakers[name]
+
+
+def routing_status() -> dict:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
@@ -0,0 +1,234 @@
+"""Duration-aware job ordering and ETAs for batch runs.
+
+Durations come from container metadata (lib.media.probe_duration) and are
+cached by path, size and mtime, so re-scanning a large Meetings tree costs a
+stat per file. Observed real-time factors (wall seconds / audio seconds) are
+kept as an EWMA per backend/model and turn durations into ETAs.
+
+Policies:
+  shortest — shortest audio first (unknown durations last); quick memos
+             never wait behind a 3-hour meeting
+  oldest   — oldest file (mtime) first
+  deadline — earliest deadline first, deadline = mtime + WHISPER_TURNAROUND_HOURS;
+             jobs that would be late anyway go after the ones that can still make it
+  path     — sorted path order (the previous behaviour)
+
+  WHISPER_SCHEDULE=shortest
+  WHISPER_TURNAROUND_HOURS=24
+  WHISPER_SCHEDULE_STATE=~/.cache/whisper-mcp/schedule.json (env override)
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .media import probe_duration
+from .metrics import get_metrics
+
+POLICIES = ("shortest", "oldest", "deadline", "path")
+
+# Used until a backend has history of its own.
+_DEFAULT_RTF = {"api": 0.1, "local:faster_whisper": 0.15, "local": 0.5}
+_RTF_ALPHA = 0.3
+
+_lock = threading.Lock()
+_state: dict | None = None
+_dirty = False
+
+
+def state_path() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_SCHEDULE_STATE",
+            str(Path.home() / ".cache" / "whisper-mcp" / "schedule.json"),
+        )
+    ).expanduser()
+
+
+def _policy() -> str:
+    policy = os.environ.get("WHISPER_SCHEDULE", "shortest")
+    return policy if policy in POLICIES else "shortest"
+
+
+def _turnaround_seconds() -> float:
+    return float(os.environ.get("WHISPER_TURNAROUND_HOURS", "24")) * 3600
+
+
+def _load() -> dict:
+    global _state
+    if _state is None:
+        try:
+            _state = json.loads(state_path().read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            _state = {}
+        _state.setdefault("durations", {})
+        _state.setdefault("rtf", {})
+    return _state
+
+
+def _save() -> None:
+    """Write the state file atomically (caller holds _lock)."""
+    global _dirty
+    if not _dirty or _state is None:
+        return
+    p = state_path()
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(_state, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(p)
+        _dirty = False
+    except OSError:
+        pass  # a cache; the next run re-probes
+
+
+def duration_of(path: str | Path) -> float | None:
+    """Cached probe_duration(); the cache entry is keyed by size and mtime."""
+    global _dirty
+    p = Path(path)
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    key = str(p.resolve())
+    with _lock:
+        hit = _load()["durations"].get(key)
+    if hit and hit[0] == st.st_size and hit[1] == st.st_mtime:
+        get_metrics().inc("whisper_cache_requests_total", cache="duration", result="hit")
+        return hit[2]
+    get_metrics().inc("whisper_cache_requests_total", cache="duration", result="miss")
+    d = probe_duration(p)
+    with _lock:
+        _load()["durations"][key] = [st.st_size, st.st_mtime, d]
+        _dirty = True
+    return d
+
+
+def backend_key(used_backend: str) -> str:
+    """ "local:faster_whisper:large-v3 (...)" → "local:faster_whisper:large-v3"."""
+    return used_backend.split(" (", 1)[0].strip()
+
+
+def rtf_for(key: str) -> float:
+    """Observed RTF for a backend key, else the default for its family."""
+    with _lock:
+        entry = _load()["rtf"].get(key)
+    if entry:
+        return entry["rtf"]
+    for prefix in sorted(_DEFAULT_RTF, key=len, reverse=True):
+        if key.startswith(prefix):
+            return _DEFAULT_RTF[prefix]
+    return _DEFAULT_RTF["local"]
+
+
+def record_rtf(key: str, audio_seconds: float | None, wall_seconds: float) -> None:
+    """Fold one finished job into the backend's RTF history."""
+    global _dirty
+    if not audio_seconds or audio_seconds <= 0:
+        return
+    rtf = wall_seconds / audio_seconds
+    with _lock:
+        hist = _load()["rtf"]
+        entry = hist.get(key)
+        if entry is None:
+            hist[key] = {"rtf": rtf, "samples": 1}
+        else:
+            entry["rtf"] = (1 - _RTF_ALPHA) * entry["rtf"] + _RTF_ALPHA * rtf
+            entry["samples"] += 1
+        _dirty = True
+        _save()
+
+
+def rtf_history() -> dict:
+    with _lock:
+        return {k: dict(v) for k, v in _load()["rtf"].items()}
+
+
+def plan_jobs(
+    jobs: list[dict],
+    key: str,
+    policy: str = "",
+    now: float | None = None,
+    parallel: int = 1,
+) -> dict:
+    """Order jobs and attach ETAs.
+
+    Each job needs "audio_path" (other keys are kept). Adds "duration",
+    "estimated_seconds", "eta_seconds" (finish offset from now, with `parallel`
+    jobs in flight) and "deadline"/"late" under the deadline policy. Returns
+    {"policy", "jobs", "estimated_total_seconds", "rtf"}.
+    """
+    policy = policy or _policy()
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown schedule policy: {policy} (choose from {', '.join(POLICIES)})")
+    now = time.time() if now is None else now
+    rtf = rtf_for(key)
+    # Unknown durations are estimated at the median of the known ones.
+    durations = [duration_of(j["audio_path"]) for j in jobs]
+    known = sorted(d for d in durations if d)
+    fallback = known[len(known) // 2] if known else 600.0
+    planned = []
+    for job, d in zip(jobs, durations, strict=True):
+        try:
+            mtime = Path(job["audio_path"]).stat().st_mtime
+        except OSError:
+            mtime = now
+        planned.append(
+            {
+                **job,
+                "duration": round(d, 1) if d else None,
+                "estimated_seconds": round((d or fallback) * rtf, 1),
+                "_mtime": mtime,
+            }
+        )
+    with _lock:
+        _save()
+
+    turnaround = _turnaround_seconds()
+    if policy == "shortest":
+        planned.sort(key=lambda j: (j["duration"] is None, j["duration"] or 0, j["audio_path"]))
+    elif policy in ("oldest", "deadline"):
+        planned.sort(key=lambda j: (j["_mtime"], j["audio_path"]))
+        if policy == "deadline":
+            planned = _defer_lost_causes(planned, now, turnaround, parallel)
+    else:
+        planned.sort(key=lambda j: j["audio_path"])
+
+    lanes = [0.0] * max(1, parallel)  # each job starts on the first lane to free up
+    for job in planned:
+        lane = lanes.index(min(lanes))
+        lanes[lane] += job["estimated_seconds"]
+        finish = lanes[lane]
+        job["eta_seconds"] = round(finish, 1)
+        mtime = job.pop("_mtime")
+        if policy == "deadline":
+            job["deadline"] = _iso(mtime + turnaround)
+            job["late"] = now + finish > mtime + turnaround
+    return {
+        "policy": policy,
+        "jobs": planned,
+        "estimated_total_seconds": round(max(lanes), 1),
+        "rtf": round(rtf, 4),
+    }
+
+
+def _defer_lost_causes(
+    edf: list[dict], now: float, turnaround: float, parallel: int = 1
+) -> list[dict]:
+    """Keep EDF order for jobs that can finish in time; move the rest to the end."""
+    on_time, late = [], []
+    lanes = [0.0] * max(1, parallel)
+    for job in edf:
+        lane = lanes.index(min(lanes))
+        if now + lanes[lane] + job["estimated_seconds"] <= job["_mtime"] + turnaround:
+            on_time.append(job)
+            lanes[lane] += job["estimated_seconds"]
+        else:
+            late.append(job)
+    return on_time + late
+
+
+def _iso(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts))
@@ -0,0 +1,242 @@
+"""Full-text search over transcripts (SQLite FTS5, trigram tokenizer).
+
+The trigram tokenizer needs no word segmentation, so Japanese substrings of
+three or more characters match directly; shorter queries fall back to a scan
+(FTS5 trigram LIKE returns no rows below three characters on older SQLite).
+Each transcript's .json output (plain, .json.gz or .json.zst) is indexed
+segment by segment with its meeting name, date and timestamps. Re-indexing is
+skipped while the file's mtime is unchanged.
+
+  WHISPER_SEARCH_DB=~/.cache/whisper-mcp/search.db (env override)
+  WHISPER_SEARCH_INDEX=1  (transcribe() indexes new outputs; 0 disables)
+"""
+
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from .formats import seconds_to_vtt_time
+from .storage import glob_outputs, load_transcript_json, variants
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    meeting TEXT NOT NULL,
+    date TEXT NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text,
+    meeting,
+    transcript_id UNINDEXED,
+    start UNINDEXED,
+    "end" UNINDEXED,
+    tokenize = 'trigram'
+);
+"""
+
+_DATE_RE = re.compile(r"(20\d{2})(\d{2})(\d{2})")
+
+
+def db_path() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_SEARCH_DB", str(Path.home() / ".cache" / "whisper-mcp" / "search.db")
+        )
+    ).expanduser()
+
+
+def index_enabled() -> bool:
+    return os.environ.get("WHISPER_SEARCH_INDEX", "1") != "0"
+
+
+def _connect() -> sqlite3.Connection:
+    p = db_path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(p, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _meeting_and_date(json_path: Path) -> tuple[str, str]:
+    """Meeting = directory holding transcripts/ (or the file stem); date from YYYYMMDD."""
+    meeting_dir = json_path.parent.parent if json_path.parent.name == "transcripts" else None
+    meeting = meeting_dir.name if meeting_dir else variants(json_path)[0].stem
+    m = _DATE_RE.search(meeting) or _DATE_RE.search(str(json_path))
+    if m:
+        date = f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+    else:
+        date = datetime.fromtimestamp(json_path.stat().st_mtime).strftime("%Y-%m-%d")
+    return meeting, date
+
+
+def _drop(conn: sqlite3.Connection, path: str) -> None:
+    row = conn.execute("SELECT id FROM transcripts WHERE path = ?", (path,)).fetchone()
+    if row:
+        conn.execute("DELETE FROM segments WHERE transcript_id = ?", (row[0],))
+        conn.execute("DELETE FROM transcripts WHERE id = ?", (row[0],))
+
+
+def _index_file(conn: sqlite3.Connection, json_path: Path) -> bool:
+    """(Re)index one transcript .json. Returns False if it was already up to date."""
+    path = str(json_path.resolve())
+    mtime = json_path.stat().st_mtime
+    row = conn.execute("SELECT id, mtime FROM transcripts WHERE path = ?", (path,)).fetchone()
+    if row and row[1] == mtime:
+        return False
+
+    data = load_transcript_json(json_path)
+    meeting, date = _meeting_and_date(json_path)
+    for other in variants(json_path.resolve()):  # re-written with another compression
+        if str(other) != path:
+            _drop(conn, str(other))
+    if row:
+        conn.execute("DELETE FROM segments WHERE transcript_id = ?", (row[0],))
+        conn.execute(
+            "UPDATE transcripts SET meeting = ?, date = ?, mtime = ? WHERE id = ?",
+            (meeting, date, mtime, row[0]),
+        )
+        tid = row[0]
+    else:
+        cur = conn.execute(
+            "INSERT INTO transcripts (path, meeting, date, mtime) VALUES (?, ?, ?, ?)",
+            (path, meeting, date, mtime),
+        )
+        tid = cur.lastrowid
+    conn.executemany(
+        'INSERT INTO segments (text, meeting, transcript_id, start, "end") VALUES (?, ?, ?, ?, ?)',
+        [
+            (seg.get("text", ""), meeting, tid, seg.get("start", 0.0), seg.get("end", 0.0))
+            for seg in data.get("segments", [])
+            if seg.get("text")
+        ],
+    )
+    return True
+
+
+def index_transcript(json_path: str | Path) -> bool:
+    """Add or refresh one transcript in the index. Returns True if it was (re)indexed."""
+    conn = _connect()
+    try:
+        with conn:
+            return _index_file(conn, Path(json_path))
+    finally:
+        conn.close()
+
+
+def rebuild_index(root_dir: str) -> dict:
+    """Index every transcripts/*.json under root_dir and drop entries whose files vanished."""
+    try:
+        root = Path(root_dir).expanduser()
+        if not root.exists():
+            return {"status": "error", "message": f"Directory not found: {root_dir}"}
+
+        indexed = unchanged = failed = 0
+        conn = _connect()
+        try:
+            for json_path in glob_outputs(root, "**/transcripts/*.json"):
+                if "@eaDir" in json_path.parts:
+                    continue
+                try:
+                    with conn:
+                        if _index_file(conn, json_path):
+                            indexed += 1
+                        else:
+                            unchanged += 1
+                except (json.JSONDecodeError, OSError, AttributeError):
+                    failed += 1
+
+            prefix = str(root.resolve()) + os.sep
+            stale = [
+                (tid,)
+                for tid, path in conn.execute("SELECT id, path FROM transcripts")
+                if path.startswith(prefix) and not Path(path).exists()
+            ]
+            with conn:
+                conn.executemany("DELETE FROM segments WHERE transcript_id = ?", stale)
+                conn.executemany("DELETE FROM transcripts WHERE id = ?", stale)
+        finally:
+            conn.close()
+
+        return {
+            "status": "success",
+            "root": str(root),
+            "indexed": indexed,
+            "unchanged": unchanged,
+            "failed": failed,
+            "removed": len(stale),
+            "db": str(db_path()),
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def search(
+    query: str,
+    limit: int = 20,
+    meeting: str = "",
+    date_from: str = "",
+    date_to: str = "",
+) -> dict:
+    """Ranked, timestamped hits for `query` (bm25; substring scan for < 3 characters)."""
+    try:
+        query = query.strip()
+        if not query:
+            return {"status": "error", "message": "Empty query"}
+
+        filters = ""
+        params: list = []
+        if meeting:
+            filters += " AND t.meeting LIKE ?"
+            params.append(f"%{meeting}%")
+        if date_from:
+            filters += " AND t.date >= ?"
+            params.append(date_from)
+        if date_to:
+            filters += " AND t.date <= ?"
+            params.append(date_to)
+
+        if len(query) >= 3:
+            sql = (
+                'SELECT s.text, s.start, s."end", t.meeting, t.date, t.path, '
+                "bm25(segments) AS score "
+                "FROM segments s JOIN transcripts t ON t.id = s.transcript_id "
+                f"WHERE segments MATCH ?{filters} ORDER BY score LIMIT ?"
+            )
+            # Column filter: `meeting` is indexed too, and must not match on its own.
+            args = ['text : "' + query.replace('"', '""') + '"', *params, limit]
+        else:
+            sql = (
+                'SELECT s.text, s.start, s."end", t.meeting, t.date, t.path, 0.0 AS score '
+                "FROM segments s JOIN transcripts t ON t.id = s.transcript_id "
+                f"WHERE instr(s.text, ?) > 0{filters} ORDER BY t.date DESC, s.start LIMIT ?"
+            )
+            args = [query, *params, limit]
+
+        conn = _connect()
+        try:
+            rows = conn.execute(sql, args).fetchall()
+        finally:
+            conn.close()
+
+        hits = [
+            {
+                "meeting": m,
+                "date": d,
+                "start": start,
+                "end": end,
+                "timestamp": seconds_to_vtt_time(start),
+                "text": text,
+                "transcript": path,
+                "score": round(-score, 4),
+            }
+            for text, start, end, m, d, path, score in rows
+        ]
+        return {"status": "success", "query": query, "total": len(hits), "hits": hits}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,231 @@
+"""Columnar segment storage and a single-pass multi-format emitter.
+
+Backends hand over segments as dicts (faster-whisper, openai-whisper) or Pydantic
+objects (OpenAI API). SegmentTable converts either shape once into typed arrays
+plus one shared text buffer, and emit() renders txt/srt/vtt/json in one pass:
+each timestamp's HH:MM:SS.mmm arithmetic is done once and shared by srt and vtt.
+Timestamps truncate to the millisecond exactly like lib.formats, and any extra
+fields a backend attached to a segment (openai-whisper's id/seek/tokens, ...)
+are kept in the JSON output.
+"""
+
+import json
+import json.encoder
+import math
+from array import array
+
+# Optional per-segment confidence columns (NaN when a backend does not report them).
+CONFIDENCE_FIELDS = ("avg_logprob", "compression_ratio", "no_speech_prob")
+_COLUMNS = {"start", "end", "text", "words", *CONFIDENCE_FIELDS}
+
+_MS = [f"{i:03d}" for i in range(1000)]
+
+_c_encode_basestring = getattr(json.encoder, "c_encode_basestring", None)
+
+
+class SegmentTable:
+    """start/end as float64 arrays, texts as one str sliced by offsets."""
+
+    __slots__ = ("start", "end", "offsets", "buffer", "confidence", "words", "extras")
+
+    def __init__(
+        self,
+        start: array,
+        end: array,
+        offsets: array,
+        buffer: str,
+        confidence: dict[str, array] | None = None,
+        words: list | None = None,
+        extras: list[dict] | None = None,
+    ):
+        self.start = start
+        self.end = end
+        self.offsets = offsets  # len(self) + 1 code-point offsets into buffer
+        self.buffer = buffer
+        self.confidence = confidence or {}
+        self.words = words  # per-segment word lists, or None when absent
+        self.extras = extras  # per-segment backend-specific fields, or None when absent
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def text(self, i: int) -> str:
+        return self.buffer[self.offsets[i] : self.offsets[i + 1]]
+
+    def texts(self) -> list[str]:
+        o, b = self.offsets, self.buffer
+        return [b[o[i] : o[i + 1]] for i in range(len(self.start))]
+
+    @classmethod
+    def from_segments(cls, segments: list) -> "SegmentTable":
+        """Build from dict or attribute-style segments (shape detected once, not per field)."""
+        n = len(segments)
+        start = array("d", bytes(8 * n))
+        end = array("d", bytes(8 * n))
+        offsets = array("q", bytes(8 * (n + 1)))
+        conf = {k: array("d", [math.nan]) * n for k in CONFIDENCE_FIELDS}
+        words: list = [None] * n
+        extras: list[dict] = [{}] * n
+        parts: list[str] = []
+        pos = 0
+        is_dict = bool(segments) and isinstance(segments[0], dict)
+        for i, seg in enumerate(segments):
+            get = seg.get if is_dict else (lambda k, d=None, _s=seg: getattr(_s, k, d))
+            start[i] = get("start", 0) or 0
+            end[i] = get("end", 0) or 0
+            t = (get("text", "") or "").strip()
+            parts.append(t)
+            pos += len(t)
+            offsets[i + 1] = pos
+            for k, col in conf.items():
+                v = get(k)
+                if v is not None:
+                    col[i] = v
+            words[i] = get("words")
+            extra = {
+                k: v
+                for k, v in (seg if is_dict else _model_fields(seg)).items()
+                if k not in _COLUMNS
+            }
+            if extra:
+                extras[i] = extra
+        conf = {k: col for k, col in conf.items() if not all(math.isnan(v) for v in col)}
+        return cls(
+            start,
+            end,
+            offsets,
+            "".join(parts),
+            conf,
+            words if any(words) else None,
+            extras if any(extras) else None,
+        )
+
+    def to_dicts(self) -> list[dict]:
+        """Plain segment dicts (start, end, text, confidence fields, words, extras)."""
+        texts = self.texts()
+        return [self._dict(i, texts[i]) for i in range(len(self))]
+
+    def _dict(self, i: int, text: str) -> dict:
+        d = {"start": self.start[i], "end": self.end[i], "text": text}
+        for k, col in self.confidence.items():
+            if not math.isnan(col[i]):
+                d[k] = col[i]
+        if self.words is not None and self.words[i]:
+            d["words"] = [_word_dict(w) for w in self.words[i]]
+        if self.extras is not None:
+            d.update(self.extras[i])
+        return d
+
+    def emit(self, formats: list, text: str, language: str) -> dict[str, str]:
+        """Render the requested formats ("txt", "srt", "vtt", "json") in one pass."""
+        want_srt, want_vtt = "srt" in formats, "vtt" in formats
+        srt: list[str] = []
+        vtt: list[str] = ["WEBVTT\n"]
+        if want_srt or want_vtt:
+            starts = _clock_times(self.start)
+            ends = _clock_times(self.end)
+            texts = self.texts()
+            for i in range(len(self)):
+                (s_hms, s_ms), (e_hms, e_ms) = starts[i], ends[i]
+                if want_srt:
+                    srt.append(f"{i + 1}\n{s_hms},{s_ms} --> {e_hms},{e_ms}\n{texts[i]}\n")
+                if want_vtt:
+                    vtt.append(f"{i + 1}\n{s_hms}.{s_ms} --> {e_hms}.{e_ms}\n{texts[i]}\n")
+
+        out: dict[str, str] = {}
+        if "txt" in formats:
+            out["txt"] = text
+        if "json" in formats:
+            out["json"] = self._json(text, language)
+        if want_srt:
+            out["srt"] = "\n".join(srt)
+        if want_vtt:
+            out["vtt"] = "\n".join(vtt)
+        return out
+
+    def _json(self, text: str, language: str) -> str:
+        """Same bytes as json.dumps(..., ensure_ascii=False, indent=2), rendered directly.
+
+        indent= forces json's pure-Python encoder; segment records are flat, so
+        they are written field by field with the C string encoder instead.
+        Segments carrying word lists or extra fields fall back to json.dumps for
+        that record.
+        """
+        if not len(self):
+            return json.dumps(
+                {"text": text, "segments": [], "language": language}, ensure_ascii=False, indent=2
+            )
+        enc = _encode_str
+        conf = list(self.confidence.items())
+        texts = self.texts()
+        records = []
+        for i in range(len(self)):
+            if (self.words is not None and self.words[i]) or (
+                self.extras is not None and self.extras[i]
+            ):
+                record = json.dumps(self._dict(i, texts[i]), ensure_ascii=False, indent=2)
+                records.append("    " + record.replace("\n", "\n    "))
+                continue
+            fields = [
+                f'      "start": {_float(self.start[i])}',
+                f'      "end": {_float(self.end[i])}',
+                f'      "text": {enc(texts[i])}',
+            ]
+            for k, col in conf:
+                v = col[i]
+                if v == v:  # not NaN
+                    fields.append(f'      "{k}": {_float(v)}')
+            records.append("    {\n" + ",\n".join(fields) + "\n    }")
+        return (
+            f'{{\n  "text": {enc(text)},\n  "segments": [\n'
+            + ",\n".join(records)
+            + f'\n  ],\n  "language": {enc(language)}\n}}'
+        )
+
+
+def _float(v: float) -> str:
+    """float → JSON token, as json's encoder writes it."""
+    if v != v:
+        return "NaN"
+    if v in (math.inf, -math.inf):
+        return "Infinity" if v > 0 else "-Infinity"
+    return float.__repr__(v)
+
+
+def _encode_str(s: str) -> str:
+    return _c_encode_basestring(s) if _c_encode_basestring else json.dumps(s, ensure_ascii=False)
+
+
+def _model_fields(seg) -> dict:
+    """Fields of an API segment object (Pydantic model_dump), else nothing extra."""
+    dump = getattr(seg, "model_dump", None)
+    return dump() if callable(dump) else {}
+
+
+def _word_dict(w) -> dict:
+    if isinstance(w, dict):
+        return w
+    return {k: getattr(w, k) for k in ("start", "end", "word", "probability") if hasattr(w, k)}
+
+
+def _clock_times(values: array) -> list[tuple[str, str]]:
+    """Seconds → ("HH:MM:SS", "mmm") pairs, truncated to the millisecond like
+    lib.formats.seconds_to_srt_time (so .live files and search agree with these).
+
+    The HH:MM:SS prefix is memoised per whole second: consecutive segments share
+    seconds often enough that most timestamps cost one divmod and a dict lookup.
+    """
+    hms_cache: dict[int, str] = {}
+    out = []
+    for v in values:
+        if v > 0:
+            secs, ms = int(v), int((v % 1) * 1000)
+        else:
+            secs = ms = 0
+        hms = hms_cache.get(secs)
+        if hms is None:
+            h, rem = divmod(secs, 3600)
+            m, s = divmod(rem, 60)
+            hms = hms_cache[secs] = f"{h:02d}:{m:02d}:{s:02d}"
+        out.append((hms, _MS[ms]))
+    return out
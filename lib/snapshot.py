@@ -0,0 +1,48 @@
+"""mtime-invalidated snapshots for status data that is expensive to rebuild.
+
+snapshot(name, watch, compute) returns the cached compute() result while the
+modification times of every watched path are unchanged. Watched directories
+are stat-ed, not walked: a directory's mtime moves when entries are added or
+removed, which is what the HF cache and vocabulary listings depend on. Pass
+the files themselves when their contents matter (vocabulary line counts).
+"""
+
+import threading
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from .metrics import get_metrics
+
+_cache: dict[str, tuple[tuple, object]] = {}
+_lock = threading.Lock()
+
+
+def _signature(paths: Iterable[Path]) -> tuple:
+    sig = []
+    for p in paths:
+        try:
+            sig.append((str(p), p.stat().st_mtime_ns))
+        except OSError:
+            sig.append((str(p), None))
+    return tuple(sig)
+
+
+def snapshot(name: str, watch: Callable[[], Iterable[Path]], compute: Callable[[], Any]) -> Any:
+    """compute() once per change of the watched paths' mtimes."""
+    sig = _signature(watch())
+    with _lock:
+        hit = _cache.get(name)
+    if hit is not None and hit[0] == sig:
+        get_metrics().inc("whisper_cache_requests_total", cache=f"status:{name}", result="hit")
+        return hit[1]
+    get_metrics().inc("whisper_cache_requests_total", cache=f"status:{name}", result="miss")
+    value = compute()
+    with _lock:
+        _cache[name] = (sig, value)
+    return value
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
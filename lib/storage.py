@@ -0,0 +1,132 @@
+"""Optional compression for transcript outputs, with transparent read-back.
+
+With WHISPER_OUTPUT_COMPRESSION set, the formats in WHISPER_COMPRESS_FORMATS are
+written as foo.json.gz (gzip) or foo.json.zst (zstd: Python 3.14's
+compression.zstd, else the optional zstandard package — gzip is used when neither
+is available). txt stays plain by default so it
+remains readable in Finder / on the NAS; the .wseg sidecar is never compressed
+(it is mmap-loaded). read_output() and output_exists() accept the plain name and
+find whichever variant is on disk.
+
+  WHISPER_OUTPUT_COMPRESSION=          ("" | gzip | zstd)
+  WHISPER_COMPRESS_FORMATS=json,srt,vtt
+"""
+
+import functools
+import gzip
+import json
+import os
+from pathlib import Path
+
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def compression() -> str:
+    """Configured codec, checked when read so a bad setting fails before the decode."""
+    codec = os.environ.get("WHISPER_OUTPUT_COMPRESSION", "").strip().lower()
+    if codec in ("", "none", "0"):
+        return ""
+    if codec in ("gz", "gzip"):
+        return "gzip"
+    if codec in ("zst", "zstd"):
+        return "zstd" if _zstd_available() else "gzip"
+    raise ValueError(f"Unknown WHISPER_OUTPUT_COMPRESSION: {codec}")
+
+
+def compressed_formats() -> set[str]:
+    raw = os.environ.get("WHISPER_COMPRESS_FORMATS", "json,srt,vtt")
+    return {f.strip() for f in raw.split(",") if f.strip()}
+
+
+def _zstd():
+    try:
+        from compression import zstd  # Python 3.14+
+
+        return zstd.compress, zstd.decompress
+    except ImportError:
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).compress, zstandard.ZstdDecompressor().decompress
+
+
+@functools.cache
+def _zstd_available() -> bool:
+    try:
+        _zstd()
+    except ImportError:
+        return False
+    return True
+
+
+def _encode(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == "zstd":
+        return _zstd()[0](data)
+    return data
+
+
+def _decode(data: bytes, suffix: str) -> bytes:
+    if suffix == ".gz":
+        return gzip.decompress(data)
+    if suffix == ".zst":
+        return _zstd()[1](data)
+    return data
+
+
+def variants(path: str | Path) -> list[Path]:
+    """Plain path first, then its compressed names."""
+    p = Path(path)
+    if p.suffix in (".gz", ".zst"):
+        p = p.with_suffix("")
+    return [p] + [p.with_name(p.name + s) for s in SUFFIXES.values()]
+
+
+def write_output(path: str | Path, text: str, fmt: str, codec: str | None = None) -> Path:
+    """Write text to path, compressed when fmt is configured for it. Returns the path
+    written; other variants of the same output are removed so readers never see a
+    stale copy."""
+    codec = compression() if codec is None else codec
+    target = Path(path)
+    if codec and fmt in compressed_formats():
+        target = target.with_name(target.name + SUFFIXES[codec])
+        target.write_bytes(_encode(text.encode("utf-8"), codec))
+    else:
+        target.write_text(text, encoding="utf-8")
+    for other in variants(path):
+        if other != target and other.exists():
+            other.unlink()
+    return target
+
+
+def find_output(path: str | Path) -> Path | None:
+    """The variant of path that exists (the exact name wins), or None."""
+    p = Path(path)
+    if p.exists():
+        return p
+    return next((v for v in variants(p) if v.exists()), None)
+
+
+def output_exists(path: str | Path) -> bool:
+    return find_output(path) is not None
+
+
+def read_output(path: str | Path) -> str:
+    """Text of an output file, plain or compressed (foo.json finds foo.json.gz)."""
+    found = find_output(path)
+    if found is None:
+        raise FileNotFoundError(f"Output not found: {path}")
+    return _decode(found.read_bytes(), found.suffix).decode("utf-8")
+
+
+def load_transcript_json(path: str | Path) -> dict:
+    return json.loads(read_output(path))
+
+
+def glob_outputs(directory: Path, pattern: str) -> list[Path]:
+    """directory.glob(pattern) plus the compressed variants, one entry per output."""
+    found: dict[Path, Path] = {}
+    for suffix in ("", *SUFFIXES.values()):
+        for p in directory.glob(pattern + suffix):
+            found.setdefault(p.with_suffix("") if suffix else p, p)
+    return sorted(found.values())
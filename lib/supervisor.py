@@ -0,0 +1,492 @@
+"""Supervised worker processes for in-process decodes (faster-whisper, openai-whisper).
+
+With WHISPER_ISOLATION=process local decodes run in
+long-lived spawned worker processes instead of the server's threads. Each
+worker loads the model once (re-warmed whenever it is replaced) and takes one
+job at a time. While a job runs, the parent checks it every
+WHISPER_WORKER_POLL_SECONDS, and a worker is killed and replaced when:
+
+  timeout  — the job exceeds its wall-clock limit (WHISPER_JOB_TIMEOUT_SECONDS,
+             or 300s + 3x the audio duration when 0)
+  memory   — the worker's RSS exceeds WHISPER_JOB_MEMORY_MB (opt-in; 0 = no
+             limit, since the governor budget is a soft admission target that
+             one oversized job may exceed on its own)
+  crash    — the worker dies (segfault in CTranslate2, OOM killer, ...)
+
+A file that takes down a worker WHISPER_POISON_STRIKES times is quarantined.
+Later jobs for it fail immediately instead of blocking another worker, until
+the file changes (size or mtime). An ordinary Python exception from the decode
+is re-raised as-is: the worker survives it and no strike is counted.
+
+Every reply carries what the worker has loaded (the pool's report() callback:
+an opaque description plus its resident bytes) and the metric counters the job
+incremented there, which are folded into this process's metrics. Until the
+worker exits its resident bytes are reserved in the memory governor
+(lib.governor), and run() hands the description to the caller's admission
+callback (None for a worker that has not answered yet), so a job is estimated
+without the models its worker already holds.
+
+  WHISPER_ISOLATION=thread             ("thread" | "process")
+  WHISPER_JOB_TIMEOUT_SECONDS=0
+  WHISPER_JOB_MEMORY_MB=0              (0 = no RSS limit)
+  WHISPER_POISON_STRIKES=2
+  WHISPER_WORKER_POLL_SECONDS=0.5
+  WHISPER_QUARANTINE_PATH=~/.cache/whisper-mcp/quarantine.json (env override)
+"""
+
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from .governor import get_governor
+from .hybrid import local_workers
+from .metrics import get_metrics
+
+_MB = 1024 * 1024
+_TIMEOUT_BASE_SECONDS = 300.0
+_TIMEOUT_RTF = 3.0
+_NO_DURATION_TIMEOUT_SECONDS = 7200.0  # same as the CLI backend's subprocess timeout
+
+
+def isolation() -> str:
+    mode = os.environ.get("WHISPER_ISOLATION", "thread").strip().lower()
+    if mode not in ("thread", "process"):
+        raise ValueError(f"Unknown WHISPER_ISOLATION: {mode}")
+    return mode
+
+
+def _timeout_seconds() -> float:
+    return float(os.environ.get("WHISPER_JOB_TIMEOUT_SECONDS", "0"))
+
+
+def _memory_limit_bytes() -> int:
+    """Per-worker RSS limit from WHISPER_JOB_MEMORY_MB (0 = none)."""
+    return int(max(0.0, float(os.environ.get("WHISPER_JOB_MEMORY_MB", "0"))) * _MB)
+
+
+def _poison_strikes() -> int:
+    return max(1, int(os.environ.get("WHISPER_POISON_STRIKES", "2")))
+
+
+def _poll_seconds() -> float:
+    return float(os.environ.get("WHISPER_WORKER_POLL_SECONDS", "0.5"))
+
+
+def quarantine_path() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_QUARANTINE_PATH",
+            str(Path.home() / ".cache" / "whisper-mcp" / "quarantine.json"),
+        )
+    ).expanduser()
+
+
+def job_timeout(duration: float | None) -> float:
+    """Wall-clock limit for one decode of `duration` seconds of audio."""
+    configured = _timeout_seconds()
+    if configured > 0:
+        return configured
+    if not duration:
+        return _NO_DURATION_TIMEOUT_SECONDS
+    return _TIMEOUT_BASE_SECONDS + _TIMEOUT_RTF * duration
+
+
+def process_rss(pid: int) -> int:
+    """Resident set size of another process in bytes (0 if it is gone)."""
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except FileNotFoundError:
+        if sys.platform != "darwin":
+            return 0
+    except (OSError, ValueError, IndexError):
+        return 0
+    try:  # macOS: no /proc
+        out = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True, timeout=5
+        ).stdout
+        return int(out.strip() or 0) * 1024
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return 0
+
+
+class WorkerFailure(RuntimeError):
+    """A job that killed or had to be killed in its worker (or a quarantined file)."""
+
+    def __init__(self, reason: str, detail: str, path: str = "", strikes: int = 0):
+        self.reason = reason
+        self.detail = detail
+        self.path = path
+        self.strikes = strikes
+        self.quarantined = reason == "quarantined" or strikes >= _poison_strikes()
+        note = " (file quarantined)" if self.quarantined and reason != "quarantined" else ""
+        super().__init__(f"worker {reason}: {detail}{note}")
+
+    @property
+    def info(self) -> dict:
+        return {
+            "reason": self.reason,
+            "detail": self.detail,
+            "strikes": self.strikes,
+            "quarantined": self.quarantined,
+        }
+
+
+def _worker_main(
+    conn, warm: Callable[[], object] | None, report: Callable[[], tuple] | None
+) -> None:
+    """Worker process: warm the model, then run (fn, args) jobs until told to stop.
+
+    Replies are (status, value, loaded, counters): loaded is report() and
+    counters the metric increments made during the job.
+    """
+    if warm is not None:
+        with contextlib.suppress(Exception):  # the first job reports the real error
+            warm()
+    metrics = get_metrics()
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        fn, args = msg
+        before = metrics.counters()
+        try:
+            reply = ("ok", fn(*args))
+        except Exception as e:
+            reply = ("error", e)
+        counters = {k: v - before.get(k, 0.0) for k, v in metrics.counters().items()}
+        counters = {k: v for k, v in counters.items() if v}
+        loaded = report() if report is not None else (None, 0)
+        try:
+            conn.send((*reply, loaded, counters))
+        except Exception as e:  # unpicklable result or exception
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}"), loaded, counters))
+
+
+class _Worker:
+    def __init__(self, ctx, warm, report):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, warm, report), daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+        self.loaded: object = None  # report() description; None until it answers a job
+        self.resident = 0  # bytes reserved in the governor
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+
+def _exit_detail(exitcode: int | None) -> str:
+    if exitcode is not None and exitcode < 0:
+        try:
+            return f"killed by {signal.Signals(-exitcode).name}"
+        except ValueError:
+            return f"killed by signal {-exitcode}"
+    return f"exit code {exitcode}"
+
+
+class Quarantine:
+    """Strike counts and quarantined files, persisted as JSON keyed by resolved path."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or quarantine_path()
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self, data: dict) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _stamp(path: Path) -> list | None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime]
+
+    def check(self, path: str | Path) -> dict | None:
+        """The quarantine entry for path, unless the file changed since it was recorded."""
+        p = Path(path).resolve()
+        with self._lock:
+            entry = self._load().get(str(p))
+        if entry and entry.get("quarantined") and entry.get("stamp") == self._stamp(p):
+            return entry
+        return None
+
+    def strike(self, path: str | Path, reason: str, detail: str) -> int:
+        """Record a worker-killing failure; returns the file's strike count."""
+        p = Path(path).resolve()
+        stamp = self._stamp(p)
+        with self._lock:
+            data = self._load()
+            entry = data.get(str(p))
+            if not entry or entry.get("stamp") != stamp:
+                entry = {"stamp": stamp, "strikes": 0}
+            entry.update(
+                strikes=entry["strikes"] + 1,
+                reason=reason,
+                detail=detail,
+                at=datetime.now().isoformat(timespec="seconds"),
+            )
+            entry["quarantined"] = entry["strikes"] >= _poison_strikes()
+            data[str(p)] = entry
+            self._save(data)
+        return entry["strikes"]
+
+    def release(self, path: str | Path) -> bool:
+        p = str(Path(path).resolve())
+        with self._lock:
+            data = self._load()
+            found = data.pop(p, None) is not None
+            if found:
+                self._save(data)
+        return found
+
+    def listing(self) -> list[dict]:
+        with self._lock:
+            data = self._load()
+        return [
+            {"path": p, **{k: v for k, v in e.items() if k != "stamp"}}
+            for p, e in data.items()
+            if e.get("quarantined")
+        ]
+
+
+class Supervisor:
+    """A fixed pool of spawned workers with per-job timeout, memory limit and restart."""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        warm: Callable[[], object] | None = None,
+        quarantine: Quarantine | None = None,
+        poll_seconds: float | None = None,
+        report: Callable[[], tuple[object, int]] | None = None,
+    ):
+        self.size = max(1, workers)
+        self.warm = warm
+        self.report = report  # in the worker: (what it has loaded, resident bytes)
+        self.quarantine = quarantine or Quarantine()
+        self.poll_seconds = poll_seconds if poll_seconds is not None else _poll_seconds()
+        self._ctx = multiprocessing.get_context("spawn")  # no fork from a threaded server
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self.jobs = 0
+        self.restarts = 0
+        self.failures: dict[str, int] = {}
+        self.last_failure: dict | None = None
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            if self._started < self.size and self._idle.empty():
+                self._started += 1
+                return self._spawn()
+        worker = self._idle.get()
+        if not worker.process.is_alive():  # died while idle
+            self._stop(worker)
+            with self._lock:
+                self.restarts += 1
+            worker = self._spawn()
+        return worker
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.warm, self.report)
+
+    def _reservation(self, worker: _Worker) -> str:
+        return f"supervisor worker {worker.process.pid}"
+
+    def _update(self, worker: _Worker, loaded: tuple[object, int]) -> None:
+        """Record what the worker reported loaded and reserve its resident bytes."""
+        worker.loaded, resident = loaded
+        if resident != worker.resident:
+            if resident:
+                get_governor().reserve(self._reservation(worker), resident)
+            else:
+                get_governor().release(self._reservation(worker))
+            worker.resident = resident
+
+    def _stop(self, worker: _Worker) -> None:
+        if worker.resident:
+            get_governor().release(self._reservation(worker))
+            worker.resident = 0
+        worker.stop()
+
+    def _replace(self, worker: _Worker) -> None:
+        """Kill a failed worker and start its replacement now, so it re-warms before
+        the next job arrives."""
+        self._stop(worker)
+        with self._lock:
+            self.restarts += 1
+        self._idle.put(self._spawn())
+
+    def _fail(self, worker: _Worker, reason: str, detail: str, path: str) -> WorkerFailure:
+        self._replace(worker)
+        strikes = self.quarantine.strike(path, reason, detail) if path else 0
+        with self._lock:
+            self.failures[reason] = self.failures.get(reason, 0) + 1
+            self.last_failure = {
+                "reason": reason,
+                "detail": detail,
+                "path": path,
+                "at": datetime.now().isoformat(timespec="seconds"),
+            }
+        return WorkerFailure(reason, detail, path, strikes)
+
+    def run(
+        self,
+        fn: Callable,
+        args: tuple = (),
+        path: str | Path = "",
+        timeout: float | None = None,
+        memory_limit: int | None = None,
+        admit: Callable[[object], contextlib.AbstractContextManager] | None = None,
+    ):
+        """fn(*args) in a worker process (fn and its result must be picklable).
+
+        admit(loaded) is entered once a worker is assigned and held for the job:
+        loaded is what that worker last reported having loaded (None if it has
+        not answered a job yet).
+        Raises WorkerFailure on timeout, memory limit, crash or a quarantined path;
+        exceptions raised by fn itself are re-raised unchanged.
+        """
+        path = str(path) if path else ""
+        if path:
+            entry = self.quarantine.check(path)
+            if entry:
+                with self._lock:
+                    self.failures["quarantined"] = self.failures.get("quarantined", 0) + 1
+                raise WorkerFailure(
+                    "quarantined",
+                    f"{entry['reason']}: {entry['detail']}",
+                    path,
+                    entry["strikes"],
+                )
+        timeout = timeout if timeout is not None else job_timeout(None)
+        limit = memory_limit if memory_limit is not None else _memory_limit_bytes()
+
+        worker = self._acquire()
+        with contextlib.ExitStack() as stack:
+            if admit is not None:
+                try:
+                    stack.enter_context(admit(worker.loaded))
+                except BaseException:
+                    self._idle.put(worker)  # no job was sent
+                    raise
+            return self._run_on(worker, fn, args, path, timeout, limit)
+
+    def _run_on(
+        self, worker: _Worker, fn: Callable, args: tuple, path: str, timeout: float, limit: int
+    ):
+        with self._lock:
+            self.jobs += 1
+        try:
+            worker.conn.send((fn, args))
+        except (OSError, ValueError) as e:
+            raise self._fail(worker, "crash", f"could not send job: {e}", path) from e
+        started = time.monotonic()
+        pid = worker.process.pid
+        while True:
+            try:
+                ready = worker.conn.poll(self.poll_seconds)
+            except (OSError, EOFError):
+                ready = False
+            if ready:
+                try:
+                    status, value, loaded, counters = worker.conn.recv()
+                except (OSError, EOFError):
+                    worker.process.join(1)
+                    detail = _exit_detail(worker.process.exitcode)
+                    raise self._fail(worker, "crash", detail, path) from None
+                worker.jobs += 1
+                get_metrics().merge_counters(counters)
+                self._update(worker, loaded)
+                self._idle.put(worker)
+                if status == "error":
+                    raise value
+                return value
+            if not worker.process.is_alive():
+                detail = _exit_detail(worker.process.exitcode)
+                raise self._fail(worker, "crash", detail, path)
+            elapsed = time.monotonic() - started
+            if elapsed > timeout:
+                raise self._fail(worker, "timeout", f"no result after {elapsed:.0f}s", path)
+            rss = process_rss(pid)
+            if limit and rss > limit:
+                detail = f"RSS {rss // _MB}MB over the {limit // _MB}MB limit"
+                raise self._fail(worker, "memory", detail, path)
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with contextlib.suppress(OSError):
+                worker.conn.send(None)
+            self._stop(worker)
+        with self._lock:
+            self._started = 0
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.size,
+                "started": self._started,
+                "jobs": self.jobs,
+                "restarts": self.restarts,
+                "failures": dict(self.failures),
+                "last_failure": self.last_failure,
+            }
+
+
+_supervisor: Supervisor | None = None
+_supervisor_lock = threading.Lock()
+
+
+def get_supervisor(
+    warm: Callable[[], object] | None = None,
+    report: Callable[[], tuple[object, int]] | None = None,
+) -> Supervisor:
+    """The shared pool (WHISPER_LOCAL_WORKERS workers); see Supervisor for warm/report."""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = Supervisor(local_workers(), warm, report=report)
+        return _supervisor
+
+
+def supervisor_status() -> dict:
+    mode = isolation()
+    out: dict = {"isolation": mode, "quarantined": Quarantine().listing()}
+    if _supervisor is not None:
+        out.update(_supervisor.status())
+    return out
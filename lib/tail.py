@@ -0,0 +1,386 @@
+"""Tail mode: transcribe a recording while it is still being written.
+
+The source is a growing WAV or raw PCM file, or a directory of recording
+segments (*.wav / *.pcm, in name order, read as one stream). Every poll, each
+full window of new audio is decoded with faster-whisper. Segments that end
+before the last second of the window are committed and appended to
+transcripts/<stem>.live.{txt,srt,vtt}. Anything after them is decoded again
+as the start of the next window, so a word cut by the window edge is not lost.
+
+Once the source has not grown for WHISPER_TAIL_IDLE_SECONDS, only the audio
+after the last committed segment (at most about one window) is decoded. Then
+the regular outputs are written as transcribe() would write them: dictionary,
+compression, search index. The .live files are removed at that point.
+
+WAV headers are read for the format, but their sizes are ignored (recorders
+only fill them in on close). Raw PCM is s16le at WHISPER_TAIL_PCM_RATE /
+WHISPER_TAIL_PCM_CHANNELS.
+
+  WHISPER_TAIL_WINDOW_SECONDS=30
+  WHISPER_TAIL_IDLE_SECONDS=15
+  WHISPER_TAIL_POLL_SECONDS=2
+  WHISPER_TAIL_PCM_RATE=16000
+  WHISPER_TAIL_PCM_CHANNELS=1
+"""
+
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from . import core
+from .dictionary import apply_dictionary_to_result, load_dictionaries
+from .formats import seconds_to_srt_time, seconds_to_vtt_time
+from .governor import get_governor
+from .vocabulary import load_vocabulary
+
+_SAMPLE_RATE = 16000
+# Segments ending this close to the window edge may be cut mid-word: decode them again.
+_EDGE_SECONDS = 1.0
+_PCM_SUFFIXES = (".pcm", ".raw", ".s16le")
+_SEGMENT_SUFFIXES = (".wav", *_PCM_SUFFIXES)
+_LIVE_FORMATS = ("txt", "srt", "vtt")
+
+# (pcm bytes, source, language, prompt) -> (segments relative to the window, language)
+Decoder = Callable[[bytes, "PcmSource", str, str], tuple[list[dict], str]]
+
+
+def _window_seconds() -> float:
+    return float(os.environ.get("WHISPER_TAIL_WINDOW_SECONDS", "30"))
+
+
+def _idle_seconds() -> float:
+    return float(os.environ.get("WHISPER_TAIL_IDLE_SECONDS", "15"))
+
+
+def _poll_seconds() -> float:
+    return float(os.environ.get("WHISPER_TAIL_POLL_SECONDS", "2"))
+
+
+def _pcm_format() -> tuple[int, int]:
+    return (
+        int(os.environ.get("WHISPER_TAIL_PCM_RATE", str(_SAMPLE_RATE))),
+        int(os.environ.get("WHISPER_TAIL_PCM_CHANNELS", "1")),
+    )
+
+
+def _wav_header(path: Path) -> tuple[int, int, int] | None:
+    """(data offset, rate, channels) of a 16-bit PCM WAV, None until the header is written."""
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    if len(head) < 12:
+        return None
+    if head[:4] not in (b"RIFF", b"RF64") or head[8:12] != b"WAVE":
+        raise ValueError(f"Not a WAV file: {path}")
+    pos = 12
+    fmt = None
+    while pos + 8 <= len(head):
+        cid, size = head[pos : pos + 4], struct.unpack_from("<I", head, pos + 4)[0]
+        if cid == b"fmt " and pos + 24 <= len(head):
+            tag, channels, rate = struct.unpack_from("<HHI", head, pos + 8)
+            bits = struct.unpack_from("<H", head, pos + 22)[0]
+            if tag not in (1, 0xFFFE) or bits != 16:
+                raise ValueError(f"Tail mode needs 16-bit PCM WAV: {path}")
+            fmt = (rate, channels)
+        elif cid == b"data":
+            return (pos + 8, *fmt) if fmt else None
+        pos += 8 + size + (size & 1)
+    return None
+
+
+class PcmFile:
+    """One growing s16le stream: a WAV (format from its header) or raw PCM."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offset = 0
+        self.rate, self.channels = _pcm_format()
+        self.ready = path.suffix.lower() in _PCM_SUFFIXES
+
+    def _probe(self) -> bool:
+        if not self.ready:
+            header = _wav_header(self.path)
+            if header:
+                self.offset, self.rate, self.channels = header
+                self.ready = True
+        return self.ready
+
+    def frames(self) -> int:
+        """Complete frames on disk right now."""
+        try:
+            if not self._probe():
+                return 0
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        return max(0, size - self.offset) // (2 * self.channels)
+
+    def read(self, start: int, count: int) -> bytes:
+        frame = 2 * self.channels
+        with open(self.path, "rb") as f:
+            f.seek(self.offset + start * frame)
+            data = f.read(count * frame)
+        return data[: len(data) // frame * frame]
+
+
+class PcmSource:
+    """A growing file, or a directory of segments read back to back as one stream."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path).expanduser()
+        self._files: dict[Path, PcmFile] = {}
+
+    def _parts(self) -> list[PcmFile]:
+        if not self.path.is_dir():
+            paths = [self.path]
+        else:
+            paths = sorted(p for p in self.path.iterdir() if p.suffix.lower() in _SEGMENT_SUFFIXES)
+        return [self._files.setdefault(p, PcmFile(p)) for p in paths]
+
+    def _layout(self) -> list[tuple[PcmFile, int]]:
+        """(part, frames) for every part whose header is readable."""
+        layout: list[tuple[PcmFile, int]] = []
+        for part in self._parts():
+            frames = part.frames()
+            if not part.ready:
+                break  # header not written yet; later segments follow it
+            if layout and (part.rate, part.channels) != (layout[0][0].rate, layout[0][0].channels):
+                raise ValueError(f"Segment format differs from the first segment: {part.path}")
+            layout.append((part, frames))
+        return layout
+
+    @property
+    def rate(self) -> int:
+        parts = self._parts()
+        return parts[0].rate if parts else _SAMPLE_RATE
+
+    @property
+    def channels(self) -> int:
+        parts = self._parts()
+        return parts[0].channels if parts else 1
+
+    def seconds(self) -> float:
+        layout = self._layout()
+        return sum(n for _, n in layout) / self.rate if layout else 0.0
+
+    def signature(self) -> tuple:
+        """Changes whenever the recording grows."""
+        out = []
+        for part in self._parts():
+            try:
+                st = part.path.stat()
+            except FileNotFoundError:
+                continue
+            out.append((part.path.name, st.st_size, st.st_mtime_ns))
+        return tuple(out)
+
+    def read(self, start: float, end: float | None = None) -> bytes:
+        """s16le PCM (source rate and channels) for [start, end) seconds."""
+        first = int(start * self.rate)
+        last = None if end is None else int(end * self.rate)
+        chunks = []
+        base = 0
+        for part, frames in self._layout():
+            lo, hi = (
+                max(first, base),
+                min(last if last is not None else base + frames, base + frames),
+            )
+            if hi > lo:
+                chunks.append(part.read(lo - base, hi - lo))
+            base += frames
+        return b"".join(chunks)
+
+    def default_stem(self) -> str:
+        return self.path.name if self.path.is_dir() else self.path.stem
+
+    def default_output_dir(self) -> Path:
+        return self.path.parent / "transcripts"
+
+
+def _to_float32(pcm: bytes, rate: int, channels: int):
+    """16kHz mono float32 for faster-whisper."""
+    import numpy as np
+
+    audio = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != _SAMPLE_RATE and len(audio):
+        n = int(len(audio) * _SAMPLE_RATE / rate)
+        audio = np.interp(np.arange(n) * (rate / _SAMPLE_RATE), np.arange(len(audio)), audio)
+        audio = audio.astype(np.float32)
+    return audio
+
+
+def decode_window(pcm: bytes, source: PcmSource, language: str, prompt: str):
+    """faster-whisper decode of one window, admitted by the memory governor."""
+    if core._get_local_backend() != "faster_whisper":
+        raise RuntimeError("Tail mode needs faster-whisper: pip install faster-whisper")
+    seconds = len(pcm) / (2 * source.channels * source.rate)
+    key, estimate = core._local_job_estimate("faster_whisper", seconds)
+    with get_governor().admit(key, estimate, f"tail:{source.path.name}"):
+        segments, info, _ = core._faster_whisper_segments(
+            _to_float32(pcm, source.rate, source.channels), language, prompt
+        )
+    return segments, language or info.language
+
+
+class LiveOutputs:
+    """Append-only <stem>.live.{txt,srt,vtt} that readers can follow while decoding runs."""
+
+    def __init__(self, out_dir: Path, stem: str, formats: list[str]):
+        self.paths = {
+            fmt: out_dir / f"{stem}.live.{fmt}" for fmt in _LIVE_FORMATS if fmt in formats
+        }
+        self.count = 0
+        for fmt, p in self.paths.items():
+            p.write_text("WEBVTT\n" if fmt == "vtt" else "", encoding="utf-8")
+
+    def append(self, segments: list[dict]) -> None:
+        if not segments:
+            return
+        chunks: dict[str, list[str]] = {fmt: [] for fmt in self.paths}
+        for seg in segments:
+            self.count += 1
+            text = (seg.get("text") or "").strip()
+            if "txt" in chunks:
+                chunks["txt"].append(text if self.count == 1 else " " + text)
+            for fmt, clock in (("srt", seconds_to_srt_time), ("vtt", seconds_to_vtt_time)):
+                if fmt in chunks:
+                    sep = "" if fmt == "srt" and self.count == 1 else "\n"
+                    span = f"{clock(seg['start'])} --> {clock(seg['end'])}"
+                    chunks[fmt].append(f"{sep}{self.count}\n{span}\n{text}\n")
+        for fmt, parts in chunks.items():
+            with open(self.paths[fmt], "a", encoding="utf-8") as f:
+                f.write("".join(parts))
+
+    def remove(self) -> None:
+        for p in self.paths.values():
+            p.unlink(missing_ok=True)
+
+
+def _commit(segments: list[dict], start: float, window_end: float) -> tuple[list[dict], float]:
+    """Segments of a non-final window that are safe to keep, and where the next window starts."""
+    limit = window_end - _EDGE_SECONDS
+    keep = [s for s in segments if s["end"] <= limit]
+    if not keep and segments:
+        keep = segments[:1]  # one segment spanning the window: keep it rather than stall
+    resume = keep[-1]["end"] if keep else limit
+    return keep, resume if resume > start else limit
+
+
+def tail_transcribe(
+    audio_path: str,
+    output_dir: str = "",
+    vocabulary_path: str = "",
+    vocabulary_prompt: str = "",
+    language: str = "ja",
+    output_formats: str = "txt,srt,vtt,json",
+    extra_vocab_dirs: list[Path] | None = None,
+    window_seconds: float = 0,
+    idle_seconds: float = 0,
+    poll_seconds: float = 0,
+    stop: threading.Event | None = None,
+    on_segments: Callable[[list[dict]], None] | None = None,
+    decoder: Decoder | None = None,
+) -> dict:
+    """Follow a recording that is still being written and transcribe it as it grows.
+
+    Returns when the source has been idle for idle_seconds (or `stop` is set)
+    and the final outputs are written. The response matches transcribe() plus
+    "tail": {"windows", "audio_seconds", "decode_seconds", "final_window_seconds",
+    "finalize_seconds"}. finalize_seconds is the time from noticing the end of
+    the recording to the final outputs being written.
+    """
+    try:
+        source = PcmSource(audio_path)
+        if not source.path.exists():
+            return {"status": "error", "message": f"Audio file not found: {audio_path}"}
+        window = window_seconds or _window_seconds()
+        idle = idle_seconds or _idle_seconds()
+        poll = poll_seconds or _poll_seconds()
+        decode = decoder or decode_window
+        language = "" if language == "auto" else language
+
+        out_dir = Path(output_dir).expanduser() if output_dir else source.default_output_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        formats = [f.strip() for f in output_formats.split(",") if f.strip()]
+        stem = source.default_stem()
+
+        prompt = vocabulary_prompt
+        if not prompt and vocabulary_path:
+            prompt = load_vocabulary(vocabulary_path, extra_dirs=extra_vocab_dirs)
+        replacements = load_dictionaries(extra_vocab_dirs, language)
+
+        live = LiveOutputs(out_dir, stem, formats)
+        segments: list[dict] = []
+        committed = 0.0
+        stats = {"windows": 0, "decode_seconds": 0.0}
+
+        def _decode(start: float, end: float | None) -> list[dict]:
+            nonlocal language
+            t0 = time.perf_counter()
+            found, detected = decode(source.read(start, end), source, language, prompt)
+            stats["decode_seconds"] += time.perf_counter() - t0
+            stats["windows"] += 1
+            language = language or detected
+            return [{**s, "start": s["start"] + start, "end": s["end"] + start} for s in found]
+
+        def _keep(new: list[dict]) -> None:
+            segments.extend(new)
+            shown = [dict(s) for s in new]
+            apply_dictionary_to_result(core._WhisperResult(text="", segments=shown), replacements)
+            live.append(shown)
+            if on_segments:
+                on_segments(shown)
+
+        last_sig, last_change = source.signature(), time.monotonic()
+        while True:
+            while source.seconds() - committed >= window:
+                keep, committed = _commit(
+                    _decode(committed, committed + window), committed, committed + window
+                )
+                _keep(keep)
+            if stop is not None and stop.is_set():
+                break
+            (stop or threading.Event()).wait(poll)
+            sig = source.signature()
+            if sig != last_sig:
+                last_sig, last_change = sig, time.monotonic()
+            elif time.monotonic() - last_change >= idle:
+                break
+
+        t_end = time.perf_counter()
+        total = source.seconds()
+        final_window = max(0.0, total - committed)
+        if final_window > 0:
+            _keep(_decode(committed, None))
+
+        result = core._WhisperResult(
+            text=" ".join(s["text"] for s in segments),
+            segments=segments,
+            language=language,
+            duration=total,
+        )
+        response = core._finish(
+            result,
+            source.path,
+            out_dir,
+            formats,
+            extra_vocab_dirs,
+            language,
+            prompt,
+            f"tail:{core._local_backend_label()}" if decoder is None else "tail",
+        )
+        live.remove()
+        response["tail"] = {
+            "windows": stats["windows"],
+            "audio_seconds": round(total, 2),
+            "decode_seconds": round(stats["decode_seconds"], 2),
+            "final_window_seconds": round(final_window, 2),
+            "finalize_seconds": round(time.perf_counter() - t_end, 2),
+        }
+        return response
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
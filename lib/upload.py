@@ -0,0 +1,255 @@
+"""Upload preparation for the OpenAI API backend.
+
+Meeting recordings are often .mp4 with a video track, or 128kbps+ stereo AAC.
+Whisper only needs 16kHz mono speech, so before an API upload the audio track
+is demuxed (the video stream is never decoded) and re-encoded to mono Opus in
+Ogg at WHISPER_API_BITRATE_KBPS. The original is uploaded instead whenever the
+re-encode would not be smaller (already-small memos, no ffmpeg/PyAV).
+
+Prepared files are cached under the hash of the source contents, so retries,
+re-runs and copies of the same recording reuse one encode. The cache is pruned
+oldest-first beyond WHISPER_API_UPLOAD_CACHE_MB, skipping files that an upload
+in this process still holds (prepared_upload()).
+
+  WHISPER_API_PREPARE=1
+  WHISPER_API_BITRATE_KBPS=24
+  WHISPER_API_UPLOAD_CACHE=~/.cache/whisper-mcp/uploads (env override)
+  WHISPER_API_UPLOAD_CACHE_MB=2048
+"""
+
+import contextlib
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from .scheduler import duration_of
+
+_RATE = 16000
+# Ogg/Opus framing overhead on top of the nominal bitrate.
+_CONTAINER_OVERHEAD = 1.05
+
+_hash_cache: dict[tuple[str, int, int], str] = {}
+# Prepared files held by in-flight uploads → holder count; _prune skips them.
+_in_flight: dict[Path, int] = {}
+_lock = threading.Lock()
+
+
+def prepare_enabled() -> bool:
+    return os.environ.get("WHISPER_API_PREPARE", "1") != "0"
+
+
+def _bitrate_kbps() -> int:
+    return int(os.environ.get("WHISPER_API_BITRATE_KBPS", "24"))
+
+
+def cache_dir() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_API_UPLOAD_CACHE", str(Path.home() / ".cache" / "whisper-mcp" / "uploads")
+        )
+    ).expanduser()
+
+
+def _cache_budget_bytes() -> int:
+    return int(float(os.environ.get("WHISPER_API_UPLOAD_CACHE_MB", "2048")) * 1024 * 1024)
+
+
+def source_hash(path: Path) -> str:
+    """blake2b of the file contents, memoized per (path, size, mtime)."""
+    st = path.stat()
+    key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    with _lock:
+        hit = _hash_cache.get(key)
+    if hit:
+        return hit
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _lock:
+        _hash_cache[key] = digest
+    return digest
+
+
+def estimated_upload_bytes(path: str | Path, duration: float | None = None) -> int:
+    """Bytes the API upload of path will take after preparation (for planning)."""
+    p = Path(path)
+    try:
+        size = p.stat().st_size
+    except OSError:
+        return 0
+    duration = duration if duration is not None else duration_of(p)
+    if not prepare_enabled() or not duration:
+        return size
+    return min(size, int(duration * _bitrate_kbps() * 125 * _CONTAINER_OVERHEAD))
+
+
+def _encode_ffmpeg(src: Path, dst: Path, kbps: int) -> bool:
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return False
+    cmd = [
+        ffmpeg,
+        "-v",
+        "error",
+        "-y",
+        "-i",
+        str(src),
+        "-map",
+        "0:a:0",
+        "-vn",
+        "-sn",
+        "-dn",
+        "-ac",
+        "1",
+        "-ar",
+        str(_RATE),
+        "-c:a",
+        "libopus",
+        "-b:a",
+        f"{kbps}k",
+        "-application",
+        "voip",
+        "-f",
+        "ogg",
+        str(dst),
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, timeout=1800)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return proc.returncode == 0 and dst.exists() and dst.stat().st_size > 0
+
+
+def _encode_pyav(src: Path, dst: Path, kbps: int) -> bool:
+    try:
+        import av
+    except ImportError:
+        return False
+    try:
+        with av.open(str(src)) as inp, av.open(str(dst), "w", format="ogg") as out:
+            ist = inp.streams.audio[0]
+            ost = out.add_stream("libopus", rate=_RATE, layout="mono")
+            ost.bit_rate = kbps * 1000
+            resampler = av.AudioResampler(format="s16", layout="mono", rate=_RATE)
+            for frame in inp.decode(ist):  # demuxes only the audio stream
+                for rf in resampler.resample(frame):
+                    rf.pts = None
+                    for packet in ost.encode(rf):
+                        out.mux(packet)
+            for packet in ost.encode(None):
+                out.mux(packet)
+    except Exception:
+        return False
+    return dst.exists() and dst.stat().st_size > 0
+
+
+def _encode(src: Path, dst: Path, kbps: int) -> str:
+    """Encode with ffmpeg, else PyAV. Returns the method used, "" on failure."""
+    if _encode_ffmpeg(src, dst, kbps):
+        return "ffmpeg"
+    if _encode_pyav(src, dst, kbps):
+        return "pyav"
+    return ""
+
+
+def _hold(path: Path) -> None:
+    with _lock:
+        _in_flight[path] = _in_flight.get(path, 0) + 1
+
+
+def _release(path: Path) -> None:
+    with _lock:
+        n = _in_flight.pop(path, 0) - 1
+        if n > 0:
+            _in_flight[path] = n
+
+
+def _prune() -> None:
+    budget = _cache_budget_bytes()
+    files = []
+    for f in cache_dir().glob("*.ogg"):
+        try:
+            st = f.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, f))
+    total = sum(size for _, size, _ in files)
+    with _lock:  # a file held after this check is one that already survived it
+        for _, size, f in sorted(files):
+            if total <= budget:
+                break
+            if f not in _in_flight:
+                f.unlink(missing_ok=True)
+                total -= size
+
+
+def prepare_upload(audio_path: str | Path) -> dict:
+    """The file to upload for audio_path, preparing (or reusing) a compact copy.
+
+    Returns {"path", "method" ("original" | "cached" | "ffmpeg" | "pyav"),
+    "source_bytes", "upload_bytes", "prepare_seconds"}. The prepared file may be
+    pruned by a later call; hold it with prepared_upload() while uploading.
+    """
+    with prepared_upload(audio_path) as info:
+        return info
+
+
+@contextlib.contextmanager
+def prepared_upload(audio_path: str | Path) -> Iterator[dict]:
+    """prepare_upload() whose prepared file is not pruned until the block exits."""
+    held: list[Path] = []
+    try:
+        yield _prepare(Path(audio_path), held)
+    finally:
+        for p in held:
+            _release(p)
+
+
+def _prepare(src: Path, held: list[Path]) -> dict:
+    size = src.stat().st_size
+    info = {
+        "path": src,
+        "method": "original",
+        "source_bytes": size,
+        "upload_bytes": size,
+        "prepare_seconds": 0.0,
+    }
+    if not prepare_enabled():
+        return info
+    t0 = time.perf_counter()
+    kbps = _bitrate_kbps()
+    duration = duration_of(src)
+    if duration and duration * kbps * 125 * _CONTAINER_OVERHEAD >= size:
+        return info  # already compact; re-encoding cannot win
+
+    digest = source_hash(src)
+    cdir = cache_dir()
+    target = cdir / f"{digest}-{kbps}k.ogg"
+    skip = cdir / f"{digest}-{kbps}k.skip"
+    _hold(target)
+    held.append(target)
+    if target.exists():
+        os.utime(target)  # recently used: pruned last
+        info.update(path=target, method="cached", upload_bytes=target.stat().st_size)
+    elif not skip.exists():
+        cdir.mkdir(parents=True, exist_ok=True)
+        tmp = cdir / f"{digest}-{kbps}k.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            method = _encode(src, tmp, kbps)
+            if method and tmp.stat().st_size < size:
+                tmp.replace(target)
+                info.update(path=target, method=method, upload_bytes=target.stat().st_size)
+                _prune()
+            elif method:
+                skip.touch()  # encoded larger than the source: don't try again
+        finally:
+            tmp.unlink(missing_ok=True)
+    info["prepare_seconds"] = round(time.perf_counter() - t0, 3)
+    return info
@@ -0,0 +1,278 @@
+"""Indexed vocabulary store (SQLite) over the vocabulary .txt files.
+
+The .txt files stay the source of truth (hand-edited, versioned). Each file is
+parsed into the index once per change of its (mtime, size); after that listing,
+lookups and adds are indexed queries instead of full-file reads. Terms are
+deduplicated on their NFKC-normalized form (full-width ＡＩ == AI), so the
+first spelling in the file is the one that reaches the prompt.
+
+Namespaces follow the file naming convention: {project}_vocabulary.txt is
+namespace "{project}" (general_vocabulary.txt is "general"), any other file is
+its stem. A line may carry a weight after a tab ("ウラナイロ\\t3", default 1);
+prompts list higher weights first, then file order.
+
+The index is a cache: if it cannot be opened (read-only HOME, a locked or
+corrupt DB) prompt_terms() parses the .txt files directly instead.
+
+  WHISPER_VOCAB_DB=~/.cache/whisper-mcp/vocabulary.db (env override)
+"""
+
+import os
+import sqlite3
+import unicodedata
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    namespace TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_namespace ON files (namespace);
+CREATE TABLE IF NOT EXISTS terms (
+    file_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    term TEXT NOT NULL,
+    weight REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (file_id, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS terms_key ON terms (key);
+"""
+
+_SUFFIX = "_vocabulary"
+
+
+def db_path() -> Path:
+    return Path(
+        os.environ.get(
+            "WHISPER_VOCAB_DB", str(Path.home() / ".cache" / "whisper-mcp" / "vocabulary.db")
+        )
+    ).expanduser()
+
+
+def normalize(term: str) -> str:
+    """Dedupe key: NFKC with runs of whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", term).split())
+
+
+def namespace_of(path: str | Path) -> str:
+    stem = Path(path).stem
+    return stem[: -len(_SUFFIX)] if stem.endswith(_SUFFIX) and stem != _SUFFIX else stem
+
+
+def parse_line(line: str) -> tuple[str, float] | None:
+    """(term, weight) for a vocabulary line, None for blanks and comments."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    term, sep, weight = line.rpartition("\t")
+    if sep:
+        try:
+            return term.strip(), float(weight)
+        except ValueError:
+            pass
+    return line, 1.0
+
+
+def connect() -> sqlite3.Connection:
+    p = db_path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(p, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _sync(conn: sqlite3.Connection, path: Path) -> int | None:
+    """Bring one file's index up to date; returns its file id (None if the file is gone)."""
+    key = str(path.resolve())
+    row = conn.execute("SELECT id, mtime_ns, size FROM files WHERE path = ?", (key,)).fetchone()
+    try:
+        st = path.stat()
+    except OSError:
+        if row:
+            conn.execute("DELETE FROM terms WHERE file_id = ?", (row[0],))
+            conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+        return None
+    if row and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+        return row[0]
+
+    if row:
+        fid = row[0]
+        conn.execute("DELETE FROM terms WHERE file_id = ?", (fid,))
+        conn.execute(
+            "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+            (st.st_mtime_ns, st.st_size, fid),
+        )
+    else:
+        fid = conn.execute(
+            "INSERT INTO files (path, namespace, mtime_ns, size) VALUES (?, ?, ?, ?)",
+            (key, namespace_of(path), st.st_mtime_ns, st.st_size),
+        ).lastrowid
+    conn.executemany(
+        "INSERT INTO terms (file_id, key, term, weight, position) VALUES (?, ?, ?, ?, ?)",
+        [(fid, k, t, w, pos) for k, (t, w, pos) in _parse_file(path).items()],
+    )
+    return fid
+
+
+def _parse_file(path: Path) -> dict[str, tuple[str, float, int]]:
+    """key → (first spelling, highest weight, position) for one vocabulary file."""
+    seen: dict[str, tuple[str, float, int]] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        parsed = parse_line(line)
+        if parsed is None or not parsed[0]:
+            continue
+        term, weight = parsed
+        k = normalize(term)
+        if k in seen:  # keep the first spelling, the highest weight
+            first, w, pos = seen[k]
+            seen[k] = (first, max(w, weight), pos)
+        else:
+            seen[k] = (term, weight, len(seen))
+    return seen
+
+
+def sync_dirs(conn: sqlite3.Connection, dirs: list[Path]) -> list[tuple[Path, Path, int]]:
+    """Index every *.txt in dirs; returns (vocab dir, file, file id) in listing order."""
+    out = []
+    with conn:
+        for vdir in dirs:
+            if vdir.exists():
+                for f in sorted(vdir.glob("*.txt")):
+                    fid = _sync(conn, f)
+                    if fid is not None:
+                        out.append((vdir, f, fid))
+    return out
+
+
+def term_count(conn: sqlite3.Connection, file_id: int) -> int:
+    return conn.execute("SELECT COUNT(*) FROM terms WHERE file_id = ?", (file_id,)).fetchone()[0]
+
+
+def prompt_terms(
+    path: str | Path | None = None,
+    namespaces: list[str] | None = None,
+    dirs: list[Path] | None = None,
+    limit: int = 200,
+) -> list[str]:
+    """Terms for a prompt: the file's terms plus every file in `namespaces` (searched in
+    `dirs`), deduplicated across files, by weight then file order."""
+    try:
+        rows = _indexed_rows(path, namespaces, dirs)
+    except (sqlite3.Error, OSError):
+        rows = _parsed_rows(path, namespaces, dirs)
+    rows.sort(key=lambda r: (-r[3], r[0], r[4]))
+    terms: dict[str, str] = {}
+    for _, key, term, _, _ in rows:
+        terms.setdefault(key, term)
+        if len(terms) >= limit:
+            break
+    return list(terms.values())
+
+
+def _indexed_rows(
+    path: str | Path | None, namespaces: list[str] | None, dirs: list[Path] | None
+) -> list[tuple[int, str, str, float, int]]:
+    """(file rank, key, term, weight, position) from the index."""
+    conn = connect()
+    try:
+        ids: list[int] = []
+        with conn:
+            if path:
+                fid = _sync(conn, Path(path).expanduser())
+                if fid is not None:
+                    ids.append(fid)
+        if namespaces and dirs:
+            wanted = set(namespaces)
+            ids += [fid for _, f, fid in sync_dirs(conn, dirs) if namespace_of(f) in wanted]
+        if not ids:
+            return []
+        rank = {fid: i for i, fid in enumerate(dict.fromkeys(ids))}
+        rows = conn.execute(
+            f"SELECT file_id, key, term, weight, position FROM terms "
+            f"WHERE file_id IN ({','.join('?' * len(rank))})",
+            list(rank),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [(rank[fid], *rest) for fid, *rest in rows]
+
+
+def _parsed_rows(
+    path: str | Path | None, namespaces: list[str] | None, dirs: list[Path] | None
+) -> list[tuple[int, str, str, float, int]]:
+    """The same rows as _indexed_rows, read straight from the .txt files."""
+    files: list[Path] = []
+    if path and Path(path).expanduser().exists():
+        files.append(Path(path).expanduser().resolve())
+    if namespaces and dirs:
+        wanted = set(namespaces)
+        for vdir in dirs:
+            if vdir.exists():
+                files += [
+                    f.resolve() for f in sorted(vdir.glob("*.txt")) if namespace_of(f) in wanted
+                ]
+    return [
+        (rank, k, t, w, pos)
+        for rank, f in enumerate(dict.fromkeys(files))
+        for k, (t, w, pos) in _parse_file(f).items()
+    ]
+
+
+def add_terms(
+    path: str | Path, entries: list[tuple[str, float]]
+) -> tuple[list[str], list[str], int]:
+    """Append new terms to the file and the index. Returns (added, skipped, total)."""
+    p = Path(path).expanduser()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    conn = connect()
+    try:
+        with conn:
+            # Writers queue here, so a concurrent add sees this one's terms (and file).
+            conn.execute("BEGIN IMMEDIATE")
+            fid = _sync(conn, p)
+            if fid is None:
+                p.touch()
+                fid = _sync(conn, p)
+            pos = conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM terms WHERE file_id = ?", (fid,)
+            ).fetchone()[0]
+            added: list[str] = []
+            lines: list[str] = []
+            skipped: list[str] = []
+            for term, weight in entries:
+                term = " ".join(term.split())
+                k = normalize(term)
+                if (
+                    not k
+                    or not conn.execute(
+                        "INSERT INTO terms (file_id, key, term, weight, position) "
+                        "VALUES (?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                        (fid, k, term, weight, pos),
+                    ).rowcount
+                ):
+                    skipped.append(term)
+                    continue
+                pos += 1
+                added.append(term)
+                lines.append(term if weight == 1.0 else f"{term}\t{weight:g}")
+            if lines:
+                with open(p, "rb+") as f:
+                    if f.seek(0, os.SEEK_END):
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":  # hand-edited file without a final newline
+                            lines.insert(0, "")
+                    f.write(("\n".join(lines) + "\n").encode("utf-8"))
+                st = p.stat()
+                conn.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                    (st.st_mtime_ns, st.st_size, fid),
+                )
+            total = term_count(conn, fid)
+    finally:
+        conn.close()
+    return added, skipped, total
@@ -3,6 +3,8 @@
 import os
 from pathlib import Path
 
+from .vocab_store import add_terms, connect, namespace_of, prompt_terms, sync_dirs, term_count
+
 _DEFAULT_VOCAB_DIR = Path(
     os.environ.get(
         "WHISPER_VOCAB_DIR", str(Path(__file__).resolve().parent.parent / "vocabularies")
@@ -20,38 +22,43 @@ def get_vocab_dirs(extra_dirs: list[Path] | None = None) -> list[Path]:
     return dirs
 
 
-def load_vocabulary(vocab_path: str) -> str:
-    """Load vocabulary file and return as comma-separated prompt string."""
-    p = Path(vocab_path).expanduser()
-    if not p.exists():
+def load_vocabulary(
+    vocab_path: str,
+    namespaces: list[str] | None = None,
+    extra_dirs: list[Path] | None = None,
+) -> str:
+    """Build a comma-separated prompt string from the vocabulary store.
+
+    vocab_path's terms come first in weight order; `namespaces` (e.g.
+    ["general", "uranairo"]) add every {namespace}_vocabulary.txt found in the
+    vocabulary directories. Duplicates (NFKC) are dropped; capped at 200 terms.
+    """
+    p = Path(vocab_path).expanduser() if vocab_path else None
+    if p is not None and not p.exists():
+        p = None
+    if p is None and not namespaces:
         return ""
-    terms = []
-    for line in p.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if line and not line.startswith("#"):
-            terms.append(line)
-    return ", ".join(terms[:200])
+    return ", ".join(prompt_terms(p, namespaces, get_vocab_dirs(extra_dirs)))
 
 
 def vocabulary_list(extra_dirs: list[Path] | None = None) -> dict:
     """List available vocabulary files for Whisper transcription."""
     try:
         vocabs = []
-        for vdir in get_vocab_dirs(extra_dirs):
-            if vdir.exists():
-                for f in sorted(vdir.glob("*.txt")):
-                    lines = f.read_text(encoding="utf-8").splitlines()
-                    terms = [
-                        ln.strip() for ln in lines if ln.strip() and not ln.strip().startswith("#")
-                    ]
-                    vocabs.append(
-                        {
-                            "name": f.name,
-                            "path": str(f),
-                            "term_count": len(terms),
-                            "source": str(vdir),
-                        }
-                    )
+        conn = connect()
+        try:
+            for vdir, f, fid in sync_dirs(conn, get_vocab_dirs(extra_dirs)):
+                vocabs.append(
+                    {
+                        "name": f.name,
+                        "path": str(f),
+                        "namespace": namespace_of(f),
+                        "term_count": term_count(conn, fid),
+                        "source": str(vdir),
+                    }
+                )
+        finally:
+            conn.close()
 
         return {
             "status": "success",
@@ -63,40 +70,30 @@ def vocabulary_list(extra_dirs: list[Path] | None = None) -> dict:
         return {"status": "error", "message": str(e)}
 
 
-def vocabulary_add(vocab_file: str, terms: list[str]) -> dict:
-    """Add terms to a vocabulary file. Duplicates are automatically skipped."""
-    try:
-        p = Path(vocab_file).expanduser()
-        p.parent.mkdir(parents=True, exist_ok=True)
-
-        existing = set()
-        if p.exists():
-            for line in p.read_text(encoding="utf-8").splitlines():
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    existing.add(line)
+def vocabulary_add(vocab_file: str, terms: list) -> dict:
+    """Add terms to a vocabulary file. Duplicates (after NFKC normalization) are skipped.
 
-        added = []
-        skipped = []
-        for term in terms:
-            term = term.strip()
-            if term and term not in existing:
-                existing.add(term)
-                added.append(term)
+    Each term is a string or {"term": ..., "weight": ...}; weighted terms are
+    listed earlier in prompts.
+    """
+    try:
+        entries = []
+        for t in terms:
+            if isinstance(t, dict):
+                entries.append((str(t.get("term", "")), float(t.get("weight", 1.0))))
             else:
-                skipped.append(term)
-
-        if added:
-            with open(p, "a", encoding="utf-8") as f:
-                f.write("\n".join(added) + "\n")
+                entries.append((str(t), 1.0))
+        p = Path(vocab_file).expanduser()
+        added, skipped, total = add_terms(p, entries)
 
         return {
             "status": "success",
             "added": len(added),
             "skipped": len(skipped),
             "added_terms": added,
-            "total_terms": len(existing),
+            "total_terms": total,
             "file": str(p),
+            "namespace": namespace_of(p),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Autotune faster-whisper settings for this host.
+
+Usage:
+    python3 scripts/autotune.py <sample_audio> [--tolerance 0.02] [--seconds 60]
+
+Writes the fastest (compute_type, cpu_threads, num_workers, beam_size) whose
+character error rate stays within tolerance to WHISPER_PROFILE_PATH
+(default ~/.cache/whisper-mcp/profile.json). lib.core picks it up automatically.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+_app_dir = Path(__file__).resolve().parent.parent
+if str(_app_dir) not in sys.path:
+    sys.path.insert(0, str(_app_dir))
+
+from lib.autotune import autotune
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Autotune faster-whisper settings")
+    parser.add_argument("sample")
+    parser.add_argument("--model", default="")
+    parser.add_argument("--language", default="ja")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="max CER vs reference")
+    parser.add_argument("--seconds", type=float, default=60.0, help="sample length to decode")
+    parser.add_argument("--dry-run", action="store_true", help="do not write the profile")
+    args = parser.parse_args()
+
+    result = autotune(
+        args.sample,
+        model=args.model,
+        language=args.language,
+        tolerance=args.tolerance,
+        sample_seconds=args.seconds,
+        save=not args.dry_run,
+    )
+    for t in result.get("trials", []):
+        if "error" in t:
+            print(f"  {t['config']}  error: {t['error']}")
+        else:
+            print(f"  {t['config']}  RTF={t['rtf']:.4f}  CER={t['cer']:.4f}")
+    if result["status"] != "success":
+        print(f"❌ {result['message']}")
+        sys.exit(1)
+    print(f"✅ best: {result['config']}  RTF={result['rtf']:.4f}  CER={result['cer']:.4f}")
+    if "profile_path" in result:
+        print(f"   saved: {result['profile_path']}")
+
+
+if __name__ == "__main__":
+    main()
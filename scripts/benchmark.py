@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Whisper benchmark harness.
+
+Usage:
+    python3 scripts/benchmark.py decode <audio> [<audio> ...] [--batch-size 8]
+    python3 scripts/benchmark.py pack [--clips 300] [--source <audio>]
+    python3 scripts/benchmark.py formats [--segments 100000]
+    python3 scripts/benchmark.py reload [--segments 100000]
+    python3 scripts/benchmark.py upload <audio> [<audio> ...] [--mbps 20] [--api]
+
+decode — compare faster-whisper sequential vs batched decoding (RTF and text
+         similarity against the sequential output).
+pack   — throughput of per-file vs packed decoding on many short clips
+         (cut from --source, or synthetic tone bursts when omitted).
+formats — lib.formats (to_srt/to_vtt + json.dumps) vs SegmentTable.emit on
+          synthetic segments. Needs no model.
+reload  — json.loads of the indent=2 .json output vs load_wseg of the .wseg sidecar.
+upload  — bytes sent to the API for the original file vs the lib.upload audio-only
+          Opus copy, with transfer time at --mbps; --api also times real
+          transcription requests for both (needs OPENAI_API_KEY).
+"""
+
+import argparse
+import difflib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+_app_dir = Path(__file__).resolve().parent.parent
+if str(_app_dir) not in sys.path:
+    sys.path.insert(0, str(_app_dir))
+
+from lib import core
+from lib import upload as upload_prep
+from lib.formats import load_wseg, to_srt, to_vtt, write_wseg
+from lib.packing import transcribe_packed
+from lib.segments import SegmentTable
+
+
+def _similarity(a: str, b: str) -> float:
+    """Character-level similarity (0..1) — Japanese has no word boundaries."""
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def bench_decode(args: argparse.Namespace) -> None:
+    core._get_faster_whisper_model()  # exclude model load from the timings
+    core._get_batched_pipeline()
+    print(f"{'file':<32} {'mode':<18} {'audio_s':>8} {'wall_s':>8} {'RTF':>7} {'sim':>6}")
+    for audio in args.audio:
+        path = Path(audio).expanduser()
+        baseline = None
+        for mode in ("sequential", "batched"):
+            t0 = time.perf_counter()
+            result = core._transcribe_faster_whisper(
+                path, args.language, "", decode_mode=mode, batch_size=args.batch_size
+            )
+            wall = time.perf_counter() - t0
+            if baseline is None:
+                baseline = result.text
+            rtf = wall / result.duration if result.duration else 0.0
+            sim = _similarity(baseline, result.text)
+            print(
+                f"{path.name[:32]:<32} {result.decode_mode[:18]:<18} "
+                f"{result.duration:>8.1f} {wall:>8.1f} {rtf:>7.3f} {sim:>6.3f}"
+            )
+
+
+def _make_clips(out_dir: Path, n: int, source: str, seed: int = 0) -> list[tuple[Path, float]]:
+    """Write n mono 16kHz WAV clips of 5–30s; return (path, duration) pairs."""
+    import numpy as np
+
+    rng = random.Random(seed)
+    src = None
+    if source:
+        from faster_whisper import decode_audio
+
+        src = decode_audio(str(Path(source).expanduser()))
+    clips = []
+    for i in range(n):
+        seconds = rng.uniform(5.0, 30.0)
+        length = int(seconds * 16000)
+        if src is not None and len(src) > length:
+            start = rng.randrange(0, len(src) - length)
+            audio = src[start : start + length]
+        else:
+            t = np.arange(length) / 16000
+            audio = 0.1 * np.sin(2 * np.pi * rng.uniform(150, 400) * t) * (np.sin(t * 3) > 0)
+        p = out_dir / f"clip_{i:04d}.wav"
+        with wave.open(str(p), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+        clips.append((p, seconds))
+    return clips
+
+
+def bench_pack(args: argparse.Namespace) -> None:
+    core._get_faster_whisper_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        clips = _make_clips(tmp_dir, args.clips, args.source)
+        audio_total = sum(d for _, d in clips)
+        out_dir = tmp_dir / "transcripts"
+        out_dir.mkdir()
+        formats = ["txt", "srt", "vtt", "json"]
+
+        t0 = time.perf_counter()
+        for path, _ in clips:
+            r = core._transcribe_faster_whisper(path, args.language, "")
+            core._write_outputs(r, path.stem, out_dir, formats)
+        per_file = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        decoded = transcribe_packed(clips, args.language, "", args.batch_size)
+        for path, r in decoded.items():
+            core._write_outputs(r, path.stem, out_dir, formats)
+        packed = time.perf_counter() - t0
+
+    print(f"{args.clips} clips, {audio_total:.0f}s audio")
+    for name, wall in (("per-file", per_file), ("packed", packed)):
+        print(
+            f"  {name:<9} wall={wall:8.1f}s  clips/s={args.clips / wall:7.2f}  "
+            f"RTF={wall / audio_total:.4f}"
+        )
+
+
+def _synthetic_segments(count: int) -> list[dict]:
+    rng = random.Random(0)
+    segments = []
+    t = 0.0
+    for i in range(count):
+        d = rng.uniform(0.5, 8.0)
+        segments.append(
+            {
+                "start": t,
+                "end": t + d,
+                "text": f" 第{i}発言 今日の議題について確認します ",
+                "avg_logprob": -rng.random(),
+                "compression_ratio": 1.0 + rng.random(),
+                "no_speech_prob": rng.random() / 10,
+            }
+        )
+        t += d
+    return segments
+
+
+def bench_formats(args: argparse.Namespace) -> None:
+    segments = _synthetic_segments(args.segments)
+    text = " ".join(s["text"].strip() for s in segments)
+
+    def legacy() -> None:
+        to_srt(segments)
+        to_vtt(segments)
+        json.dumps(
+            {"text": text, "segments": segments, "language": "ja"}, ensure_ascii=False, indent=2
+        )
+
+    def legacy_subtitles() -> None:
+        to_srt(segments)
+        to_vtt(segments)
+
+    def table(formats: list) -> None:
+        SegmentTable.from_segments(segments).emit(formats, text, "ja")
+
+    cases = [
+        ("lib.formats srt+vtt", legacy_subtitles),
+        ("SegmentTable srt+vtt", lambda: table(["srt", "vtt"])),
+        ("lib.formats txt/srt/vtt/json", legacy),
+        ("SegmentTable txt/srt/vtt/json", lambda: table(["txt", "srt", "vtt", "json"])),
+    ]
+    print(f"{args.segments} segments, best of {args.repeat}")
+    for name, fn in cases:
+        best = min(_timed(fn) for _ in range(args.repeat))
+        print(f"  {name:<32} {best * 1000:9.1f} ms")
+
+
+def bench_reload(args: argparse.Namespace) -> None:
+    segments = _synthetic_segments(args.segments)
+    text = " ".join(s["text"].strip() for s in segments)
+    table = SegmentTable.from_segments(segments)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "t.json"
+        wseg_path = Path(tmp) / "t.wseg"
+        json_path.write_text(table.emit(["json"], text, "ja")["json"], encoding="utf-8")
+        write_wseg(wseg_path, table, text, "ja")
+
+        cases = [
+            ("json.loads", lambda: json.loads(json_path.read_text(encoding="utf-8"))),
+            ("load_wseg (mmap)", lambda: load_wseg(wseg_path)),
+            ("load_wseg (read)", lambda: load_wseg(wseg_path, use_mmap=False)),
+        ]
+        print(
+            f"{args.segments} segments: json {json_path.stat().st_size / 1e6:.1f} MB, "
+            f"wseg {wseg_path.stat().st_size / 1e6:.1f} MB, best of {args.repeat}"
+        )
+        for name, fn in cases:
+            best = min(_timed(fn) for _ in range(args.repeat))
+            print(f"  {name:<20} {best * 1000:9.1f} ms")
+
+
+def _api_request_seconds(path: Path, language: str) -> float | None:
+    if path.stat().st_size > 25 * 1024 * 1024:
+        return None  # over the API limit
+    client = core.get_api_client()
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        client.audio.transcriptions.create(model="whisper-1", file=f, language=language)
+    return time.perf_counter() - t0
+
+
+def bench_upload(args: argparse.Namespace) -> None:
+    def _fmt(v: float | None) -> str:
+        return f"{v:>8.1f}" if v is not None else f"{'>25MB':>8}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["WHISPER_API_UPLOAD_CACHE"] = tmp  # measure the encode, not a cache hit
+        print(
+            f"{'file':<32} {'orig_MB':>8} {'sent_MB':>8} {'ratio':>6} {'prep_s':>7} "
+            f"{'xfer_s':>8} {'xfer_s*':>8}" + (f" {'api_s':>8} {'api_s*':>8}" if args.api else "")
+        )
+        total_src = total_sent = 0
+        for audio in args.audio:
+            path = Path(audio).expanduser()
+            info = upload_prep.prepare_upload(path)
+            src, sent = info["source_bytes"], info["upload_bytes"]
+            total_src += src
+            total_sent += sent
+            line = (
+                f"{path.name[:32]:<32} {src / 1e6:>8.1f} {sent / 1e6:>8.1f} "
+                f"{sent / src:>6.2f} {info['prepare_seconds']:>7.1f} "
+                f"{src * 8 / (args.mbps * 1e6):>8.1f} {sent * 8 / (args.mbps * 1e6):>8.1f}"
+            )
+            if args.api:
+                line += f" {_fmt(_api_request_seconds(path, args.language))}"
+                line += f" {_fmt(_api_request_seconds(info['path'], args.language))}"
+            print(line)
+        if total_src:
+            print(
+                f"total: {total_src / 1e6:.1f} MB → {total_sent / 1e6:.1f} MB "
+                f"({total_sent / total_src:.0%}); * = after preparation, xfer at {args.mbps} Mbps"
+            )
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("decode", help="sequential vs batched faster-whisper decoding")
+    p.add_argument("audio", nargs="+")
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--language", default="ja")
+    p.set_defaults(func=bench_decode)
+
+    p = sub.add_parser("pack", help="per-file vs packed decoding of short clips")
+    p.add_argument("--clips", type=int, default=300)
+    p.add_argument("--source", default="", help="cut clips from this recording")
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--language", default="ja")
+    p.set_defaults(func=bench_pack)
+
+    p = sub.add_parser("formats", help="lib.formats vs SegmentTable emitter")
+    p.add_argument("--segments", type=int, default=100_000)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_formats)
+
+    p = sub.add_parser("reload", help="json.loads vs load_wseg")
+    p.add_argument("--segments", type=int, default=100_000)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_reload)
+
+    p = sub.add_parser("upload", help="API upload bytes/time: original vs audio-only Opus")
+    p.add_argument("audio", nargs="+")
+    p.add_argument("--mbps", type=float, default=20.0, help="uplink speed for transfer time")
+    p.add_argument("--api", action="store_true", help="also time real API requests")
+    p.add_argument("--language", default="ja")
+    p.set_defaults(func=bench_upload)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
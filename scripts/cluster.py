@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Distributed transcription: one coordinator, many workers (see lib/distributed.py).
+
+Usage:
+    python3 scripts/cluster.py coordinator <meetings_base_dir> [--port 8765] [--vocab FILE]
+    python3 scripts/cluster.py worker <coordinator_url> [--id NAME]
+    python3 scripts/cluster.py local <meetings_base_dir> [--workers 3]
+
+local — coordinator plus N worker processes on this machine (stand-ins for nodes).
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+_app_dir = Path(__file__).resolve().parent.parent
+if str(_app_dir) not in sys.path:
+    sys.path.insert(0, str(_app_dir))
+
+from lib.distributed import Coordinator, run_worker, serve_coordinator
+
+
+def _report(coord: Coordinator, poll: float = 5.0) -> None:
+    """Print results as they stream in until every job is done or failed."""
+    seen = 0
+    while True:
+        for r in coord.results(seen):
+            mark = "✅" if r.get("status") == "success" else "❌"
+            print(f"{mark} {r['meeting']} ({r.get('worker')}) {r.get('message', '')}", flush=True)
+            seen += 1
+        if coord.finished():
+            break
+        time.sleep(poll)
+    print(json.dumps(coord.status()["counts"], ensure_ascii=False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Distributed Whisper transcription")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("coordinator")
+    p.add_argument("meetings_base_dir")
+    p.add_argument(
+        "--host", default="127.0.0.1", help="other than loopback needs WHISPER_CLUSTER_TOKEN"
+    )
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--vocab", default="")
+    p.add_argument("--lease", type=float, default=60.0, help="lease seconds")
+
+    p = sub.add_parser("worker")
+    p.add_argument("coordinator_url")
+    p.add_argument("--id", default="")
+
+    p = sub.add_parser("local")
+    p.add_argument("meetings_base_dir")
+    p.add_argument("--workers", type=int, default=3)
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--vocab", default="")
+    p.add_argument("--lease", type=float, default=60.0, help="lease seconds")
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        run_worker(args.coordinator_url, worker_id=args.id)
+        return
+
+    coord = Coordinator(args.meetings_base_dir, args.vocab, lease_seconds=args.lease)
+    host = getattr(args, "host", "127.0.0.1")
+    try:
+        server = serve_coordinator(coord, host, args.port)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"coordinator: {coord.status()['total']} jobs on port {server.server_address[1]}")
+
+    procs = []
+    if args.command == "local":
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        for i in range(args.workers):
+            proc = multiprocessing.Process(
+                target=run_worker, kwargs={"coordinator_url": url, "worker_id": f"local{i}"}
+            )
+            proc.start()
+            procs.append(proc)
+
+    try:
+        _report(coord)
+    finally:
+        for proc in procs:
+            proc.terminate()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
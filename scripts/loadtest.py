@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Load test for server.py with a deterministic stub backend (runs offline).
+
+Usage:
+    python3 scripts/loadtest.py [--clients 8] [--seconds 60] [--mix transcribe=6,status=3,batch=1]
+                                [--rtf 0.05] [--job-mb 300] [--audio-seconds 60] [--json]
+
+The FastMCP app from server.py is driven in-process through fastmcp.Client's
+in-memory transport, so every call goes through the real MCP tool layer, the
+event loop and asyncio.to_thread. Only the decode is stubbed: it sleeps for
+audio duration * --rtf, holds --job-mb of touched memory and returns one
+segment per 5s. Model loading, the API and the network are never touched, and
+every cache/state path is redirected into a temporary directory.
+
+Each simulated client opens its own session and issues calls picked from --mix
+(seeded, so runs are repeatable). Reported: per-tool latency percentiles and
+errors, throughput (calls/s, audio seconds/s), event-loop lag measured by a
+10ms heartbeat, and RSS (start / peak / end) sampled every 50ms.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from pathlib import Path
+
+_app_dir = Path(__file__).resolve().parent.parent
+if str(_app_dir) not in sys.path:
+    sys.path.insert(0, str(_app_dir))
+
+_RATE = 16000
+_FRAME = 1600  # 100ms
+_SEGMENT_SECONDS = 5.0
+_HEARTBEAT = 0.01
+_MB = 1024 * 1024
+
+
+def _isolate(tmp: Path, args: argparse.Namespace) -> None:
+    """Point every cache and state file at tmp and force the local backend.
+
+    Must run before lib/server are imported (some paths are read at import time).
+    Decodes stay in this process (WHISPER_ISOLATION=thread): supervised workers
+    re-import lib.core and would never see the stub backend.
+    """
+    os.environ.update(
+        {
+            "WHISPER_BACKEND": "local",
+            "WHISPER_ISOLATION": "thread",
+            "OPENAI_API_KEY": "",
+            "WHISPER_CASCADE": "0",
+            "WHISPER_FASTER_MODEL": "stub",
+            "WHISPER_VOCAB_DIR": str(tmp / "vocabularies"),
+            "WHISPER_VOCAB_DB": str(tmp / "vocabulary.db"),
+            "WHISPER_SEARCH_DB": str(tmp / "search.db"),
+            "WHISPER_SCHEDULE_STATE": str(tmp / "schedule.json"),
+            "WHISPER_LANGUAGE_CACHE": str(tmp / "languages.json"),
+            "WHISPER_FINGERPRINT_CACHE": str(tmp / "fingerprints.json"),
+            "WHISPER_API_UPLOAD_CACHE": str(tmp / "uploads"),
+            "WHISPER_PROFILE_PATH": str(tmp / "profile.json"),
+            "WHISPER_QUARANTINE_PATH": str(tmp / "quarantine.json"),
+            "WHISPER_MEMORY_BUDGET_MB": str(args.budget_mb),
+            "WHISPER_LOCAL_WORKERS": str(args.local_workers),
+        }
+    )
+    (tmp / "vocabularies").mkdir()
+    (tmp / "vocabularies" / "general_vocabulary.txt").write_text(
+        "ウラナイロ\nMCP\nfaster-whisper\n", encoding="utf-8"
+    )
+
+
+def install_stub_backend(rtf: float, job_mb: int) -> None:
+    """Replace the faster-whisper decode in lib.core with a sleep + memory hold.
+
+    The governor still admits each job (with job_mb as its estimate), so queueing
+    under the memory budget is exercised as in production.
+    """
+    from lib import core
+
+    def _decode(audio_path, language, prompt, decode_mode="sequential", batch_size=8):
+        duration = core.duration_of(audio_path) or 0.0
+        hold = bytearray(b"\x01") * (job_mb * _MB)  # touched, so it counts in RSS
+        time.sleep(duration * rtf)
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + _SEGMENT_SECONDS)
+            segments.append(
+                {
+                    "id": len(segments),
+                    "start": start,
+                    "end": end,
+                    "text": f"セグメント{len(segments)} {Path(audio_path).stem}",
+                }
+            )
+            start = end
+        del hold
+        return core._WhisperResult(
+            text="".join(s["text"] for s in segments),
+            segments=segments,
+            language=language or "ja",
+            duration=duration,
+            decode_mode=decode_mode,
+        )
+
+    core._get_local_backend = lambda: "faster_whisper"
+    core._local_job_estimate = lambda lb, duration, cascade=False, loaded=None: (
+        "stub",
+        job_mb * _MB,
+    )
+    core._transcribe_faster_whisper = _decode
+
+
+def write_wav(path: Path, seconds: float, rng: random.Random) -> None:
+    """Mono 16kHz WAV whose loudness changes every 100ms (unique per file, so the
+    duplicate detector does not collapse the workload)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(_RATE)
+        for _ in range(int(seconds * _RATE) // _FRAME):
+            w.writeframes(array("h", [rng.randrange(-8000, 8000)]) * _FRAME)
+
+
+class Workload:
+    """Audio files for whisper_transcribe and fresh meeting trees for whisper_batch."""
+
+    def __init__(self, root: Path, args: argparse.Namespace):
+        self.root = root
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.files = [self._audio(root / "files" / f"memo{i:03d}.wav") for i in range(args.files)]
+        self._batches = 0
+        self._lock = threading.Lock()
+
+    def _audio(self, path: Path) -> Path:
+        seconds = self.args.audio_seconds * self.rng.uniform(0.5, 1.5)
+        write_wav(path, seconds, self.rng)
+        return path
+
+    def meetings(self) -> Path:
+        """A new base dir with --batch-meetings unprocessed meetings."""
+        with self._lock:
+            self._batches += 1
+            base = self.root / "batches" / f"b{self._batches:04d}"
+            for i in range(self.args.batch_meetings):
+                self._audio(base / "202601" / f"meeting{i:02d}" / "audio.wav")
+        return base
+
+
+def _payload(result) -> dict:
+    """Tool return value from a fastmcp call_tool result (2.x object or content list)."""
+    data = getattr(result, "structured_content", None)
+    if isinstance(data, dict):
+        return data["result"] if set(data) == {"result"} else data
+    content = getattr(result, "content", result)
+    try:
+        return json.loads(content[0].text)
+    except (IndexError, AttributeError, TypeError, ValueError):
+        return {}
+
+
+def _parse_mix(spec: str) -> tuple[list[str], list[float]]:
+    tools, weights = [], []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        tools.append(name.strip())
+        weights.append(float(weight or 1))
+    unknown = set(tools) - {"transcribe", "status", "batch", "metrics"}
+    if unknown:
+        raise SystemExit(f"unknown tool in --mix: {', '.join(sorted(unknown))}")
+    return tools, weights
+
+
+def _arguments(tool: str, workload: Workload, rng: random.Random) -> tuple[str, dict]:
+    if tool == "transcribe":
+        return "whisper_transcribe", {
+            "audio_path": str(rng.choice(workload.files)),
+            "vocabulary_namespaces": "general",
+        }
+    if tool == "batch":
+        return "whisper_batch", {"meetings_base_dir": str(workload.meetings())}
+    if tool == "metrics":
+        return "whisper_metrics", {"format": "json"}
+    return "whisper_status", {}
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.05):
+        from lib.governor import current_rss
+
+        self._current = current_rss
+        self.start = self.peak = self.end = current_rss()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+
+    def _run(self, interval: float) -> None:
+        while not self._done.wait(interval):
+            self.peak = max(self.peak, self._current())
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._done.set()
+        self._thread.join()
+        self.end = self._current()
+        self.peak = max(self.peak, self.end)
+
+
+async def _heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how late each 10ms tick fires: time the loop was blocked."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(_HEARTBEAT)
+        lags.append(max(0.0, loop.time() - t0 - _HEARTBEAT))
+
+
+async def _client(
+    mcp, cid: int, workload: Workload, args: argparse.Namespace, deadline: float, calls: list
+) -> None:
+    from fastmcp import Client
+
+    tools, weights = _parse_mix(args.mix)
+    rng = random.Random(args.seed * 1000 + cid)
+    async with Client(mcp) as client:
+        n = 0
+        while time.monotonic() < deadline and (not args.requests or n < args.requests):
+            tool = rng.choices(tools, weights)[0]
+            name, arguments = await asyncio.to_thread(_arguments, tool, workload, rng)
+            t0 = time.perf_counter()
+            try:
+                result = await client.call_tool(name, arguments)
+                payload = _payload(result)
+                ok = payload.get("status") in ("success", "ready", "no_backend")
+                error = "" if ok else str(payload.get("message", payload.get("status")))
+            except Exception as e:  # ToolError, transport errors
+                payload, ok, error = {}, False, str(e)
+            calls.append(
+                {
+                    "client": cid,
+                    "tool": tool,
+                    "seconds": time.perf_counter() - t0,
+                    "ok": ok,
+                    "error": error,
+                    "audio_seconds": _audio_seconds(tool, payload),
+                }
+            )
+            n += 1
+
+
+def _audio_seconds(tool: str, payload: dict) -> float:
+    if tool == "transcribe":
+        return (payload.get("timing") or {}).get("audio_seconds") or 0.0
+    if tool == "batch":
+        return sum(
+            (r.get("timing") or {}).get("audio_seconds") or 0.0 for r in payload.get("results", [])
+        )
+    return 0.0
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(calls: list[dict], lags: list[float], wall: float, rss: RssSampler) -> dict:
+    per_tool = {}
+    for tool in sorted({c["tool"] for c in calls}):
+        mine = [c for c in calls if c["tool"] == tool]
+        secs = [c["seconds"] for c in mine]
+        errors = [c["error"] for c in mine if not c["ok"]]
+        per_tool[tool] = {
+            "calls": len(mine),
+            "errors": len(errors),
+            "first_error": errors[0] if errors else None,
+            "p50": round(_percentile(secs, 0.50), 4),
+            "p90": round(_percentile(secs, 0.90), 4),
+            "p99": round(_percentile(secs, 0.99), 4),
+            "max": round(max(secs), 4),
+        }
+    peak_maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_maxrss *= 1 if sys.platform == "darwin" else 1024
+    return {
+        "wall_seconds": round(wall, 2),
+        "calls": len(calls),
+        "calls_per_second": round(len(calls) / wall, 2) if wall else 0.0,
+        "audio_seconds_per_second": round(sum(c["audio_seconds"] for c in calls) / wall, 2)
+        if wall
+        else 0.0,
+        "tools": per_tool,
+        "loop_lag": {
+            "p50_ms": round(_percentile(lags, 0.50) * 1000, 2),
+            "p99_ms": round(_percentile(lags, 0.99) * 1000, 2),
+            "max_ms": round(max(lags, default=0.0) * 1000, 2),
+            "stalls_over_100ms": sum(1 for x in lags if x > 0.1),
+        },
+        "rss_mb": {
+            "start": round(rss.start / _MB, 1),
+            "peak": round(max(rss.peak, peak_maxrss) / _MB, 1),
+            "end": round(rss.end / _MB, 1),
+            "growth": round((rss.end - rss.start) / _MB, 1),
+        },
+    }
+
+
+def _print(report: dict, args: argparse.Namespace) -> None:
+    print(
+        f"clients={args.clients} mix={args.mix} rtf={args.rtf} job_mb={args.job_mb} "
+        f"budget_mb={args.budget_mb} wall={report['wall_seconds']}s"
+    )
+    print(
+        f"{'tool':<12} {'calls':>6} {'err':>4} {'p50_s':>8} {'p90_s':>8} {'p99_s':>8} {'max_s':>8}"
+    )
+    for tool, t in report["tools"].items():
+        print(
+            f"{tool:<12} {t['calls']:>6} {t['errors']:>4} {t['p50']:>8.3f} {t['p90']:>8.3f} "
+            f"{t['p99']:>8.3f} {t['max']:>8.3f}"
+        )
+        if t["first_error"]:
+            print(f"{'':<12} first error: {t['first_error'][:100]}")
+    lag, rss = report["loop_lag"], report["rss_mb"]
+    print(
+        f"throughput: {report['calls_per_second']} calls/s, "
+        f"{report['audio_seconds_per_second']} audio s/s"
+    )
+    print(
+        f"loop lag: p50 {lag['p50_ms']}ms, p99 {lag['p99_ms']}ms, max {lag['max_ms']}ms, "
+        f"{lag['stalls_over_100ms']} stalls >100ms"
+    )
+    print(
+        f"rss: start {rss['start']}MB, peak {rss['peak']}MB, end {rss['end']}MB "
+        f"(growth {rss['growth']}MB)"
+    )
+
+
+async def run(args: argparse.Namespace, tmp: Path) -> dict:
+    _isolate(tmp, args)
+    install_stub_backend(args.rtf, args.job_mb)
+    import server
+
+    workload = Workload(tmp, args)
+    calls: list[dict] = []
+    lags: list[float] = []
+    stop = asyncio.Event()
+    with RssSampler() as rss:
+        beat = asyncio.create_task(_heartbeat(lags, stop))
+        t0 = time.monotonic()
+        deadline = t0 + args.seconds
+        await asyncio.gather(
+            *(_client(server.mcp, i, workload, args, deadline, calls) for i in range(args.clients))
+        )
+        wall = time.monotonic() - t0
+        stop.set()
+        await beat
+    return summarize(calls, lags, wall, rss)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the Whisper MCP server offline")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=60.0, help="test duration")
+    parser.add_argument("--requests", type=int, default=0, help="per client (0 = until --seconds)")
+    parser.add_argument("--mix", default="transcribe=6,status=3,batch=1")
+    parser.add_argument("--rtf", type=float, default=0.05, help="stub decode wall / audio")
+    parser.add_argument("--job-mb", type=int, default=300, help="stub memory held per decode")
+    parser.add_argument("--budget-mb", type=int, default=2048, help="WHISPER_MEMORY_BUDGET_MB")
+    parser.add_argument("--local-workers", type=int, default=2, help="WHISPER_LOCAL_WORKERS")
+    parser.add_argument("--audio-seconds", type=float, default=60.0, help="mean file duration")
+    parser.add_argument("--files", type=int, default=16, help="audio files for transcribe")
+    parser.add_argument("--batch-meetings", type=int, default=3, help="meetings per batch call")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    _parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory(prefix="whisper-loadtest-") as tmp:
+        report = asyncio.run(run(args, Path(tmp)))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print(report, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Transcribe a recording while it is still being written (see lib/tail.py).
+
+Usage:
+    python3 scripts/tail_transcribe.py <recording.wav|recording.pcm|segment_dir> [--vocab FILE]
+                                       [--window 30] [--idle 15] [--language ja]
+
+Committed segments are printed as they are decoded and appended to
+transcripts/<name>.live.{txt,srt,vtt}. When the recording stops growing for
+--idle seconds the tail is re-decoded and the final outputs are written.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+_app_dir = Path(__file__).resolve().parent.parent
+if str(_app_dir) not in sys.path:
+    sys.path.insert(0, str(_app_dir))
+
+from lib.formats import seconds_to_vtt_time
+from lib.tail import tail_transcribe
+
+
+def _print_segments(segments: list[dict]) -> None:
+    for seg in segments:
+        print(f"[{seconds_to_vtt_time(seg['start'])}] {seg['text']}", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Transcribe a growing recording")
+    parser.add_argument("audio")
+    parser.add_argument("--vocab", default="")
+    parser.add_argument("--language", default="ja")
+    parser.add_argument("--output-dir", default="")
+    parser.add_argument("--window", type=float, default=0, help="seconds per decode window")
+    parser.add_argument("--idle", type=float, default=0, help="seconds without growth = done")
+    args = parser.parse_args()
+
+    result = tail_transcribe(
+        args.audio,
+        output_dir=args.output_dir,
+        vocabulary_path=args.vocab,
+        language=args.language,
+        window_seconds=args.window,
+        idle_seconds=args.idle,
+        on_segments=_print_segments,
+    )
+    if result["status"] != "success":
+        print(f"❌ {result['message']}", file=sys.stderr)
+        sys.exit(1)
+    print(
+        json.dumps({"output_files": result["output_files"], **result["tail"]}, ensure_ascii=False)
+    )
+
+
+if __name__ == "__main__":
+    main()
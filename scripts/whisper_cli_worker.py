@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Persistent openai-whisper worker for the CLI backend (see lib/cli_worker.py).
+
+Run with the Python that owns the `whisper` CLI (it imports only the whisper
+package and the stdlib, not lib/):
+
+    /usr/local/opt/python@3.10/bin/python3.10 scripts/whisper_cli_worker.py --model medium
+
+The model is loaded once, then jobs are read from stdin as JSON lines:
+
+    {"id": 1, "audio": "/path/a.m4a", "language": "ja", "initial_prompt": "..."}
+
+and answered on stdout, one line each:
+
+    {"id": 1, "ok": true, "text": "...", "segments": [...], "language": "ja", "seconds": 12.3}
+    {"id": 1, "ok": false, "error": "RuntimeError: ..."}
+
+The first line written is {"ready": true, "model", "pid", "load_seconds"}.
+Anything whisper prints goes to stderr so stdout carries only the protocol.
+The decode options match _transcribe_local_cli's command line.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Same as the one-shot CLI invocation in lib/core.py.
+DECODE_OPTIONS = {
+    "fp16": False,  # Intel Mac: no FP16
+    "condition_on_previous_text": False,  # suppress hallucination loops
+    "no_speech_threshold": 0.6,  # suppress silence hallucinations
+    "verbose": None,  # no per-segment printing
+}
+
+
+def handle(model, request: dict) -> dict:
+    """Decode one request with a loaded model."""
+    started = time.perf_counter()
+    kwargs = dict(DECODE_OPTIONS)
+    if request.get("language"):
+        kwargs["language"] = request["language"]
+    if request.get("initial_prompt"):
+        kwargs["initial_prompt"] = request["initial_prompt"]
+    result = model.transcribe(request["audio"], **kwargs)
+    return {
+        "id": request.get("id"),
+        "ok": True,
+        "text": result.get("text", "").strip(),
+        "segments": result.get("segments", []),
+        "language": result.get("language", request.get("language")),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def serve(model, stdin, stdout) -> None:
+    """Answer JSON-line requests until stdin closes."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        request: dict = {}
+        try:
+            request = json.loads(line)
+            reply = handle(model, request)
+        except Exception as e:
+            reply = {"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+        stdout.write(json.dumps(reply, ensure_ascii=False) + "\n")
+        stdout.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Persistent openai-whisper worker")
+    parser.add_argument("--model", default="medium")
+    parser.add_argument("--device", default=None)
+    args = parser.parse_args()
+
+    protocol = sys.stdout
+    sys.stdout = sys.stderr  # keep library output off the protocol stream
+
+    started = time.perf_counter()
+    import whisper
+
+    model = whisper.load_model(args.model, device=args.device)
+    protocol.write(
+        json.dumps(
+            {
+                "ready": True,
+                "model": args.model,
+                "pid": os.getpid(),
+                "load_seconds": round(time.perf_counter() - started, 3),
+            }
+        )
+        + "\n"
+    )
+    protocol.flush()
+    serve(model, sys.stdin, protocol)
+
+
+if __name__ == "__main__":
+    main()
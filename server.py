@@ -8,6 +8,7 @@
     python3 server.py
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -33,16 +34,26 @@
 from lib import (
     dictionary_add as lib_dictionary_add,
 )
+from lib import (
+    dictionary_compact as lib_dictionary_compact,
+)
 from lib import (
     dictionary_list as lib_dictionary_list,
 )
 from lib import (
     get_local_status,
+    get_metrics,
     get_vocab_dirs,
 )
 from lib import (
     process_voice_memos as lib_process_voice_memos,
 )
+from lib import (
+    rebuild_search_index as lib_rebuild_search_index,
+)
+from lib import (
+    search as lib_search,
+)
 from lib import (
     transcribe as lib_transcribe,
 )
@@ -52,12 +63,26 @@
 from lib import (
     vocabulary_list as lib_vocabulary_list,
 )
+from lib.snapshot import snapshot
 
 mcp = FastMCP("whisper")
 
 _APP_VOCAB_DIR = _app_dir / "vocabularies"
 
 
+def _vocab_watch() -> list[Path]:
+    dirs = get_vocab_dirs()
+    return dirs + [f for d in dirs if d.exists() for f in sorted(d.glob("*.txt"))]
+
+
+def _vocab_listing() -> list[dict]:
+    listing = lib_vocabulary_list()
+    return [
+        {"name": v["name"], "path": v["path"], "lines": v["term_count"]}
+        for v in listing.get("vocabularies", [])
+    ]
+
+
 @mcp.tool()
 async def whisper_status() -> dict:
     """Whisper MCP server の状態確認（バックエンド・API key・語彙一覧）"""
@@ -65,21 +90,7 @@ async def whisper_status() -> dict:
     configured = bool(api_key)
     local = get_local_status()
 
-    vocabs = []
-    for vdir in get_vocab_dirs():
-        if vdir.exists():
-            for f in sorted(vdir.glob("*.txt")):
-                vocabs.append(
-                    {
-                        "name": f.name,
-                        "path": str(f),
-                        "lines": sum(
-                            1
-                            for line in f.read_text(encoding="utf-8").splitlines()
-                            if line.strip() and not line.strip().startswith("#")
-                        ),
-                    }
-                )
+    vocabs = snapshot("vocabularies", _vocab_watch, _vocab_listing)
 
     effective_backend = os.environ.get("WHISPER_BACKEND", "auto")
     status_val = "ready" if (local["local_backend"] != "none" or configured) else "no_backend"
@@ -96,10 +107,28 @@ async def whisper_status() -> dict:
         "environment": "docker" if local["is_docker"] else "local",
         "vocabularies": vocabs,
         "vocab_dirs": [str(d) for d in get_vocab_dirs()],
+        "memory": local["memory"],
+        "routing": local["routing"],
+        "api_dispatcher": local["api_dispatcher"],
+        "supervisor": local["supervisor"],
+        "cli_worker": local["cli_worker"],
         "version": "3.0.0",
     }
 
 
+@mcp.tool()
+async def whisper_metrics(format: str = "prometheus") -> dict:
+    """処理メトリクス（ジョブ数・RTF/処理時間ヒストグラム・キャッシュヒット率・メモリ）。
+
+    format: "prometheus" (default) — Prometheus テキスト形式を text に格納
+            "json" — 累計・直近ウィンドウ (WHISPER_METRICS_WINDOW_SECONDS) の集計を dict で返す
+    """
+    metrics = get_metrics()
+    if format == "json":
+        return {"status": "success", "format": "json", **metrics.snapshot()}
+    return {"status": "success", "format": "prometheus", "text": metrics.render_prometheus()}
+
+
 @mcp.tool()
 async def whisper_transcribe(
     audio_path: str,
@@ -109,17 +138,27 @@ async def whisper_transcribe(
     language: str = "ja",
     output_formats: str = "txt,srt,vtt,json",
     backend: str = "auto",
+    decode_mode: str = "",
+    vocabulary_namespaces: str = "",
 ) -> dict:
     """音声ファイルを文字起こし（後処理辞書による自動修正付き）。
 
     output_dir 未指定時は audio_path の transcripts/ に保存。
     vocabulary_path で語彙辞書を指定すると固有名詞認識が向上。
+    vocabulary_namespaces: カンマ区切りのプロジェクト名 (例: "general,uranairo")。
+             語彙ディレクトリの {name}_vocabulary.txt を重複除去してプロンプトに追加
 
     backend: "auto" (default) — Mac はローカル優先・Docker は API
              "local"          — ローカルモデルのみ（25MB制限なし）
              "api"            — OpenAI API のみ
+    language: 言語コード (default: ja)。"auto" は短い区間だけで言語判定してから本処理
+             (判定結果はディレクトリ単位でキャッシュ、言語別の語彙 foo.<lang>.txt を自動選択)
+    decode_mode: "sequential" | "batched" — faster-whisper のデコード方式
+             (未指定時は WHISPER_DECODE_MODE。batched は多コア CPU で高速)
     """
-    return lib_transcribe(
+    # Decodes run in worker threads so concurrent calls reach the memory governor.
+    return await asyncio.to_thread(
+        lib_transcribe,
         audio_path=audio_path,
         output_dir=output_dir,
         vocabulary_path=vocabulary_path,
@@ -127,6 +166,8 @@ async def whisper_transcribe(
         language=language,
         output_formats=output_formats,
         backend=backend,
+        decode_mode=decode_mode,
+        vocabulary_namespaces=[n.strip() for n in vocabulary_namespaces.split(",") if n.strip()],
     )
 
 
@@ -134,13 +175,25 @@ async def whisper_transcribe(
 async def whisper_batch(
     meetings_base_dir: str,
     vocabulary_path: str = "",
+    policy: str = "",
+    deadline_minutes: float = 0,
+    max_api_cost_usd: float | None = None,
 ) -> dict:
     """ディレクトリ内の未処理会議を一括文字起こし。
     transcripts/*.txt が存在しない会議が対象。
+
+    policy: 処理順 "shortest"(短い順) | "oldest"(古い順) | "deadline"(締切順) | "path"
+            (未指定時は WHISPER_SCHEDULE)。結果には各ジョブと全体の ETA が付く。
+    deadline_minutes: 指定するとローカルと API を同時に使い、締切内に終わるよう振り分け
+            (max_api_cost_usd で API 費用の上限。結果に所要時間と費用を報告)
     """
-    return lib_batch(
+    return await asyncio.to_thread(
+        lib_batch,
         meetings_base_dir=meetings_base_dir,
         vocabulary_path=vocabulary_path,
+        policy=policy,
+        deadline_minutes=deadline_minutes,
+        max_api_cost_usd=max_api_cost_usd,
     )
 
 
@@ -149,7 +202,31 @@ async def whisper_process_voice_memos() -> dict:
     """Meetings ディレクトリのボイスメモを自動スキャン＆文字起こし。
     Docker: /meetings, Local: ~/Library/CloudStorage/SynologyDrive-tds224plus_home/Meetings/
     """
-    return lib_process_voice_memos()
+    return await asyncio.to_thread(lib_process_voice_memos)
+
+
+@mcp.tool()
+async def whisper_search(
+    query: str,
+    limit: int = 20,
+    meeting: str = "",
+    date_from: str = "",
+    date_to: str = "",
+) -> dict:
+    """過去の文字起こしを全文検索（タイムスタンプ付き・関連度順）。
+    meeting で会議名の部分一致、date_from / date_to (YYYY-MM-DD) で期間を絞り込み。
+    """
+    return await asyncio.to_thread(
+        lib_search, query, limit=limit, meeting=meeting, date_from=date_from, date_to=date_to
+    )
+
+
+@mcp.tool()
+async def whisper_search_rebuild(root_dir: str) -> dict:
+    """root_dir 配下の transcripts/*.json を検索インデックスに一括登録（既存ツリー用）。
+    更新のないファイルはスキップ、削除されたファイルはインデックスから除去。
+    """
+    return await asyncio.to_thread(lib_rebuild_search_index, root_dir)
 
 
 @mcp.tool()
@@ -172,9 +249,17 @@ async def whisper_dictionary_list() -> dict:
 
 @mcp.tool()
 async def whisper_dictionary_add(dict_file: str, entries: list) -> dict:
-    """後処理辞書にエントリを追加。重複はスキップ。"""
+    """後処理辞書にエントリを追加。重複はスキップ。
+    追加分は *.dict.json.journal に追記され、一定件数で JSON 本体に自動統合される。
+    """
     return lib_dictionary_add(dict_file, entries)
 
 
+@mcp.tool()
+async def whisper_dictionary_compact(dict_file: str) -> dict:
+    """後処理辞書のジャーナル (*.dict.json.journal) を JSON 本体に統合（git 管理前などに）"""
+    return lib_dictionary_compact(dict_file)
+
+
 if __name__ == "__main__":
     mcp.run()
@@ -0,0 +1,154 @@
+"""Tests for lib/api_client.py — dispatcher against a local throttling HTTP server."""
+
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from lib.api_client import ApiDispatcher, TokenBucket, is_retryable, retry_after
+
+
+class _Throttle:
+    """Admit `per_window` requests per `window` seconds; 429 + Retry-After otherwise."""
+
+    def __init__(self, per_window: int, window: float):
+        self.per_window = per_window
+        self.window = window
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rejected = 0
+        self.served = 0
+
+    def admit(self) -> float | None:
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.window:
+                self.window_start, self.count = now, 0
+            if self.count >= self.per_window:
+                self.rejected += 1
+                return self.window - (now - self.window_start)
+            self.count += 1
+            return None
+
+
+@pytest.fixture
+def server():
+    throttle = _Throttle(per_window=3, window=0.3)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", "0")))
+            wait = throttle.admit()
+            if wait is not None:
+                self.send_response(429)
+                self.send_header("Retry-After", f"{wait:.3f}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            with throttle.lock:
+                throttle.in_flight += 1
+                throttle.max_in_flight = max(throttle.max_in_flight, throttle.in_flight)
+            time.sleep(0.05)
+            with throttle.lock:
+                throttle.in_flight -= 1
+                throttle.served += 1
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", throttle
+    httpd.shutdown()
+
+
+def _upload(url: str, i: int):
+    def _call() -> str:
+        req = urllib.request.Request(f"{url}/upload/{i}", data=b"x" * 1024, method="POST")
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.read().decode()
+
+    return _call
+
+
+def test_concurrent_uploads_survive_throttling(server):
+    url, throttle = server
+    dispatcher = ApiDispatcher(concurrency=4, rpm=60_000, max_retries=20)
+    results: dict[int, str] = {}
+
+    def _worker(i: int) -> None:
+        results[i] = dispatcher.call(_upload(url, i))
+
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+
+    assert results == {i: f"/upload/{i}" for i in range(12)}
+    assert throttle.served == 12
+    assert 1 < throttle.max_in_flight <= 4
+    assert throttle.rejected > 0
+    assert dispatcher.stats["throttled"] == throttle.rejected
+
+
+def test_non_retryable_error_raises_immediately(server):
+    url, _ = server
+    dispatcher = ApiDispatcher(concurrency=1, rpm=60_000)
+    calls = []
+
+    def _bad() -> None:
+        calls.append(1)
+        urllib.request.urlopen(f"{url}/missing", timeout=5)  # GET → 501
+
+    with pytest.raises(urllib.error.HTTPError):
+        dispatcher.call(_bad)
+    assert len(calls) == 1
+
+
+def test_token_bucket_paces_after_burst():
+    now = [0.0]
+    slept = []
+
+    def _sleep(s):
+        slept.append(s)
+        now[0] += s
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=_sleep)
+    waits = [bucket.acquire() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.5)
+    assert waits[3] == pytest.approx(0.5)
+    assert now[0] == pytest.approx(1.0)
+
+
+def test_retry_after_and_classification():
+    class FakeResponse:
+        headers = {"retry-after-ms": "250"}
+
+    class FakeStatusError(Exception):
+        status_code = 429
+        response = FakeResponse()
+
+    exc = FakeStatusError()
+    assert retry_after(exc) == 0.25
+    assert is_retryable(exc)
+    assert not is_retryable(ValueError("bad input"))
+    assert is_retryable(ConnectionResetError())
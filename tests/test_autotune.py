@@ -0,0 +1,110 @@
+"""Tests for lib/autotune.py — no model loads or decoding."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.autotune import (
+    _default_candidates,
+    _run_trial,
+    char_error_rate,
+    load_profile,
+    save_profile,
+    select_best,
+)
+
+
+def test_char_error_rate_identical():
+    assert char_error_rate("今日は会議です", "今日は会議です") == 0.0
+
+
+def test_char_error_rate_substitution():
+    assert char_error_rate("abcd", "abxd") == 0.25
+
+
+def test_char_error_rate_ignores_spaces():
+    assert char_error_rate("今日は 会議", "今日は会議") == 0.0
+
+
+def test_select_best_respects_tolerance():
+    trials = [
+        {"config": {"beam_size": 1}, "rtf": 0.05, "cer": 0.10},
+        {"config": {"beam_size": 5}, "rtf": 0.20, "cer": 0.01},
+        {"config": {"beam_size": 3}, "rtf": 0.10, "cer": 0.02},
+    ]
+    assert select_best(trials, 0.02)["config"] == {"beam_size": 3}
+    assert select_best(trials, 0.0) is None
+
+
+def test_profile_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_PROFILE_PATH", str(tmp_path / "profile.json"))
+    config = {"compute_type": "int8", "cpu_threads": 4, "num_workers": 1, "beam_size": 1}
+    save_profile({"model": "m", "cpu_count": os.cpu_count(), "config": config})
+    assert load_profile("m") == config
+    assert load_profile("other-model") is None
+
+
+def test_profile_other_host_ignored(tmp_path, monkeypatch):
+    p = tmp_path / "profile.json"
+    monkeypatch.setenv("WHISPER_PROFILE_PATH", str(p))
+    p.write_text(json.dumps({"model": "m", "cpu_count": -1, "config": {}}), encoding="utf-8")
+    assert load_profile("m") is None
+
+
+def test_trial_times_a_single_decode():
+    calls = []
+
+    class _Seg:
+        text = " 会議 "
+
+    class _Model:
+        def transcribe(self, audio, **kwargs):
+            calls.append(kwargs)
+            return iter([_Seg(), _Seg()]), None
+
+    text, wall = _run_trial(_Model(), [0.0] * 16000, "ja", 1)
+    assert text == "会議 会議"
+    assert wall >= 0
+    assert calls == [{"language": "ja", "beam_size": 1}]
+
+
+def test_trial_runs_the_configured_concurrency():
+    import threading
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(3, timeout=5)
+
+    class _Seg:
+        text = "会議"
+
+    class _Model:
+        def transcribe(self, audio, **kwargs):
+            def _segments():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                barrier.wait()  # all three decodes are in flight together
+                with lock:
+                    active[0] -= 1
+                yield _Seg()
+
+            return _segments(), None
+
+    text, _ = _run_trial(_Model(), [0.0] * 16000, "ja", 1, concurrency=3)
+    assert text == "会議"
+    assert peak[0] == 3
+
+
+def test_num_workers_candidates_follow_local_workers(monkeypatch):
+    monkeypatch.delenv("WHISPER_ISOLATION", raising=False)
+    monkeypatch.delenv("WHISPER_LOCAL_WORKERS", raising=False)
+    assert _default_candidates()["num_workers"] == [1]
+    monkeypatch.setenv("WHISPER_LOCAL_WORKERS", "3")
+    assert _default_candidates()["num_workers"] == [1, 3]
+    # Supervised workers each own a model and decode one job at a time.
+    monkeypatch.setenv("WHISPER_ISOLATION", "process")
+    assert _default_candidates()["num_workers"] == [1]
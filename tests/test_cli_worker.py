@@ -0,0 +1,216 @@
+"""Tests for lib/cli_worker.py and scripts/whisper_cli_worker.py — a fake worker script
+speaks the JSON-lines protocol (no whisper install needed)."""
+
+import importlib.util
+import io
+import json
+import sys
+import textwrap
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.cli_worker as cli_worker
+import lib.core as core
+from lib.cli_worker import CliWorker, CliWorkerError, CliWorkerStartError
+from lib.governor import ResourceGovernor, model_bytes
+
+_MB = 1024 * 1024
+
+_FAKE = textwrap.dedent(
+    """
+    import json, os, sys, time
+    marker = sys.argv[1]
+    print(json.dumps({"ready": True, "pid": os.getpid(), "load_seconds": 0.0}), flush=True)
+    for line in sys.stdin:
+        req = json.loads(line)
+        name = os.path.basename(req["audio"])
+        if name == "crash.wav" or (name == "crash-once.wav" and not os.path.exists(marker)):
+            open(marker, "w").close()
+            print("Segmentation fault", file=sys.stderr, flush=True)
+            os._exit(139)
+        if name == "hang.wav":
+            time.sleep(60)
+        if name == "bad.wav":
+            reply = {"id": req["id"], "ok": False, "error": "RuntimeError: bad container"}
+        else:
+            seg = {"id": 0, "start": 0.0, "end": 1.0, "text": "こんにちは " + str(os.getpid())}
+            reply = {"id": req["id"], "ok": True, "text": seg["text"], "segments": [seg],
+                     "language": req["language"] or "ja", "seconds": 0.01}
+        print(json.dumps(reply, ensure_ascii=False), flush=True)
+    """
+)
+
+
+@pytest.fixture
+def fake_cmd(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(_FAKE, encoding="utf-8")
+    return [sys.executable, str(script), str(tmp_path / "crashed")]
+
+
+@pytest.fixture
+def worker(fake_cmd):
+    w = CliWorker(fake_cmd, start_seconds=10)
+    yield w
+    w.stop()
+
+
+def test_worker_stays_warm_across_jobs(worker):
+    a = worker.transcribe("/x/a.wav", "ja", "")
+    b = worker.transcribe("/x/b.wav", "", "語彙")
+    assert a["segments"][0]["text"] == b["segments"][0]["text"]  # same process
+    assert a["language"] == "ja"
+    assert worker.status()["starts"] == 1 and worker.status()["jobs"] == 2
+
+
+def test_crash_restarts_and_retries_once(worker):
+    worker.transcribe("/x/warm.wav", "ja", "")
+    reply = worker.transcribe("/x/crash-once.wav", "ja", "")
+    assert reply["ok"]
+    assert worker.status()["restarts"] == 1
+
+
+def test_repeated_crash_raises_with_stderr(worker):
+    with pytest.raises(CliWorkerError, match="Segmentation fault"):
+        worker.transcribe("/x/crash.wav", "ja", "")
+    # The next job gets a fresh worker.
+    assert worker.transcribe("/x/ok.wav", "ja", "")["ok"]
+
+
+def test_decode_error_keeps_worker(worker):
+    pid = worker.transcribe("/x/a.wav", "ja", "")["segments"][0]["text"]
+    with pytest.raises(RuntimeError, match="bad container"):
+        worker.transcribe("/x/bad.wav", "ja", "")
+    assert worker.transcribe("/x/a.wav", "ja", "")["segments"][0]["text"] == pid
+    assert worker.status()["restarts"] == 0
+
+
+def test_hung_job_times_out_without_retry(worker):
+    with pytest.raises(CliWorkerError, match="no answer"):
+        worker.transcribe("/x/hang.wav", "ja", "", timeout=0.5)
+    assert worker.status()["starts"] == 1
+    assert worker.transcribe("/x/a.wav", "ja", "")["ok"]
+
+
+def test_start_failure(tmp_path):
+    script = tmp_path / "broken.py"
+    script.write_text("import sys; print('ModuleNotFoundError: whisper', file=sys.stderr)")
+    w = CliWorker([sys.executable, str(script)], start_seconds=10)
+    with pytest.raises(CliWorkerStartError, match="whisper"):
+        w.transcribe("/x/a.wav", "ja", "")
+
+
+def test_failed_start_is_not_retried_until_cooldown(tmp_path, monkeypatch):
+    script = tmp_path / "broken.py"
+    script.write_text("import sys; print('ModuleNotFoundError: whisper', file=sys.stderr)")
+    w = CliWorker([sys.executable, str(script)], start_seconds=10)
+    with pytest.raises(CliWorkerStartError):
+        w.transcribe("/x/a.wav", "ja", "")
+    with pytest.raises(CliWorkerStartError, match="failed recently"):
+        w.transcribe("/x/b.wav", "ja", "")
+    assert w.status()["starts"] == 1 and w.status()["start_error"]
+
+    monkeypatch.setenv("WHISPER_CLI_WORKER_RETRY_SECONDS", "0")
+    with pytest.raises(CliWorkerStartError, match="whisper"):
+        w.transcribe("/x/c.wav", "ja", "")
+    assert w.status()["starts"] == 2
+
+
+def test_live_worker_reserves_its_model(fake_cmd, monkeypatch):
+    governor = ResourceGovernor(budget_bytes=1000 * _MB)
+    monkeypatch.setattr(cli_worker, "get_governor", lambda: governor)
+    w = CliWorker(fake_cmd, start_seconds=10, resident_bytes=300 * _MB)
+    assert governor.snapshot()["in_use_mb"] == 0
+    w.transcribe("/x/a.wav", "ja", "")
+    assert governor.snapshot()["in_use_mb"] == 300
+    with pytest.raises(CliWorkerError):
+        w.transcribe("/x/crash.wav", "ja", "")
+    assert governor.snapshot()["in_use_mb"] == 0  # died twice, nothing alive
+    w.transcribe("/x/a.wav", "ja", "")
+    assert governor.snapshot()["in_use_mb"] == 300
+    assert w.stop_if_idle(0)
+    assert governor.snapshot()["in_use_mb"] == 0
+
+
+def test_cli_jobs_on_a_live_worker_skip_the_model_estimate(monkeypatch, fake_cmd):
+    monkeypatch.setattr(cli_worker, "_workers", {})
+    monkeypatch.setattr(cli_worker, "_SCRIPT", Path(fake_cmd[1]))
+    monkeypatch.setenv("WHISPER_CLI_PYTHON", sys.executable)
+    model = core._local_model()
+    key, cold = core._local_job_estimate("cli", 600.0)
+    assert key.endswith(":cold")
+    worker = cli_worker.get_cli_worker(model)
+    worker.transcribe("/x/a.wav", "ja", "")
+    try:
+        key, warm = core._local_job_estimate("cli", 600.0)
+        assert key.endswith(":warm")
+        assert cold - warm == model_bytes(model, "float32")
+    finally:
+        worker.stop()
+    assert core._local_job_estimate("cli", 600.0)[0].endswith(":cold")
+
+
+def test_core_uses_worker_and_falls_back(tmp_path, monkeypatch, fake_cmd):
+    monkeypatch.setattr(cli_worker, "_workers", {})
+    monkeypatch.setattr(cli_worker, "_SCRIPT", Path(fake_cmd[1]))
+    monkeypatch.setenv("WHISPER_CLI_PYTHON", sys.executable)
+    audio = tmp_path / "memo.wav"
+    result = core._transcribe_local_cli(audio, "ja", "")
+    assert result.segments[0]["text"].startswith("こんにちは")
+    assert "cli_worker" in result.stats
+    for w in cli_worker._workers.values():
+        w.stop()
+
+    # No usable interpreter: one CLI process for the file, as before.
+    monkeypatch.setattr(cli_worker, "_workers", {})
+    monkeypatch.setenv("WHISPER_CLI_PYTHON", str(tmp_path / "missing-python"))
+    calls = []
+
+    def _run(cmd, **kwargs):
+        calls.append(cmd)
+        out = Path(cmd[cmd.index("--output_dir") + 1]) / "memo.json"
+        out.write_text(json.dumps({"text": "単発", "segments": [], "language": "ja"}))
+        return type("P", (), {"returncode": 0, "stdout": "", "stderr": ""})()
+
+    monkeypatch.setattr(core.subprocess, "run", _run)
+    assert core._transcribe_local_cli(audio, "ja", "").text == "単発"
+    assert calls
+
+
+def test_cli_python_from_shebang(tmp_path, monkeypatch):
+    monkeypatch.delenv("WHISPER_CLI_PYTHON", raising=False)
+    cli = tmp_path / "whisper"
+    cli.write_text("#!/opt/py310/bin/python3.10\nimport whisper\n")
+    monkeypatch.setattr(cli_worker.shutil, "which", lambda name: str(cli))
+    assert cli_worker.cli_python() == "/opt/py310/bin/python3.10"
+
+
+def test_worker_script_serve():
+    spec = importlib.util.spec_from_file_location(
+        "whisper_cli_worker",
+        Path(__file__).resolve().parent.parent / "scripts" / "whisper_cli_worker.py",
+    )
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+
+    class _Model:
+        def transcribe(self, audio, **kwargs):
+            if audio == "bad":
+                raise RuntimeError("cannot decode")
+            assert kwargs["fp16"] is False and kwargs["condition_on_previous_text"] is False
+            return {"text": " 議事録 ", "segments": [{"text": "議事録"}], "language": "ja"}
+
+    stdin = io.StringIO(
+        json.dumps({"id": 1, "audio": "a.wav", "language": "ja"})
+        + "\n\n"
+        + json.dumps({"id": 2, "audio": "bad"})
+        + "\n"
+    )
+    stdout = io.StringIO()
+    script.serve(_Model(), stdin, stdout)
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert replies[0]["ok"] and replies[0]["text"] == "議事録" and replies[0]["id"] == 1
+    assert replies[1] == {"id": 2, "ok": False, "error": "RuntimeError: cannot decode"}
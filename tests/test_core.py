@@ -0,0 +1,192 @@
+"""Tests for lib/core.py — faster-whisper is replaced by an in-memory fake."""
+
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.core as core
+
+
+class FakeSegment:
+    def __init__(self, start, end, text, avg_logprob=-0.2):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.avg_logprob = avg_logprob
+        self.compression_ratio = 1.2
+        self.no_speech_prob = 0.01
+
+
+class FakeInfo:
+    language = "ja"
+    duration = 4.0
+
+
+class FakeModel:
+    calls: list = []
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+
+    def transcribe(self, audio, **kwargs):
+        FakeModel.calls.append(("sequential", kwargs))
+        segments = [FakeSegment(0.0, 2.0, " こんにちは "), FakeSegment(2.0, 4.0, "世界")]
+        return iter(segments), FakeInfo()
+
+
+class FakeBatchedPipeline:
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, batch_size=16, **kwargs):
+        FakeModel.calls.append(("batched", batch_size))
+        return iter([FakeSegment(0.0, 4.0, "こんにちは世界")]), FakeInfo()
+
+
+@pytest.fixture
+def fake_fw(monkeypatch):
+    mod = types.ModuleType("faster_whisper")
+    mod.WhisperModel = FakeModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", mod)
+    monkeypatch.setattr(core, "_faster_whisper_models", {})
+    monkeypatch.setattr(core, "_batched_pipeline_cache", None)
+    monkeypatch.setenv("WHISPER_PROFILE_PATH", "/nonexistent/profile.json")
+    FakeModel.calls = []
+    return mod
+
+
+def test_faster_whisper_sequential(fake_fw):
+    result = core._transcribe_faster_whisper(Path("a.wav"), "ja", "")
+    assert result.text == "こんにちは 世界"
+    assert result.decode_mode == "sequential"
+    assert result.duration == 4.0
+    assert FakeModel.calls[0][1]["beam_size"] == 5
+
+
+def test_faster_whisper_batched(fake_fw):
+    fake_fw.BatchedInferencePipeline = FakeBatchedPipeline
+    result = core._transcribe_faster_whisper(Path("a.wav"), "ja", "", "batched", 4)
+    assert result.decode_mode == "batched:4"
+    assert FakeModel.calls == [("batched", 4)]
+
+
+def test_faster_whisper_batched_falls_back(fake_fw):
+    """Installs without BatchedInferencePipeline decode sequentially."""
+    result = core._transcribe_faster_whisper(Path("a.wav"), "ja", "", "batched", 4)
+    assert result.decode_mode == "sequential (batched unavailable)"
+    assert FakeModel.calls[0][0] == "sequential"
+    assert result.text == "こんにちは 世界"
+
+
+def test_faster_whisper_uses_tuned_profile(fake_fw, tmp_path, monkeypatch):
+    import json
+    import os
+
+    profile = tmp_path / "profile.json"
+    profile.write_text(
+        json.dumps(
+            {
+                "model": core._faster_model(),
+                "cpu_count": os.cpu_count(),
+                "config": {
+                    "compute_type": "int8",
+                    "cpu_threads": 3,
+                    "num_workers": 2,
+                    "beam_size": 1,
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("WHISPER_PROFILE_PATH", str(profile))
+    core._transcribe_faster_whisper(Path("a.wav"), "ja", "")
+    model = core._get_faster_whisper_model()
+    assert model.kwargs["cpu_threads"] == 3
+    assert model.kwargs["num_workers"] == 2
+    assert FakeModel.calls[0][1]["beam_size"] == 1
+
+
+def _seg(start, end, text, avg_logprob=-0.2, compression_ratio=1.2):
+    return {
+        "start": start,
+        "end": end,
+        "text": text,
+        "avg_logprob": avg_logprob,
+        "compression_ratio": compression_ratio,
+        "no_speech_prob": 0.01,
+    }
+
+
+def test_escalation_windows_merge_neighbours():
+    segs = [
+        _seg(0.0, 2.0, "a"),
+        _seg(2.0, 4.0, "b", avg_logprob=-1.2),
+        _seg(4.5, 6.0, "c", compression_ratio=3.0),
+        _seg(6.0, 9.0, "d"),
+        _seg(12.0, 14.0, "e", avg_logprob=-0.9),
+    ]
+    windows = core._escalation_windows(segs, core._CASCADE_THRESHOLDS)
+    assert windows == [(2.0, 6.0), (12.0, 14.0)]
+
+
+def test_splice_segments_replaces_only_windows():
+    draft = [_seg(0.0, 2.0, "a"), _seg(2.0, 4.0, "bad"), _seg(4.0, 6.0, "c")]
+    refined = [_seg(1.9, 4.1, "good"), _seg(5.0, 6.0, "outside")]
+    spliced = core._splice_segments(draft, refined, [(2.0, 4.0)])
+    assert [s["text"] for s in spliced] == ["a", "good", "c"]
+
+
+def test_transcribe_cascade_reports_escalation(fake_fw, monkeypatch):
+    class CascadeModel(FakeModel):
+        def transcribe(self, audio, **kwargs):
+            FakeModel.calls.append(("sequential", kwargs))
+            if "clip_timestamps" in kwargs:
+                return iter([FakeSegment(2.0, 4.0, "正しい")]), FakeInfo()
+            segs = [FakeSegment(0.0, 2.0, "前半"), FakeSegment(2.0, 4.0, "誤り", -1.5)]
+            return iter(segs), FakeInfo()
+
+    fake_fw.WhisperModel = CascadeModel
+    fake_fw.decode_audio = lambda path: [0.0] * 16000 * 4
+    result = core._transcribe_cascade(Path("a.wav"), "ja", "")
+    assert result.text == "前半 正しい"
+    assert FakeModel.calls[0][1]["beam_size"] == 1
+    assert FakeModel.calls[1][1]["clip_timestamps"] == [2.0, 4.0]
+    stats = result.stats["cascade"]
+    assert stats["segments_escalated"] == 1
+    assert stats["escalated_fraction"] == 0.5
+
+
+def test_guarded_decode_redecodes_loop_window(fake_fw):
+    class LoopingModel(FakeModel):
+        def transcribe(self, audio, **kwargs):
+            FakeModel.calls.append(("sequential", kwargs))
+            clip = kwargs.get("clip_timestamps")
+
+            def gen():
+                if clip is None:
+                    yield FakeSegment(0.0, 2.0, "会議を始めます")
+                    for i in range(20):
+                        yield FakeSegment(2.0 + i, 3.0 + i, "ありがとうございました")
+                elif len(clip) == 2:
+                    yield FakeSegment(clip[0], clip[0] + 5.0, "本来の発言")
+                else:
+                    yield FakeSegment(clip[0], clip[0] + 3.0, "続き")
+
+            return gen(), FakeInfo()
+
+    class LongInfo(FakeInfo):
+        duration = 120.0
+
+    fake_fw.WhisperModel = LoopingModel
+    model = LoopingModel()
+    segments_raw, _ = model.transcribe("a.wav")
+    segments, stats = core._guarded_decode(model, "a.wav", {}, segments_raw, LongInfo.duration)
+    assert [s["text"] for s in segments] == ["会議を始めます", "本来の発言", "続き"]
+    assert stats["aborts"] == 1
+    assert stats["redecoded_windows"] == [[2.0, 32.0]]
+    assert FakeModel.calls[1][1]["condition_on_previous_text"] is False
+    assert "condition_on_previous_text" not in FakeModel.calls[2][1]
@@ -1,11 +1,21 @@
 """Tests for lib/dictionary.py — no network or subprocess calls."""
 import json
+import multiprocessing
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from lib.dictionary import apply_dictionary, dictionary_add, load_dictionaries
+from lib.dictionary import (
+    apply_dictionary,
+    dictionary_add,
+    dictionary_compact,
+    journal_path,
+    load_dictionaries,
+    read_dictionary,
+)
 
 
 def test_apply_dictionary_basic():
@@ -66,3 +76,75 @@ def test_dictionary_add_invalid_entry(tmp_path):
     result = dictionary_add(str(dict_file), [{"from": "", "to": "bbb"}])
     assert result["skipped"] == 1
     assert result["added"] == 0
+
+
+def test_dictionary_add_appends_to_journal(tmp_path, monkeypatch):
+    import lib.vocabulary as vocab_mod
+
+    monkeypatch.setattr(vocab_mod, "_DEFAULT_VOCAB_DIR", tmp_path)
+    dict_file = tmp_path / "test.dict.json"
+    dictionary_add(str(dict_file), [{"from": "aaa", "to": "bbb"}])
+    base = dict_file.read_text(encoding="utf-8")
+    dictionary_add(str(dict_file), [{"from": "ccc", "to": "ddd"}])
+
+    assert dict_file.read_text(encoding="utf-8") == base  # base untouched
+    assert len(journal_path(dict_file).read_text(encoding="utf-8").splitlines()) == 2
+    assert {e["from"] for e in load_dictionaries()} == {"aaa", "ccc"}
+
+    result = dictionary_compact(str(dict_file))
+    assert result["merged"] == 2
+    assert not journal_path(dict_file).exists()
+    data = json.loads(dict_file.read_text(encoding="utf-8"))
+    assert [e["from"] for e in data["replacements"]] == ["aaa", "ccc"]
+
+
+def test_partial_journal_line_is_ignored(tmp_path):
+    dict_file = tmp_path / "test.dict.json"
+    dictionary_add(str(dict_file), [{"from": "aaa", "to": "bbb"}])
+    with open(journal_path(dict_file), "a", encoding="utf-8") as f:
+        f.write('{"from": "half", "to"')  # a writer mid-line
+    assert [e["from"] for e in read_dictionary(dict_file)["replacements"]] == ["aaa"]
+
+
+def test_journal_left_by_interrupted_compaction_is_not_duplicated(tmp_path):
+    dict_file = tmp_path / "test.dict.json"
+    dictionary_add(str(dict_file), [{"from": "aaa", "to": "bbb"}])
+    journal = journal_path(dict_file).read_text(encoding="utf-8")
+    dictionary_compact(str(dict_file))
+    journal_path(dict_file).write_text(journal, encoding="utf-8")  # unlink never happened
+    assert len(read_dictionary(dict_file)["replacements"]) == 1
+    assert dictionary_add(str(dict_file), [{"from": "aaa", "to": "x"}])["added"] == 0
+
+
+def _add_range(dict_file: str, worker: int, count: int) -> int:
+    added = 0
+    for i in range(count):
+        r = dictionary_add(
+            dict_file, [{"from": f"w{worker}-{i}", "to": "x"}, {"from": "shared", "to": "y"}]
+        )
+        assert r["status"] == "success", r
+        added += r["added"]
+    return added
+
+
+def test_concurrent_adds_lose_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_DICT_JOURNAL_MAX", "17")  # compactions interleave with adds
+    dict_file = str(tmp_path / "stress.dict.json")
+    totals = []
+    threads = [
+        threading.Thread(target=lambda w=w: totals.append(_add_range(dict_file, w, 30)))
+        for w in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=4, mp_context=ctx) as pool:
+        totals += list(pool.map(_add_range, [dict_file] * 4, range(6, 10), [30] * 4))
+
+    froms = [e["from"] for e in read_dictionary(dict_file)["replacements"]]
+    assert len(froms) == len(set(froms))
+    assert set(froms) == {f"w{w}-{i}" for w in range(10) for i in range(30)} | {"shared"}
+    assert sum(totals) == len(froms)
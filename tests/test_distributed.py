@@ -0,0 +1,188 @@
+"""Tests for lib/distributed.py — coordinator and workers on localhost."""
+
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from lib.distributed import Coordinator, run_worker, serve_coordinator
+
+
+def _stub_transcribe(audio_path: str, vocabulary_path: str = "") -> dict:
+    time.sleep(0.05)
+    return {"status": "success", "audio_file": audio_path}
+
+
+@pytest.fixture
+def cluster():
+    coord = Coordinator(lease_seconds=0.5)
+    for i in range(6):
+        coord.add_job(f"job{i}", f"meeting{i}", f"/audio/{i}.m4a")
+    server = serve_coordinator(coord, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield coord, url
+    server.shutdown()
+
+
+def _wait_finished(coord: Coordinator, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not coord.finished():
+        assert time.monotonic() < deadline, coord.status()
+        time.sleep(0.05)
+
+
+def test_workers_drain_queue(cluster):
+    coord, url = cluster
+    stop = threading.Event()
+    workers = [
+        threading.Thread(
+            target=run_worker,
+            kwargs={
+                "coordinator_url": url,
+                "worker_id": f"w{i}",
+                "transcribe_fn": _stub_transcribe,
+                "idle_seconds": 0.05,
+                "stop": stop,
+                "warm": False,
+            },
+        )
+        for i in range(3)
+    ]
+    for w in workers:
+        w.start()
+    _wait_finished(coord)
+    stop.set()
+    for w in workers:
+        w.join()
+
+    status = coord.status()
+    assert status["counts"] == {"done": 6}
+    assert len({r["audio_file"] for r in coord.results()}) == 6
+    assert len({r["worker"] for r in coord.results()}) > 1
+
+
+def test_dead_worker_lease_is_requeued(cluster):
+    coord, url = cluster
+    lost = coord.lease("dead-worker")  # leases a job, then never heartbeats
+    assert lost is not None
+
+    stop = threading.Event()
+    t = threading.Thread(
+        target=run_worker,
+        kwargs={
+            "coordinator_url": url,
+            "worker_id": "alive",
+            "transcribe_fn": _stub_transcribe,
+            "idle_seconds": 0.05,
+            "stop": stop,
+            "warm": False,
+        },
+    )
+    t.start()
+    _wait_finished(coord)
+    stop.set()
+    t.join()
+
+    assert coord.status()["counts"] == {"done": 6}
+    assert not coord.complete(lost["job_id"], lost["token"], {"status": "success"})
+    rerun = [r for r in coord.results() if r["audio_file"] == lost["audio_path"]]
+    assert [r["worker"] for r in rerun] == ["alive"]
+
+
+def test_heartbeat_keeps_long_job_leased(cluster):
+    coord, url = cluster
+
+    def slow(audio_path: str, vocabulary_path: str = "") -> dict:
+        time.sleep(1.2)  # longer than the 0.5s lease
+        return {"status": "success", "audio_file": audio_path}
+
+    run_worker(url, "slow", slow, heartbeat_seconds=0.1, max_jobs=1, warm=False)
+    assert coord.results()[0]["worker"] == "slow"
+    assert coord.status()["counts"]["done"] == 1
+
+
+def test_worker_processes(cluster):
+    coord, url = cluster
+    ctx = multiprocessing.get_context("fork")
+    procs = [
+        ctx.Process(
+            target=run_worker,
+            kwargs={
+                "coordinator_url": url,
+                "worker_id": f"proc{i}",
+                "transcribe_fn": _stub_transcribe,
+                "max_jobs": 3,
+                "idle_seconds": 0.05,
+                "warm": False,
+            },
+        )
+        for i in range(2)
+    ]
+    for p in procs:
+        p.start()
+    _wait_finished(coord)
+    for p in procs:
+        p.join(timeout=5)
+    assert coord.status()["counts"] == {"done": 6}
+
+
+def test_coordinator_discovers_meetings(tmp_path, monkeypatch):
+    import lib.scheduler
+
+    monkeypatch.setenv("WHISPER_SCHEDULE_STATE", str(tmp_path / "schedule.json"))
+    monkeypatch.setattr(lib.scheduler, "_state", None)
+    meeting = tmp_path / "202602" / "20260209_meeting"
+    meeting.mkdir(parents=True)
+    (meeting / "rec.m4a").write_bytes(b"")
+    done = tmp_path / "202602" / "20260210_done"
+    (done / "transcripts").mkdir(parents=True)
+    (done / "rec.m4a").write_bytes(b"")
+    (done / "transcripts" / "rec.txt").write_text("x", encoding="utf-8")
+
+    coord = Coordinator(str(tmp_path))
+    assert coord.status()["jobs"][0]["eta_seconds"] > 0
+    job = coord.lease("w")
+    assert job["meeting"] == "20260209_meeting"
+    assert coord.lease("w") is None
+
+
+def _raw(url: str, path: str, data: bytes | None = None, token: str = "") -> tuple[int, dict]:
+    req = urllib.request.Request(url + path, data=data, headers={"X-Whisper-Token": token})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_malformed_requests_get_400(cluster):
+    _, url = cluster
+    assert _raw(url, "/lease", b"{not json")[0] == 400
+    assert _raw(url, "/lease", b"[1, 2]")[0] == 400
+    missing = _raw(url, "/heartbeat", b'{"job_id": "job0"}')
+    assert missing == (400, {"error": "missing field: token"})
+    assert _raw(url, "/results?since=x")[0] == 400
+    assert _raw(url, "/status")[0] == 200  # the server is still serving
+
+
+def test_non_loopback_bind_needs_a_token(monkeypatch):
+    monkeypatch.delenv("WHISPER_CLUSTER_TOKEN", raising=False)
+    with pytest.raises(ValueError, match="WHISPER_CLUSTER_TOKEN"):
+        serve_coordinator(Coordinator(), "0.0.0.0", 0)
+
+    monkeypatch.setenv("WHISPER_CLUSTER_TOKEN", "s3cret")
+    server = serve_coordinator(Coordinator(), "0.0.0.0", 0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert _raw(url, "/status", token="wrong")[0] == 403
+        assert _raw(url, "/status", token="s3cret")[0] == 200
+    finally:
+        server.shutdown()
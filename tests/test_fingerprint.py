@@ -0,0 +1,225 @@
+"""Tests for lib/fingerprint.py and duplicate linking in batch / voice memos.
+
+PCM decoding is replaced by synthetic 8kHz signals; no audio libraries needed.
+"""
+
+import json
+import random
+import sys
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.core as core
+import lib.fingerprint as fingerprint
+import lib.scheduler as scheduler
+from lib.fingerprint import (
+    FRAME,
+    RATE,
+    envelope_bits,
+    find_duplicates,
+    match_score,
+    window_starts,
+)
+
+SECONDS = 60
+WINDOW = 15
+STRIDE = 20
+
+
+def _speech(seed: int, seconds: float = SECONDS, gain: float = 1.0, lead: float = 0.0, noise=0):
+    """Bursty pseudo-speech: a random loudness per 100ms frame, optional leading silence."""
+    rng = random.Random(seed)
+    noise_rng = random.Random(seed + 1000)
+    out = array("h", [0] * int(lead * RATE))
+    for _ in range(int(seconds * 10)):
+        level = rng.choice((0, 200, 2000, 8000))
+        for i in range(FRAME):
+            v = level * gain * (1 if i % 16 < 8 else -1)
+            if noise:
+                v += noise_rng.randint(-noise, noise)
+            out.append(int(max(-32768, min(32767, v))))
+    return out
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_FINGERPRINT_CACHE", str(tmp_path / "fingerprints.json"))
+    monkeypatch.setenv("WHISPER_SCHEDULE_STATE", str(tmp_path / "schedule.json"))
+    monkeypatch.setenv("WHISPER_FINGERPRINT_SECONDS", str(WINDOW))
+    monkeypatch.setenv("WHISPER_FINGERPRINT_STRIDE", str(STRIDE))
+    monkeypatch.setattr(fingerprint, "duration_of", lambda p: float(SECONDS))
+    monkeypatch.setattr(scheduler, "_state", None)
+
+
+def _fake_pcm(monkeypatch, signals: dict):
+    decoded = []
+
+    def _read(path, start, seconds):
+        decoded.append(Path(path).name)
+        return signals[Path(path).name][int(start * RATE) : int((start + seconds) * RATE)]
+
+    monkeypatch.setattr(fingerprint, "_read_pcm", _read)
+    return decoded
+
+
+def _windows(samples) -> dict:
+    return {
+        start: envelope_bits(samples[int(start * RATE) : int((start + WINDOW) * RATE)])
+        for start in window_starts(SECONDS, WINDOW, STRIDE)
+    }
+
+
+def test_window_starts_are_fixed_offsets():
+    assert window_starts(7200, 20, 60) == [0.0, 60, 120, 240, 480, 960, 1920, 3840]
+    assert window_starts(30, 20, 60) == [0.0]
+
+
+def test_reencoded_copy_matches_and_other_audio_does_not():
+    original = _windows(_speech(1))
+    copy = _windows(_speech(1, gain=0.6, lead=1.3, noise=150))
+    other = _windows(_speech(2))
+    assert match_score(original, copy) < 0.3
+    assert match_score(original, other) > 0.7
+
+
+def _with_intro(signal, intro: float, noise: int = 0):
+    rng = random.Random(99)
+    head = array(
+        "h", (rng.randint(-noise, noise) if noise else 0 for _ in range(int(intro * RATE)))
+    )
+    return (head + signal)[: SECONDS * RATE]
+
+
+@pytest.mark.parametrize("noise", [0, 300])
+def test_shared_intro_does_not_make_recordings_equal(tmp_path, monkeypatch, noise):
+    a = _with_intro(_speech(11), 25, noise)
+    b = _with_intro(_speech(12), 25, noise)
+    # The intro window alone carries too few set bits to count as evidence.
+    assert match_score({0.0: _windows(a)[0.0]}, {0.0: _windows(b)[0.0]}) is None
+    assert match_score(_windows(a), _windows(b)) > 0.7
+
+    (tmp_path / "a.m4a").write_bytes(b"first meeting")
+    (tmp_path / "b.m4a").write_bytes(b"second meeting")
+    _fake_pcm(monkeypatch, {"a.m4a": a, "b.m4a": b})
+    found = find_duplicates([str(tmp_path / "a.m4a"), str(tmp_path / "b.m4a")])
+    assert found["duplicates"] == {}
+
+
+def test_unknown_duration_is_never_linked(tmp_path, monkeypatch):
+    (tmp_path / "a.m4a").write_bytes(b"one export")
+    (tmp_path / "b.m4a").write_bytes(b"another export")
+    _fake_pcm(monkeypatch, {"a.m4a": _speech(4), "b.m4a": _speech(4, gain=0.7)})
+    monkeypatch.setattr(fingerprint, "duration_of", lambda p: None)
+    assert find_duplicates([str(tmp_path / "a.m4a"), str(tmp_path / "b.m4a")])["duplicates"] == {}
+
+
+def test_find_duplicates_prefers_audio_only_and_skips_decode_for_identical(tmp_path, monkeypatch):
+    (tmp_path / "zoom.mp4").write_bytes(b"mp4 container")
+    (tmp_path / "zoom.m4a").write_bytes(b"m4a container")
+    (tmp_path / "copy").mkdir()
+    (tmp_path / "copy" / "zoom.m4a").write_bytes(b"m4a container")
+    (tmp_path / "memo.m4a").write_bytes(b"another recording")
+    decoded = _fake_pcm(
+        monkeypatch,
+        {
+            "zoom.mp4": _speech(1, gain=0.5, lead=0.7),
+            "zoom.m4a": _speech(1),
+            "memo.m4a": _speech(3),
+        },
+    )
+    found = find_duplicates(sorted(str(p) for p in tmp_path.rglob("*.m*")))
+    dups = found["duplicates"]
+    assert set(dups) == {str(tmp_path / "zoom.mp4"), str(tmp_path / "zoom.m4a")}
+    assert dups[str(tmp_path / "zoom.m4a")]["bit_error_rate"] == 0.0  # same bytes
+    assert dups[str(tmp_path / "zoom.mp4")]["of"] == str(tmp_path / "copy" / "zoom.m4a")
+    windows = len(window_starts(SECONDS, WINDOW, STRIDE))
+    assert "zoom.m4a" in decoded and decoded.count("zoom.m4a") == windows
+
+    decoded.clear()
+    find_duplicates(sorted(str(p) for p in tmp_path.rglob("*.m*")))
+    assert decoded == []  # fingerprints are cached by size + mtime
+
+
+def _fake_transcribe(calls: list):
+    def _transcribe(audio_path: str, **kwargs) -> dict:
+        calls.append(audio_path)
+        p = Path(audio_path)
+        out = p.parent / "transcripts"
+        out.mkdir(exist_ok=True)
+        (out / f"{p.stem}.txt").write_text("text", encoding="utf-8")
+        return {
+            "status": "success",
+            "audio_file": audio_path,
+            "output_files": {"txt": str(out / f"{p.stem}.txt")},
+        }
+
+    return _transcribe
+
+
+def test_batch_links_duplicates_to_existing_transcript(tmp_path, monkeypatch):
+    base = tmp_path / "meetings"
+    a = base / "202602" / "20260209_定例"
+    b = base / "202602" / "20260209_定例_copy"
+    a.mkdir(parents=True)
+    b.mkdir(parents=True)
+    (a / "zoom.mp4").write_bytes(b"video")
+    (a / "zoom.m4a").write_bytes(b"audio")
+    (b / "zoom.m4a").write_bytes(b"audio re-exported")
+    _fake_pcm(
+        monkeypatch,
+        {"zoom.mp4": _speech(5, lead=0.4), "zoom.m4a": _speech(5, gain=0.8)},
+    )
+    calls: list = []
+    monkeypatch.setattr(core, "transcribe", _fake_transcribe(calls))
+    monkeypatch.setattr(core, "_job_parallelism", lambda: 1)
+    monkeypatch.setattr(fingerprint, "duration_of", lambda p: 1800.0)
+
+    result = core.batch(str(base))
+    assert calls == [str(a / "zoom.m4a")]
+    dedup = result["dedup"]
+    assert dedup["duplicates"] == 2
+    assert dedup["audio_hours_skipped"] == 1.0
+    assert dedup["compute_hours_avoided"] > 0
+
+    pointer = json.loads((b / "transcripts" / "zoom.duplicate.json").read_text(encoding="utf-8"))
+    assert pointer["transcript"] == str(a / "transcripts" / "zoom.txt")
+    assert core._find_unprocessed_meetings(base) == []
+
+    # A later copy elsewhere links to the remembered transcript without transcribing.
+    c = base / "202603" / "20260301_再共有"
+    c.mkdir(parents=True)
+    (c / "share.m4a").write_bytes(b"audio")
+    calls.clear()
+    result = core.batch(str(base))
+    assert calls == []
+    assert result["dedup"]["linked"][0]["duplicate_of"] == str((a / "zoom.m4a").resolve())
+
+
+def test_voice_memos_skip_duplicates(tmp_path, monkeypatch):
+    (tmp_path / "memo1.m4a").write_bytes(b"memo")
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dir" / "memo1 copy.m4a").write_bytes(b"memo")
+    calls: list = []
+    monkeypatch.setattr(core, "transcribe", _fake_transcribe(calls))
+    monkeypatch.setattr(core, "_job_parallelism", lambda: 1)
+
+    result = core.process_voice_memos(tmp_path, pack=False)
+    assert calls == [str(tmp_path / "dir" / "memo1 copy.m4a")]
+    assert result["dedup"]["duplicates"] == 1
+    processed = (tmp_path / ".processed").read_text(encoding="utf-8").splitlines()
+    assert sorted(processed) == sorted([str(tmp_path / "memo1.m4a"), calls[0]])
+
+
+def test_dedup_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_DEDUP", "0")
+    (tmp_path / "a.m4a").write_bytes(b"memo")
+    (tmp_path / "b.m4a").write_bytes(b"memo")
+    calls: list = []
+    monkeypatch.setattr(core, "transcribe", _fake_transcribe(calls))
+    monkeypatch.setattr(core, "_job_parallelism", lambda: 1)
+    core.process_voice_memos(tmp_path, pack=False)
+    assert len(calls) == 2
@@ -71,3 +71,51 @@ def test_to_vtt_single_segment():
     result = to_vtt(segs)
     assert "00:00:00.000 --> 00:00:02.000" in result
     assert "Test" in result
+
+
+def test_wseg_roundtrip_matches_json(tmp_path):
+    import json
+
+    from lib.core import _WhisperResult, _write_outputs
+    from lib.formats import load_wseg
+
+    segments = [
+        {"start": 0.0, "end": 1.25, "text": "こんにちは", "avg_logprob": -0.31},
+        {"start": 1.25, "end": 3.5, "text": "世界 🌏", "avg_logprob": -0.02},
+        {"start": 3.5, "end": 4.0, "text": "", "avg_logprob": -1.5},
+    ]
+    result = _WhisperResult(text="こんにちは 世界 🌏", segments=segments, language="ja")
+    files = _write_outputs(result, "meeting", tmp_path, ["json", "wseg"])
+
+    data = json.loads(Path(files["json"]).read_text(encoding="utf-8"))
+    for use_mmap in (True, False):
+        loaded = load_wseg(files["wseg"], use_mmap=use_mmap)
+        assert loaded["text"] == data["text"]
+        assert loaded["language"] == data["language"]
+        assert loaded["table"].to_dicts() == data["segments"]
+
+
+def test_wseg_roundtrip_words_and_empty(tmp_path):
+    from lib.formats import load_wseg, write_wseg
+    from lib.segments import SegmentTable
+
+    words = [{"start": 0.0, "end": 0.5, "word": "a", "probability": 0.9}]
+    table = SegmentTable.from_segments([{"start": 0.0, "end": 0.5, "text": "a", "words": words}])
+    write_wseg(tmp_path / "w.wseg", table, "a", "en")
+    assert load_wseg(tmp_path / "w.wseg")["table"].to_dicts()[0]["words"] == words
+
+    write_wseg(tmp_path / "e.wseg", SegmentTable.from_segments([]), "", "ja")
+    empty = load_wseg(tmp_path / "e.wseg")
+    assert len(empty["table"]) == 0
+    assert empty["text"] == ""
+
+
+def test_wseg_rejects_other_files(tmp_path):
+    import pytest
+
+    from lib.formats import load_wseg
+
+    p = tmp_path / "bad.wseg"
+    p.write_bytes(b"NOPE" + b"\0" * 60)
+    with pytest.raises(ValueError):
+        load_wseg(p)
@@ -0,0 +1,110 @@
+"""Tests for lib/governor.py — memory admission control (no models needed)."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.governor import ResourceGovernor, estimate_job_bytes, model_bytes
+
+MB = 1024 * 1024
+
+
+def test_estimate_scales_with_compute_type_and_duration():
+    int8 = estimate_job_bytes("large-v3", "int8", 600, model_resident=False)
+    fp32 = estimate_job_bytes("large-v3", "float32", 600, model_resident=False)
+    assert fp32 - int8 == model_bytes("large-v3", "float32") - model_bytes("large-v3", "int8")
+    assert estimate_job_bytes("large-v3", "int8", 1200, False) > int8
+    warm = estimate_job_bytes("large-v3", "int8", 600, model_resident=True)
+    assert int8 - warm == model_bytes("large-v3", "int8")
+    # Unknown duration is budgeted as an hour, not as zero.
+    assert estimate_job_bytes("small", "int8", None, True) > estimate_job_bytes(
+        "small", "int8", 600, True
+    )
+
+
+def test_admission_waits_for_budget():
+    gov = ResourceGovernor(budget_bytes=1000 * MB)
+    order = []
+    first_in = threading.Event()
+    release = threading.Event()
+
+    def first():
+        with gov.admit("k", 700 * MB, "a", measure=False):
+            order.append("a-start")
+            first_in.set()
+            release.wait(5)
+            order.append("a-end")
+
+    def second():
+        with gov.admit("k", 700 * MB, "b", measure=False):
+            order.append("b-start")
+
+    ta = threading.Thread(target=first)
+    ta.start()
+    assert first_in.wait(5)
+    tb = threading.Thread(target=second)
+    tb.start()
+    for _ in range(100):
+        if gov.snapshot()["queued"]:
+            break
+        time.sleep(0.01)
+    snap = gov.snapshot()
+    assert snap["in_use_mb"] == 700
+    assert [q["label"] for q in snap["queued"]] == ["b"]
+    release.set()
+    ta.join(5)
+    tb.join(5)
+    assert order == ["a-start", "a-end", "b-start"]
+    assert gov.snapshot()["admitted"] == 2
+
+
+def test_small_jobs_run_together_and_oversized_job_runs_alone():
+    gov = ResourceGovernor(budget_bytes=1000 * MB)
+    with gov.admit("k", 400 * MB, measure=False), gov.admit("k", 400 * MB, measure=False):
+        assert gov.snapshot()["in_use_mb"] == 800
+    # Larger than the whole budget: admitted once nothing else is running.
+    with gov.admit("k", 5000 * MB, measure=False):
+        assert len(gov.snapshot()["running"]) == 1
+
+
+def test_measured_rss_corrects_estimate():
+    gov = ResourceGovernor(budget_bytes=1000 * MB, sample_seconds=0.01)
+    with gov.admit("k", 10 * MB) as ticket:
+        ballast = bytearray(40 * MB)  # touch real pages so RSS grows
+        ballast[::4096] = b"x" * len(ballast[::4096])
+        time.sleep(0.05)
+    assert ticket["measured"] > 10 * MB
+    assert gov.correction("k") > 1.0
+    with gov.admit("k", 10 * MB, measure=False) as t2:
+        assert t2["estimate"] > 10 * MB
+    del ballast
+
+
+def test_interrupted_waiter_leaves_the_queue():
+    gov = ResourceGovernor(budget_bytes=1000 * MB)
+    wait = gov._cond.wait
+
+    def _interrupted(timeout=None):
+        raise KeyboardInterrupt
+
+    with gov.admit("k", 700 * MB, "a", measure=False):
+        gov._cond.wait = _interrupted
+        try:
+            with gov.admit("k", 700 * MB, "b", measure=False):
+                raise AssertionError("admitted over budget")
+        except KeyboardInterrupt:
+            pass
+        gov._cond.wait = wait
+        assert gov.snapshot()["queued"] == []
+
+    def third():
+        with gov.admit("k", 700 * MB, "c", measure=False):
+            pass
+
+    t = threading.Thread(target=third)
+    t.start()
+    t.join(5)
+    assert not t.is_alive()  # "b" no longer heads the queue
@@ -0,0 +1,42 @@
+"""Tests for lib/guard.py — loop detection on synthetic segment streams."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.guard import LoopGuard
+
+
+def _seg(start, text, compression_ratio=1.2):
+    return {
+        "start": start,
+        "end": start + 2.0,
+        "text": text,
+        "compression_ratio": compression_ratio,
+    }
+
+
+def test_normal_speech_passes():
+    guard = LoopGuard()
+    texts = ["今日は定例会議です", "議題は三つあります", "まず予算の確認から", "次にスケジュール"]
+    assert all(guard.check(_seg(i * 2.0, t)) is None for i, t in enumerate(texts))
+
+
+def test_repeated_segments_trip_at_loop_start():
+    guard = LoopGuard()
+    assert guard.check(_seg(0.0, "会議を始めます")) is None
+    hits = [guard.check(_seg(2.0 + i * 2.0, "ご視聴ありがとうございました。")) for i in range(4)]
+    assert hits[-1] == 2.0
+
+
+def test_consecutive_high_compression_trips():
+    guard = LoopGuard()
+    assert guard.check(_seg(0.0, "あ", compression_ratio=3.1)) is None
+    assert guard.check(_seg(2.0, "あ", compression_ratio=3.4)) == 0.0
+
+
+def test_single_high_compression_segment_is_tolerated():
+    guard = LoopGuard()
+    assert guard.check(_seg(0.0, "はい", compression_ratio=3.0)) is None
+    assert guard.check(_seg(2.0, "わかりました")) is None
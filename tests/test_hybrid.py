@@ -0,0 +1,78 @@
+"""Tests for lib/hybrid.py — local/API split planning and execution with a stub backend."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.hybrid import API_MAX_BYTES, plan_split, run_split
+
+
+def _jobs(*durations, size=1000):
+    return [
+        {"audio_path": f"/audio/{i}.m4a", "duration": d, "size": size}
+        for i, d in enumerate(durations)
+    ]
+
+
+def test_everything_local_when_deadline_allows():
+    split = plan_split(_jobs(600, 300, 60), deadline_seconds=1000, local_rtf=1.0, api_rtf=0.1)
+    assert [j["duration"] for j in split["local"]] == [600, 300, 60]
+    assert split["api"] == []
+    assert split["predicted_cost"] == 0.0
+    assert split["feasible"]
+
+
+def test_overflow_goes_to_api_within_spend_cap():
+    split = plan_split(_jobs(600, 300, 300, 60), deadline_seconds=700, local_rtf=1.0, api_rtf=0.1)
+    assert [j["duration"] for j in split["local"]] == [600, 60]
+    assert [j["duration"] for j in split["api"]] == [300, 300]
+    assert split["predicted_cost"] == 0.06  # 10 minutes at $0.006
+    assert split["feasible"]
+
+    capped = plan_split(
+        _jobs(600, 300, 300, 60),
+        deadline_seconds=700,
+        local_rtf=1.0,
+        api_rtf=0.1,
+        spend_cap=0.03,
+    )
+    assert [j["duration"] for j in capped["api"]] == [300]
+    assert not capped["feasible"]
+
+
+def test_oversized_files_stay_local():
+    big = _jobs(3600, size=API_MAX_BYTES + 1)
+    split = plan_split(big, deadline_seconds=60, local_rtf=1.0, api_rtf=0.1)
+    assert split["api"] == [] and len(split["local"]) == 1
+
+
+def test_run_split_uses_both_backends_and_steals():
+    running = {"local": 0, "api": 0}
+    overlap = threading.Event()
+    lock = threading.Lock()
+
+    def _fake(audio_path, backend, **kwargs):
+        with lock:
+            running[backend] += 1
+            if running["local"] and running["api"]:
+                overlap.set()
+        time.sleep(0.1 if backend == "local" else 0.02)
+        with lock:
+            running[backend] -= 1
+        return {"status": "success", "audio_file": audio_path, "backend": backend}
+
+    # The plan thinks local is fast, but it is 10x slower: API workers steal the tail.
+    split = plan_split(_jobs(*([60] * 6)), deadline_seconds=0.5, local_rtf=0.001, api_rtf=0.0005)
+    assert len(split["local"]) == 6
+    split["api"] = [split["local"].pop()]
+    out = run_split(split, _fake, deadline_seconds=0.25, api_workers=2, poll_seconds=0.01)
+    summary = out["summary"]
+    assert overlap.is_set()
+    assert len(out["results"]) == 6
+    assert summary["stolen"] >= 1
+    assert summary["local"]["files"] + summary["api"]["files"] == 6
+    assert summary["cost_usd"] == round(summary["api"]["audio_seconds"] / 60 * 0.006, 4)
+    assert summary["wall_seconds"] < 0.6
@@ -0,0 +1,110 @@
+"""Tests for lib/language.py and language="auto" helpers (fake model, no audio decoding)."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.language as language
+from lib.core import _language_vocabulary
+from lib.dictionary import load_dictionaries
+
+
+class FakeModel:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def detect_language(self, audio):
+        self.calls += 1
+        lang, prob = self.answers.pop(0)
+        return lang, prob, [(lang, prob), ("en" if lang != "en" else "ja", 1 - prob)]
+
+
+@pytest.fixture
+def probe_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_LANGUAGE_CACHE", str(tmp_path / "languages.json"))
+    reads = []
+
+    def _fake_read(path, start, seconds):
+        reads.append((start, seconds))
+        return [0.0] * int(seconds * 16000)
+
+    monkeypatch.setattr(language, "_read_window", _fake_read)
+    meeting = tmp_path / "20260301_meeting"
+    meeting.mkdir()
+    return meeting, reads
+
+
+def test_window_starts_spread_and_short_files():
+    assert language.window_starts(1000, 3, 10) == [100.0, 495.0, 890.0]
+    assert language.window_starts(20, 3, 10) == [0.0]
+
+
+def test_probe_votes_across_windows(probe_env):
+    meeting, reads = probe_env
+    audio = meeting / "a.m4a"
+    audio.write_bytes(b"x")
+    model = FakeModel([("en", 0.6), ("ja", 0.9), ("ja", 0.95)])
+    result = language.probe_language(audio, model, duration=3600)
+    assert result["language"] == "ja"
+    assert len(reads) == 3 and all(s == 10 for _, s in reads)
+    assert result["cached"] is None
+    # Mean of the three detections, excluding the window reads.
+    assert result["detection_seconds_per_window"] <= result["probe_seconds"] / 3 + 0.001
+
+
+def test_cache_per_file_and_directory(probe_env):
+    meeting, _ = probe_env
+    first = meeting / "a.m4a"
+    first.write_bytes(b"x")
+    language.probe_language(first, FakeModel([("en", 0.9)] * 3), duration=600)
+
+    model = FakeModel([])
+    assert language.probe_language(first, model, 600)["cached"] == "file"
+    sibling = meeting / "b.m4a"
+    sibling.write_bytes(b"y")
+    hit = language.probe_language(sibling, model, 600)
+    assert hit["cached"] == "directory" and hit["language"] == "en"
+    assert model.calls == 0
+
+
+def test_unconfident_result_is_not_shared_with_directory(probe_env):
+    meeting, _ = probe_env
+    first = meeting / "a.m4a"
+    first.write_bytes(b"x")
+    language.probe_language(first, FakeModel([("en", 0.5)] * 3), duration=600)
+    assert json.loads(Path(language.cache_path()).read_text())["dirs"] == {}
+
+
+def test_language_specific_vocabulary_and_dictionary(tmp_path):
+    vocab = tmp_path / "general_vocabulary.txt"
+    vocab.write_text("会議\n", encoding="utf-8")
+    assert _language_vocabulary(str(vocab), "en") == str(vocab)
+    (tmp_path / "general_vocabulary.en.txt").write_text("meeting\n", encoding="utf-8")
+    assert _language_vocabulary(str(vocab), "en").endswith("general_vocabulary.en.txt")
+
+    vdir = tmp_path / "vocab"
+    vdir.mkdir()
+    (vdir / "mixed.dict.json").write_text(
+        json.dumps(
+            {
+                "replacements": [
+                    {"from": "あ", "to": "亜"},
+                    {"from": "colour", "to": "color", "language": "en"},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    (vdir / "en_only.dict.json").write_text(
+        json.dumps({"language": "en", "replacements": [{"from": "gonna", "to": "going to"}]}),
+        encoding="utf-8",
+    )
+    froms = lambda lang: sorted(e["from"] for e in load_dictionaries([vdir], lang))  # noqa: E731
+    assert "colour" not in froms("ja") and "gonna" not in froms("ja")
+    assert {"colour", "gonna", "あ"} <= set(froms("en"))
+    assert {"colour", "gonna", "あ"} <= set(froms(""))
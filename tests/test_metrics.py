@@ -0,0 +1,106 @@
+"""Tests for lib/metrics.py and lib/snapshot.py (fake clock, temp files)."""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lib.snapshot as snapshot_mod
+from lib.metrics import Metrics
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_window_counters_drop_old_events():
+    clock = Clock()
+    m = Metrics(window_seconds=60, clock=clock)
+    m.inc("whisper_jobs_total", backend="local", status="success")
+    clock.now = 30
+    m.inc("whisper_jobs_total", backend="local", status="success")
+    clock.now = 70
+    m.inc("whisper_jobs_total", backend="api", status="success")
+
+    window = m.window_counters()
+    local = ("whisper_jobs_total", (("backend", "local"), ("status", "success")))
+    api = ("whisper_jobs_total", (("backend", "api"), ("status", "success")))
+    assert window[local] == 1  # the t=0 event fell out of the 60s window
+    assert window[api] == 1
+    assert m.snapshot()["counters"][1]["value"] == 2  # lifetime total keeps it
+
+
+def test_histogram_buckets_are_cumulative():
+    m = Metrics(window_seconds=60)
+    for v in (0.05, 0.3, 3.0):
+        m.observe("whisper_rtf", v, buckets=(0.1, 1.0), backend="local")
+    text = m.render_prometheus()
+    assert "# TYPE whisper_rtf histogram" in text
+    assert 'whisper_rtf_bucket{backend="local",le="0.1"} 1' in text
+    assert 'whisper_rtf_bucket{backend="local",le="1"} 2' in text
+    assert 'whisper_rtf_bucket{backend="local",le="+Inf"} 3' in text
+    assert 'whisper_rtf_count{backend="local"} 3' in text
+
+
+def test_prometheus_counters_gauges_and_window():
+    m = Metrics(window_seconds=3600)
+    m.inc("whisper_cache_requests_total", cache="model", result="hit")
+    m.inc("whisper_cache_requests_total", cache="model", result="hit")
+    m.inc("whisper_cache_requests_total", cache="model", result="miss")
+    m.set_gauge("whisper_queue_depth", 2)
+    text = m.render_prometheus()
+    assert "# TYPE whisper_cache_requests_total counter" in text
+    assert 'whisper_cache_requests_total{cache="model",result="hit"} 2' in text
+    assert "whisper_queue_depth 2" in text
+    assert 'whisper_cache_requests_total_window{cache="model",result="hit",window="3600"} 2' in text
+    assert m.cache_hit_rates() == {"model": round(2 / 3, 4)}
+
+
+def test_snapshot_recomputes_only_when_mtime_changes(tmp_path):
+    snapshot_mod.clear()
+    f = tmp_path / "terms.txt"
+    f.write_text("a\n", encoding="utf-8")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return f.read_text(encoding="utf-8").count("\n")
+
+    def watch():
+        return [tmp_path, f]
+
+    assert snapshot_mod.snapshot("t", watch, compute) == 1
+    assert snapshot_mod.snapshot("t", watch, compute) == 1
+    assert len(calls) == 1
+
+    f.write_text("a\nb\n", encoding="utf-8")
+    st = f.stat()
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert snapshot_mod.snapshot("t", watch, compute) == 2
+    assert len(calls) == 2
+
+
+def test_failed_job_is_labelled_with_the_resolved_backend(tmp_path, monkeypatch):
+    import lib.core as core
+    import lib.routing as routing
+
+    monkeypatch.setattr(routing, "_breakers", {})
+    audio = tmp_path / "memo.wav"
+    audio.write_bytes(b"\x00" * 64)
+    m = Metrics(window_seconds=60)
+    monkeypatch.setattr(core, "get_metrics", lambda: m)
+    monkeypatch.setattr(core, "_get_local_backend", lambda: "faster_whisper")
+    monkeypatch.setenv("WHISPER_FASTER_MODEL", "small")
+
+    def _fail(*args, **kwargs):
+        raise RuntimeError("decoder exploded")
+
+    monkeypatch.setattr(core, "_transcribe_local", _fail)
+    assert core.transcribe(str(audio), backend="local")["status"] == "error"
+    key = ("whisper_jobs_total", (("backend", "local:faster_whisper:small"), ("status", "error")))
+    assert m.window_counters()[key] == 1
@@ -0,0 +1,37 @@
+"""Tests for lib/packing.py — timeline planning and segment splitting only."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.packing import plan_packs, split_segments
+
+
+def test_plan_packs_offsets_and_chunking():
+    files = [(Path(f"m{i}.m4a"), 10.0) for i in range(5)]
+    packs = plan_packs(files, max_clips=2)
+    assert [len(p) for p in packs] == [2, 2, 1]
+    assert [c.offset for c in packs[0]] == [0.0, 10.0]
+    assert packs[2][0].offset == 0.0
+
+
+def test_split_segments_rebases_per_file():
+    a, b = Path("a.m4a"), Path("b.m4a")
+    clips = plan_packs([(a, 12.0), (b, 8.0)], max_clips=8)[0]
+    segments = [
+        {"start": 0.0, "end": 5.0, "text": "A1"},
+        {"start": 5.0, "end": 12.0, "text": "A2"},
+        {"start": 12.0, "end": 20.5, "text": "B1"},
+    ]
+    out = split_segments(segments, clips)
+    assert [s["text"] for s in out[a]] == ["A1", "A2"]
+    assert out[b] == [{"start": 0.0, "end": 8.0, "text": "B1"}]
+
+
+def test_split_segments_file_without_speech():
+    a, b = Path("a.m4a"), Path("b.m4a")
+    clips = plan_packs([(a, 5.0), (b, 5.0)], max_clips=8)[0]
+    out = split_segments([{"start": 6.0, "end": 9.0, "text": "B"}], clips)
+    assert out[a] == []
+    assert out[b][0]["start"] == 1.0
@@ -0,0 +1,162 @@
+"""Tests for lib/routing.py and local_first routing in lib/core.py (fake clock, no network)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.core as core
+import lib.routing as routing
+from lib.routing import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_after_threshold_and_probes_after_reset():
+    clock = Clock()
+    b = CircuitBreaker("local", failure_threshold=2, reset_seconds=60, clock=clock)
+    b.record_failure("boom")
+    assert b.state == CLOSED and b.allow()
+    b.record_failure("boom")
+    assert b.state == OPEN
+    assert not b.allow()
+    assert b.snapshot()["short_circuited"] == 1
+
+    clock.now = 61
+    assert b.allow()  # the half-open probe
+    assert b.state == HALF_OPEN
+    assert not b.allow()  # only one probe at a time
+    b.record_success()
+    assert b.state == CLOSED and b.consecutive_failures == 0
+
+
+def test_failed_probe_reopens():
+    clock = Clock()
+    b = CircuitBreaker("local", failure_threshold=1, reset_seconds=10, clock=clock)
+    b.record_failure("boom")
+    clock.now = 10
+    assert b.allow()
+    b.record_failure("still broken")
+    assert b.state == OPEN
+    assert b.snapshot()["probe_in_seconds"] == 10.0
+    assert b.snapshot()["last_error"] == "still broken"
+
+
+def test_success_resets_consecutive_count():
+    b = CircuitBreaker("local", failure_threshold=2, clock=Clock())
+    b.record_failure("a")
+    b.record_success()
+    b.record_failure("b")
+    assert b.state == CLOSED
+
+
+@pytest.fixture
+def routed(tmp_path, monkeypatch):
+    monkeypatch.setattr(routing, "_breakers", {})
+    monkeypatch.setenv("WHISPER_CIRCUIT_FAILURES", "2")
+    monkeypatch.setenv("WHISPER_SEARCH_INDEX", "0")
+    monkeypatch.setenv("WHISPER_SCHEDULE_STATE", str(tmp_path / "schedule.json"))
+    monkeypatch.setattr(core, "_IS_DOCKER", False)
+    calls = []
+
+    def _local(*args):
+        calls.append("local")
+        raise RuntimeError("model load failed")
+
+    def _api(*args):
+        calls.append("api")
+        return core._WhisperResult(text="ok", segments=[{"start": 0, "end": 1, "text": "ok"}])
+
+    monkeypatch.setattr(core, "_transcribe_local", _local)
+    monkeypatch.setattr(core, "_transcribe_api", _api)
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"")
+    return audio, calls
+
+
+def test_local_first_skips_local_while_circuit_open(routed):
+    audio, calls = routed
+    backends = [core.transcribe(str(audio), output_formats="txt")["backend"] for _ in range(3)]
+    assert calls == ["local", "api", "local", "api", "api"]
+    assert backends[0].startswith("api (local failed")
+    assert backends[2] == "api (local circuit open)"
+    status = routing.routing_status()
+    assert status["local"]["state"] == OPEN
+    assert status["api"]["successes"] == 3
+
+
+def test_released_probe_lets_the_next_call_probe():
+    clock = Clock()
+    b = CircuitBreaker("local", failure_threshold=1, reset_seconds=60, clock=clock)
+    b.record_failure("boom")
+    clock.now = 61
+    assert b.allow() and b.state == HALF_OPEN
+    b.release()  # the probe hit a corrupt file: no verdict
+    assert b.state == HALF_OPEN and b.allow()
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ValueError("Invalid data found when processing input"),
+        core.WorkerFailure("quarantined", "crash: killed by SIGSEGV", "a.wav", 2),
+    ],
+)
+def test_input_errors_do_not_open_the_local_circuit(routed, monkeypatch, error):
+    audio, calls = routed
+
+    def _bad_file(*args):
+        calls.append("local")
+        raise error
+
+    monkeypatch.setattr(core, "_transcribe_local", _bad_file)
+    for _ in range(3):
+        core.transcribe(str(audio), output_formats="txt")
+    assert calls == ["local", "api"] * 3
+    assert routing.routing_status()["local"]["state"] == CLOSED
+    assert routing.routing_status()["local"]["failures"] == 0
+
+
+def test_explicit_local_backend_does_not_touch_the_breaker(routed):
+    audio, calls = routed
+    for _ in range(3):
+        assert core.transcribe(str(audio), backend="local")["status"] == "error"
+    assert calls == ["local"] * 3
+    assert "local" not in routing.routing_status()
+
+
+def test_api_client_errors_are_not_backend_failures():
+    class _Status(Exception):
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    assert not core._is_backend_failure(_Status(400))
+    assert core._is_backend_failure(_Status(503))
+    assert core._is_backend_failure(RuntimeError("model load failed"))
+
+
+def test_language_probe_goes_through_the_local_circuit(routed, monkeypatch):
+    audio, calls = routed
+    monkeypatch.setattr(core, "_get_local_backend", lambda: "faster_whisper")
+    monkeypatch.setattr(core, "lookup_language", lambda p: None)
+    monkeypatch.setattr(core, "duration_of", lambda p: 60.0)
+
+    def _probe(*args):
+        calls.append("probe")
+        raise RuntimeError("model load failed")
+
+    monkeypatch.setattr(core, "_run_local_job", _probe)
+    for _ in range(2):
+        assert core._resolve_auto_language(audio, "local_first")[0] == ""
+    assert routing.routing_status()["local"]["state"] == OPEN
+    _, report = core._resolve_auto_language(audio, "local_first")
+    assert report == {"method": "backend", "probe_skipped": "local circuit open"}
+    assert calls == ["probe", "probe"]
@@ -0,0 +1,92 @@
+"""Tests for lib/scheduler.py — ordering, duration cache and RTF-based ETAs (no network)."""
+
+import os
+import sys
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.scheduler as scheduler
+
+
+def _wav(path: Path, seconds: float, mtime: float) -> str:
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\0\0" * int(8000 * seconds))
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def state(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_SCHEDULE_STATE", str(tmp_path / "schedule.json"))
+    monkeypatch.setattr(scheduler, "_state", None)
+    return tmp_path / "schedule.json"
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    now = 1_000_000.0
+    return now, [
+        {"audio_path": _wav(tmp_path / "a_long.wav", 6.0, now - 3600), "name": "long"},
+        {"audio_path": _wav(tmp_path / "b_short.wav", 1.0, now - 60), "name": "short"},
+        {"audio_path": _wav(tmp_path / "c_mid.wav", 3.0, now - 7200), "name": "mid"},
+    ]
+
+
+def test_policies_order(jobs):
+    now, js = jobs
+    names = lambda p: [j["name"] for j in scheduler.plan_jobs(js, "api", p, now)["jobs"]]  # noqa: E731
+    assert names("shortest") == ["short", "mid", "long"]
+    assert names("oldest") == ["mid", "long", "short"]
+    assert names("path") == ["long", "short", "mid"]
+
+
+def test_eta_uses_rtf_history(jobs):
+    now, js = jobs
+    scheduler.record_rtf("local:faster_whisper:m", 10.0, 5.0)
+    plan = scheduler.plan_jobs(js, "local:faster_whisper:m", "shortest", now)
+    assert plan["rtf"] == 0.5
+    assert [j["eta_seconds"] for j in plan["jobs"]] == [0.5, 2.0, 5.0]
+    assert plan["estimated_total_seconds"] == 5.0
+    two = scheduler.plan_jobs(js, "local:faster_whisper:m", "shortest", now, parallel=2)
+    assert [j["eta_seconds"] for j in two["jobs"]] == [0.5, 1.5, 3.5]
+    scheduler.record_rtf("local:faster_whisper:m", 10.0, 10.0)
+    assert scheduler.rtf_for("local:faster_whisper:m") == pytest.approx(0.65)
+    # Unknown keys fall back to the family default.
+    assert scheduler.rtf_for("local:faster_whisper:other") == 0.15
+
+
+def test_deadline_defers_jobs_that_cannot_make_it(jobs, monkeypatch):
+    now, js = jobs
+    scheduler.record_rtf("api", 1.0, 600.0)  # 600x slower than real time
+    monkeypatch.setenv("WHISPER_TURNAROUND_HOURS", "2.4")
+    plan = scheduler.plan_jobs(js, "api", "deadline", now)
+    # "mid" is 2h old: its 1800s decode would end past its deadline, so it goes last.
+    assert [j["name"] for j in plan["jobs"]] == ["long", "short", "mid"]
+    assert [j["late"] for j in plan["jobs"]] == [False, False, True]
+
+
+def test_duration_cache_persists_and_invalidates(jobs, state, monkeypatch):
+    now, js = jobs
+    assert scheduler.duration_of(js[0]["audio_path"]) == 6.0
+    scheduler.plan_jobs(js, "api", "shortest", now)
+    assert state.exists()
+
+    monkeypatch.setattr(scheduler, "_state", None)
+    monkeypatch.setattr(scheduler, "probe_duration", lambda p: pytest.fail("re-probed"))
+    assert scheduler.duration_of(js[0]["audio_path"]) == 6.0
+
+    _wav(Path(js[0]["audio_path"]), 2.0, now)  # rewritten file → new size/mtime
+    monkeypatch.setattr(scheduler, "probe_duration", lambda p: 2.0)
+    assert scheduler.duration_of(js[0]["audio_path"]) == 2.0
+
+
+def test_backend_key_strips_fallback_note():
+    assert scheduler.backend_key("api (local failed: boom)") == "api"
+    assert scheduler.backend_key("local:faster_whisper:small") == "local:faster_whisper:small"
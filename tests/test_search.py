@@ -0,0 +1,86 @@
+"""Tests for lib/search.py — temporary SQLite index, no network."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from lib.search import index_transcript, rebuild_index, search
+
+
+@pytest.fixture
+def meetings(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_SEARCH_DB", str(tmp_path / "search.db"))
+    base = tmp_path / "meetings"
+
+    def write(meeting: str, segments: list) -> Path:
+        p = base / "202602" / meeting / "transcripts" / f"{meeting}.json"
+        p.parent.mkdir(parents=True)
+        p.write_text(
+            json.dumps({"text": "", "segments": segments, "language": "ja"}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        return p
+
+    write(
+        "20260209_定例会議",
+        [
+            {"start": 0.0, "end": 4.0, "text": "今日はウラナイロの予算について話します"},
+            {"start": 65.5, "end": 70.0, "text": "次回のリリースは三月です"},
+        ],
+    )
+    write("20260216_企画会議", [{"start": 12.0, "end": 15.0, "text": "予算の再確認が必要"}])
+    return base
+
+
+def test_rebuild_and_search_japanese(meetings):
+    result = rebuild_index(str(meetings))
+    assert result["indexed"] == 2
+    hits = search("リリース")["hits"]
+    assert len(hits) == 1
+    assert hits[0]["meeting"] == "20260209_定例会議"
+    assert hits[0]["date"] == "2026-02-09"
+    assert hits[0]["timestamp"] == "00:01:05.500"
+
+
+def test_search_filters_and_short_query(meetings):
+    rebuild_index(str(meetings))
+    assert search("予算")["total"] == 2  # 2 chars → substring scan
+    assert search("予算", date_from="2026-02-10")["hits"][0]["meeting"] == "20260216_企画会議"
+    assert search("予算", meeting="定例")["total"] == 1
+
+
+def test_query_matching_only_the_meeting_name_finds_nothing(meetings):
+    rebuild_index(str(meetings))
+    assert search("定例会議")["total"] == 0
+    assert search("予算について")["hits"][0]["meeting"] == "20260209_定例会議"
+
+
+def test_incremental_and_stale_removal(meetings):
+    rebuild_index(str(meetings))
+    again = rebuild_index(str(meetings))
+    assert again["indexed"] == 0
+    assert again["unchanged"] == 2
+
+    victim = next(meetings.rglob("20260216_企画会議.json"))
+    victim.unlink()
+    assert rebuild_index(str(meetings))["removed"] == 1
+    assert search("再確認")["total"] == 0
+
+
+def test_index_transcript_refreshes_changed_file(meetings):
+    p = next(meetings.rglob("20260216_企画会議.json"))
+    assert index_transcript(p) is True
+    assert index_transcript(p) is False
+    p.write_text(
+        json.dumps({"segments": [{"start": 1.0, "end": 2.0, "text": "議事録を更新しました"}]}),
+        encoding="utf-8",
+    )
+    os.utime(p, (p.stat().st_atime, p.stat().st_mtime + 10))
+    assert index_transcript(p) is True
+    assert search("議事録")["total"] == 1
+    assert search("再確認")["total"] == 0
@@ -0,0 +1,100 @@
+"""Tests for lib/segments.py — SegmentTable and the single-pass emitter."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.formats import to_srt, to_vtt
+from lib.segments import SegmentTable
+
+SEGMENTS = [
+    {"start": 0.0, "end": 1.5, "text": " Hello world ", "avg_logprob": -0.2},
+    {"start": 1.5, "end": 3725.25, "text": "こんにちは", "avg_logprob": -0.4},
+]
+
+
+def test_from_segments_columns():
+    table = SegmentTable.from_segments(SEGMENTS)
+    assert len(table) == 2
+    assert list(table.start) == [0.0, 1.5]
+    assert table.texts() == ["Hello world", "こんにちは"]
+    assert table.text(1) == "こんにちは"
+    assert list(table.confidence) == ["avg_logprob"]
+
+
+def test_emit_matches_formats_module():
+    out = SegmentTable.from_segments(SEGMENTS).emit(["srt", "vtt"], "", "ja")
+    assert out["srt"] == to_srt(SEGMENTS)
+    assert out["vtt"] == to_vtt(SEGMENTS)
+
+
+def test_emit_object_segments():
+    class Seg:
+        def __init__(self, start, end, text):
+            self.start, self.end, self.text = start, end, text
+
+    out = SegmentTable.from_segments([Seg(0.0, 2.0, "Test")]).emit(["vtt"], "Test", "en")
+    assert "00:00:00.000 --> 00:00:02.000\nTest" in out["vtt"]
+
+
+def test_emit_json_and_txt():
+    out = SegmentTable.from_segments(SEGMENTS).emit(["txt", "json"], "full text", "ja")
+    assert out["txt"] == "full text"
+    data = json.loads(out["json"])
+    assert data["language"] == "ja"
+    assert data["segments"][1] == {
+        "start": 1.5,
+        "end": 3725.25,
+        "text": "こんにちは",
+        "avg_logprob": -0.4,
+    }
+    assert "srt" not in out
+
+
+def test_emit_empty():
+    out = SegmentTable.from_segments([]).emit(["srt", "vtt"], "", "ja")
+    assert out["srt"] == ""
+    assert out["vtt"].startswith("WEBVTT")
+
+
+def test_timestamps_truncate_like_formats_module():
+    import random
+
+    rng = random.Random(7)
+    values = [0.2995, 1.9996, 59.9999, 0.3, 3599.9995] + [rng.uniform(0, 7200) for _ in range(500)]
+    segments = [{"start": v, "end": v, "text": "x"} for v in values]
+    out = SegmentTable.from_segments(segments).emit(["srt", "vtt"], "", "ja")
+    assert out["srt"] == to_srt(segments)
+    assert out["vtt"] == to_vtt(segments)
+    assert "00:00:01,999 --> 00:00:01,999" in out["srt"]
+
+
+def test_json_keeps_backend_fields():
+    class ApiSegment:
+        start, end, text = 0.0, 1.0, "api"
+
+        def model_dump(self):
+            return {"id": 0, "seek": 0, "start": 0.0, "end": 1.0, "text": "api", "tokens": [1]}
+
+    whisper = {"id": 3, "seek": 0, "start": 0.0, "end": 1.0, "text": " x", "tokens": [50364]}
+    for segment in (whisper, ApiSegment()):
+        table = SegmentTable.from_segments([segment])
+        record = json.loads(table.emit(["json"], "", "ja")["json"])["segments"][0]
+        assert record["tokens"] and record["id"] in (0, 3) and "seek" in record
+        assert record == table.to_dicts()[0]
+
+
+def test_emit_json_identical_to_json_dumps():
+    segments = SEGMENTS + [
+        {"start": 4.0, "end": 5.0, "text": 'quote " and \\ and \n', "no_speech_prob": 0.1},
+        {"start": 5.0, "end": 6.0, "text": "w", "words": [{"start": 5.0, "end": 6.0, "word": "w"}]},
+    ]
+    table = SegmentTable.from_segments(segments)
+    expected = json.dumps(
+        {"text": "t　", "segments": table.to_dicts(), "language": "ja"},
+        ensure_ascii=False,
+        indent=2,
+    )
+    assert table.emit(["json"], "t　", "ja")["json"] == expected
@@ -0,0 +1,107 @@
+"""Tests for lib/storage.py and compressed outputs in lib/core.py — temp files only."""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.core as core
+import lib.storage as storage
+from lib.search import rebuild_index, search
+from lib.storage import glob_outputs, load_transcript_json, output_exists, read_output
+
+
+def _result():
+    return core._WhisperResult(
+        text="予算について話します",
+        segments=[{"start": 0.0, "end": 2.0, "text": "予算について話します"}],
+        language="ja",
+    )
+
+
+def test_gzip_outputs_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_OUTPUT_COMPRESSION", "gzip")
+    files = core._write_outputs(_result(), "meeting", tmp_path, ["txt", "json", "srt", "vtt"])
+
+    assert files["txt"].endswith("meeting.txt")
+    assert files["json"].endswith("meeting.json.gz")
+    assert files["srt"].endswith("meeting.srt.gz")
+    assert gzip.decompress(Path(files["json"]).read_bytes())
+    assert (
+        load_transcript_json(tmp_path / "meeting.json")["segments"][0]["text"]
+        == "予算について話します"
+    )
+    assert "00:00:00.000 --> 00:00:02.000" in read_output(tmp_path / "meeting.vtt")
+
+
+def test_rewrite_removes_other_variant(tmp_path, monkeypatch):
+    core._write_outputs(_result(), "m", tmp_path, ["json"])
+    monkeypatch.setenv("WHISPER_OUTPUT_COMPRESSION", "gzip")
+    core._write_outputs(_result(), "m", tmp_path, ["json"])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["m.json.gz"]
+    assert glob_outputs(tmp_path, "*.json") == [tmp_path / "m.json.gz"]
+
+
+def test_unknown_codec_is_an_error(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_OUTPUT_COMPRESSION", "lz4")
+    with pytest.raises(ValueError):
+        core._write_outputs(_result(), "m", tmp_path, ["json"])
+
+
+def test_zstd_without_a_codec_falls_back_to_gzip(tmp_path, monkeypatch):
+    def _missing():
+        raise ImportError("No module named 'zstandard'")
+
+    monkeypatch.setattr(storage, "_zstd", _missing)
+    storage._zstd_available.cache_clear()
+    monkeypatch.setenv("WHISPER_OUTPUT_COMPRESSION", "zstd")
+    try:
+        files = core._write_outputs(_result(), "m", tmp_path, ["json"])
+    finally:
+        storage._zstd_available.cache_clear()
+    assert files["json"].endswith("m.json.gz")
+    assert load_transcript_json(tmp_path / "m.json")["language"] == "ja"
+
+
+def test_unknown_codec_fails_before_decoding(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_OUTPUT_COMPRESSION", "lz4")
+    audio = tmp_path / "memo.wav"
+    audio.write_bytes(b"\x00" * 64)
+    monkeypatch.setattr(core, "_transcribe_local", lambda *a: pytest.fail("decoded"))
+    assert core.transcribe(str(audio), backend="local")["status"] == "error"
+
+
+def test_processed_checks_see_compressed_txt(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_OUTPUT_COMPRESSION", "gzip")
+    monkeypatch.setenv("WHISPER_COMPRESS_FORMATS", "txt,json")
+    meeting = tmp_path / "202602" / "20260209_定例"
+    (meeting / "transcripts").mkdir(parents=True)
+    (meeting / "rec.m4a").write_bytes(b"")
+    assert [m["name"] for m in core._find_unprocessed_meetings(tmp_path)] == ["20260209_定例"]
+
+    core._write_outputs(_result(), "rec", meeting / "transcripts", ["txt"])
+    assert (meeting / "transcripts" / "rec.txt.gz").exists()
+    assert core._has_transcript(meeting / "transcripts", "rec")
+    assert not output_exists(meeting / "transcripts" / "other.txt")
+    assert core._find_unprocessed_meetings(tmp_path) == []
+
+
+def test_search_indexes_compressed_json(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_SEARCH_DB", str(tmp_path / "search.db"))
+    out = tmp_path / "meetings" / "202602" / "20260209_定例" / "transcripts"
+    out.mkdir(parents=True)
+    core._write_outputs(_result(), "rec", out, ["json"])
+    assert rebuild_index(str(tmp_path / "meetings"))["indexed"] == 1
+
+    monkeypatch.setenv("WHISPER_OUTPUT_COMPRESSION", "gzip")
+    core._write_outputs(_result(), "rec", out, ["json"])
+    result = rebuild_index(str(tmp_path / "meetings"))
+    assert result["indexed"] == 1 and result["removed"] == 0
+    hits = search("予算について")["hits"]
+    assert len(hits) == 1
+    assert hits[0]["transcript"].endswith("rec.json.gz")
+    assert json.loads(read_output(hits[0]["transcript"]))["language"] == "ja"
@@ -0,0 +1,280 @@
+"""Tests for lib/supervisor.py — real spawned workers running the helpers below."""
+
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.core as core
+import lib.supervisor as supervisor_mod
+from lib.governor import ResourceGovernor, model_bytes
+from lib.metrics import get_metrics
+from lib.supervisor import Quarantine, Supervisor, WorkerFailure, _memory_limit_bytes
+
+# Job functions run in the worker process: module level so they pickle by name.
+
+
+def _pid_of_worker(tag):
+    return tag, os.getpid()
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return "late"
+
+
+def _segfault():
+    os.kill(os.getpid(), signal.SIGSEGV)
+    time.sleep(5)
+
+
+def _allocate(mb):
+    hold = bytearray(b"\x01") * (mb * 1024 * 1024)
+    time.sleep(5)
+    return len(hold)
+
+
+def _raise():
+    raise ValueError("bad container")
+
+
+def _count_model_miss():
+    get_metrics().inc("whisper_cache_requests_total", cache="model", result="miss")
+    return "decoded"
+
+
+def _report():
+    return [("large-v3", "int8")], 300
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    sup = Supervisor(1, quarantine=Quarantine(tmp_path / "quarantine.json"), poll_seconds=0.05)
+    yield sup
+    sup.shutdown()
+
+
+@pytest.fixture
+def recording(tmp_path):
+    p = tmp_path / "bad.m4a"
+    p.write_bytes(b"\x00" * 64)
+    return p
+
+
+def test_worker_is_reused_between_jobs(supervisor):
+    a = supervisor.run(_pid_of_worker, ("a",))
+    b = supervisor.run(_pid_of_worker, ("b",))
+    assert a[0] == "a" and b[0] == "b"
+    assert a[1] == b[1] != os.getpid()
+    assert supervisor.status()["restarts"] == 0
+
+
+def test_timeout_kills_and_restarts_worker(supervisor, recording):
+    first = supervisor.run(_pid_of_worker, ("x",))[1]
+    with pytest.raises(WorkerFailure) as exc:
+        supervisor.run(_sleep, (30,), path=recording, timeout=0.3)
+    assert exc.value.reason == "timeout"
+    assert exc.value.strikes == 1 and not exc.value.quarantined
+    # The replacement serves the next job.
+    assert supervisor.run(_pid_of_worker, ("y",))[1] != first
+    assert supervisor.status()["restarts"] == 1
+
+
+def test_crash_reports_signal(supervisor):
+    with pytest.raises(WorkerFailure) as exc:
+        supervisor.run(_segfault)
+    assert exc.value.reason == "crash"
+    assert "SIGSEGV" in exc.value.detail
+    assert supervisor.run(_pid_of_worker, ("after",))[0] == "after"
+
+
+def test_memory_limit(supervisor):
+    with pytest.raises(WorkerFailure) as exc:
+        supervisor.run(_allocate, (300,), memory_limit=150 * 1024 * 1024)
+    assert exc.value.reason == "memory"
+    assert supervisor.status()["failures"] == {"memory": 1}
+
+
+def test_python_exception_passes_through_without_restart(supervisor, recording):
+    with pytest.raises(ValueError, match="bad container"):
+        supervisor.run(_raise, path=recording)
+    assert supervisor.status()["restarts"] == 0
+    assert supervisor.quarantine.check(recording) is None
+
+
+def test_poison_file_is_quarantined_until_it_changes(supervisor, recording, monkeypatch):
+    monkeypatch.setenv("WHISPER_POISON_STRIKES", "2")
+    for strike in (1, 2):
+        with pytest.raises(WorkerFailure) as exc:
+            supervisor.run(_segfault, path=recording)
+        assert exc.value.strikes == strike
+    assert exc.value.quarantined
+
+    started = time.monotonic()
+    with pytest.raises(WorkerFailure) as exc:
+        supervisor.run(_pid_of_worker, ("never",), path=recording)
+    assert exc.value.reason == "quarantined"
+    assert time.monotonic() - started < 0.5
+    assert [q["path"] for q in supervisor.quarantine.listing()] == [str(recording.resolve())]
+
+    recording.write_bytes(b"\x01" * 128)  # re-exported file: try again
+    assert supervisor.run(_pid_of_worker, ("ok",), path=recording)[0] == "ok"
+
+
+def test_transcribe_routes_through_supervisor(tmp_path, monkeypatch, recording):
+    monkeypatch.setenv("WHISPER_ISOLATION", "process")
+    monkeypatch.setenv("WHISPER_BACKEND", "local")
+    monkeypatch.setenv("WHISPER_SEARCH_DB", str(tmp_path / "search.db"))
+    monkeypatch.setattr(core, "_get_local_backend", lambda: "faster_whisper")
+    monkeypatch.setattr(core, "_local_job_estimate", lambda *a, **k: ("test", 0))
+    calls = []
+
+    class _Fake:
+        def run(self, fn, args, path="", timeout=None, admit=None):
+            calls.append((fn, path, timeout))
+            raise WorkerFailure("timeout", "no result after 9s", str(path), 1)
+
+    monkeypatch.setattr(core, "get_supervisor", lambda warm=None, report=None: _Fake())
+    result = core.transcribe(str(recording), backend="local")
+
+    assert calls and calls[0][0] is core._decode_local
+    assert calls[0][1] == recording
+    assert result["status"] == "error"
+    assert result["failure"] == {
+        "reason": "timeout",
+        "detail": "no result after 9s",
+        "strikes": 1,
+        "quarantined": False,
+    }
+
+
+def test_warm_workers_are_reserved_in_the_governor(tmp_path, monkeypatch):
+    governor = ResourceGovernor(budget_bytes=1000)
+    monkeypatch.setattr(supervisor_mod, "get_governor", lambda: governor)
+    sup = Supervisor(
+        1,
+        quarantine=Quarantine(tmp_path / "quarantine.json"),
+        poll_seconds=0.05,
+        report=_report,
+    )
+    seen = []
+
+    def _admit(loaded):
+        seen.append((loaded, governor.snapshot()["reserved"]))
+        return governor.admit("job", 100, measure=False)
+
+    try:
+        sup.run(_pid_of_worker, ("a",), admit=_admit)
+        assert governor._in_use() == 300  # the worker keeps its model between jobs
+        sup.run(_pid_of_worker, ("b",), admit=_admit)
+        with pytest.raises(WorkerFailure):
+            sup.run(_segfault, admit=_admit)
+        assert governor._in_use() == 0  # the replacement has not warmed up yet
+    finally:
+        sup.shutdown()
+    loaded = [("large-v3", "int8")]
+    assert [seen_loaded for seen_loaded, _ in seen] == [None, loaded, loaded]
+    assert len(seen[1][1]) == 1
+
+
+def test_worker_counters_are_folded_into_server_metrics(supervisor):
+    def _misses():
+        key = ("whisper_cache_requests_total", (("cache", "model"), ("result", "miss")))
+        return get_metrics().counters().get(key, 0.0)
+
+    before = _misses()
+    assert supervisor.run(_count_model_miss) == "decoded"
+    assert supervisor.run(_count_model_miss) == "decoded"
+    assert _misses() == before + 2
+
+
+def test_estimate_uses_the_worker_s_loaded_models(monkeypatch):
+    monkeypatch.setattr(core, "_faster_model", lambda: "large-v3")
+    monkeypatch.setattr(core, "_cascade_model", lambda: "small")
+    monkeypatch.setattr(core, "_faster_whisper_settings", lambda m: {"compute_type": "int8"})
+    monkeypatch.setattr(core, "_faster_whisper_models", {})
+    cold = core._local_job_estimate("faster_whisper", 600.0, cascade=True, loaded=[])[1]
+    key, warm = core._local_job_estimate(
+        "faster_whisper", 600.0, cascade=True, loaded=[("large-v3", "int8"), ("small", "int8")]
+    )
+    assert key.endswith(":warm")
+    assert cold - warm == model_bytes("large-v3", "int8") + model_bytes("small", "int8")
+
+
+def test_memory_limit_is_opt_in(monkeypatch):
+    monkeypatch.setenv("WHISPER_MEMORY_BUDGET_MB", "4096")
+    monkeypatch.delenv("WHISPER_JOB_MEMORY_MB", raising=False)
+    assert _memory_limit_bytes() == 0  # the soft budget is never a kill limit
+    monkeypatch.setenv("WHISPER_JOB_MEMORY_MB", "3000")
+    assert _memory_limit_bytes() == 3000 * 1024 * 1024
+
+
+def test_probe_and_packed_memos_run_in_workers(tmp_path, monkeypatch, recording):
+    monkeypatch.setenv("WHISPER_ISOLATION", "process")
+    monkeypatch.setenv("WHISPER_LANGUAGE_CACHE", str(tmp_path / "languages.json"))
+    monkeypatch.setenv("WHISPER_SEARCH_DB", str(tmp_path / "search.db"))
+    monkeypatch.setattr(core, "_get_local_backend", lambda: "faster_whisper")
+    monkeypatch.setattr(
+        core, "_get_faster_whisper_model", lambda *a: pytest.fail("model loaded in the server")
+    )
+    calls = []
+
+    class _Fake:
+        def run(self, fn, args, path="", timeout=None, admit=None):
+            calls.append((fn, path))
+            with admit([]):
+                if fn is core._probe_language_local:
+                    return {"language": "en", "probability": 0.9}
+                return {
+                    p: core._WhisperResult(text="メモ", segments=[], language="ja")
+                    for p, _ in args[0]
+                }
+
+    monkeypatch.setattr(core, "get_supervisor", lambda warm=None, report=None: _Fake())
+    assert core._resolve_auto_language(recording, "local")[0] == "en"
+    assert calls[0] == (core._probe_language_local, recording)
+
+    memos = []
+    for name in ("a.m4a", "b.m4a"):
+        memos.append(tmp_path / name)
+        memos[-1].write_bytes(b"\x00")
+    monkeypatch.setattr(core, "duration_of", lambda p: 5.0)
+    results, rest = core._transcribe_memos_packed(memos, "", None)
+    assert rest == [] and [r["status"] for r in results] == ["success", "success"]
+    assert calls[1][0] is core.transcribe_packed
+
+
+def test_packed_memos_record_job_metrics(tmp_path, monkeypatch):
+    import lib.scheduler as scheduler
+
+    monkeypatch.setenv("WHISPER_SCHEDULE_STATE", str(tmp_path / "schedule.json"))
+    monkeypatch.setenv("WHISPER_SEARCH_DB", str(tmp_path / "search.db"))
+    monkeypatch.setattr(scheduler, "_state", None)
+    monkeypatch.setattr(core, "_get_local_backend", lambda: "faster_whisper")
+    monkeypatch.setattr(core, "_faster_model", lambda: "packed-test")
+
+    def _decode(backend, fn, args, *rest):
+        time.sleep(0.05)
+        return {p: core._WhisperResult(text="メモ", segments=[], language="ja") for p, _ in args[0]}
+
+    monkeypatch.setattr(core, "_run_local_job", _decode)
+    memos = []
+    for name in ("a.m4a", "b.m4a"):
+        memos.append(tmp_path / name)
+        memos[-1].write_bytes(b"\x00")
+    monkeypatch.setattr(core, "duration_of", lambda p: 5.0)
+
+    key = "local:faster_whisper:packed-test"
+    jobs = ("whisper_jobs_total", (("backend", key), ("status", "success")))
+    audio = ("whisper_audio_seconds_total", (("backend", key),))
+    before = get_metrics().counters()
+    core._transcribe_memos_packed(memos, "", None)
+    after = get_metrics().counters()
+    assert after[jobs] - before.get(jobs, 0.0) == 2
+    assert after[audio] - before.get(audio, 0.0) == 10.0
+    assert scheduler._load()["rtf"][key]["rtf"] > 0
@@ -0,0 +1,191 @@
+"""Tests for lib/tail.py — growing WAV/PCM files with a fake decoder (no model)."""
+
+import struct
+import sys
+import threading
+import time
+import wave
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.core as core
+from lib.storage import load_transcript_json
+from lib.tail import PcmSource, tail_transcribe
+
+RATE = 16000
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_SEARCH_DB", str(tmp_path / "search.db"))
+    monkeypatch.setenv("WHISPER_VOCAB_DIR", str(tmp_path / "vocab"))
+
+
+def _second(i: int, rate: int = RATE, channels: int = 1) -> bytes:
+    """One second of PCM whose samples all carry the second's index."""
+    return (array("h", [i]) * (rate * channels)).tobytes()
+
+
+def _decoder(calls: list):
+    """Segments every 2s of the window, named by the second they start at."""
+
+    def decode(pcm, source, language, prompt):
+        samples = array("h")
+        samples.frombytes(pcm)
+        frames = len(samples) // source.channels
+        seconds = frames / source.rate
+        calls.append(seconds)
+        out = []
+        start = 0.0
+        while start < seconds:
+            end = min(seconds, start + 2.0)
+            first = samples[int(start * source.rate) * source.channels]
+            out.append({"start": start, "end": end, "text": f"t{first}"})
+            start = end
+        return out, "ja"
+
+    return decode
+
+
+def _growing_wav_header() -> bytes:
+    """A WAV header as a recorder leaves it while recording: data size still 0."""
+    return (
+        b"RIFF"
+        + struct.pack("<I", 0)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, RATE, RATE * 2, 2, 16)
+        + b"data"
+        + struct.pack("<I", 0)
+    )
+
+
+def _write_seconds(f, first: int, count: int, delay: float = 0.0) -> None:
+    for i in range(first, first + count):
+        f.write(_second(i))
+        f.flush()
+        if delay:
+            time.sleep(delay)
+
+
+def test_growing_wav_is_decoded_window_by_window(tmp_path):
+    audio = tmp_path / "meeting.wav"
+    calls: list = []
+    live_seen: list = []
+
+    def _on_segments(segs):
+        live = tmp_path / "transcripts" / "meeting.live.txt"
+        live_seen.append(live.read_text(encoding="utf-8"))
+
+    with open(audio, "wb") as f:
+        f.write(_growing_wav_header())
+        _write_seconds(f, 0, 12)
+        writer = threading.Thread(target=_write_seconds, args=(f, 12, 20, 0.01))
+        writer.start()
+        result = tail_transcribe(
+            str(audio),
+            window_seconds=10,
+            idle_seconds=0.3,
+            poll_seconds=0.05,
+            on_segments=_on_segments,
+            decoder=_decoder(calls),
+        )
+        writer.join()
+
+    assert result["status"] == "success", result
+    texts = [s["text"] for s in load_transcript_json(result["output_files"]["json"])["segments"]]
+    # Every second-pair exactly once, in order, across window boundaries.
+    assert texts == [f"t{i}" for i in range(0, 32, 2)]
+    assert all(c == 10 for c in calls[:-1])
+    assert result["tail"]["final_window_seconds"] <= 10
+    assert result["tail"]["audio_seconds"] == 32
+    assert live_seen and live_seen[0].startswith("t0 t2")
+    assert not list((tmp_path / "transcripts").glob("*.live.*"))
+    srt = (tmp_path / "transcripts" / "meeting.srt").read_text(encoding="utf-8")
+    assert "00:00:30,000 --> 00:00:32,000" in srt
+
+
+def test_live_outputs_match_final_format(tmp_path):
+    audio = tmp_path / "memo.wav"
+    with wave.open(str(audio), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        for i in range(6):
+            w.writeframes(_second(i))
+    captured = {}
+    stop = threading.Event()
+
+    def _on_segments(segs):
+        for fmt in ("txt", "srt", "vtt"):
+            p = tmp_path / "transcripts" / f"memo.live.{fmt}"
+            captured[fmt] = p.read_text(encoding="utf-8")
+        stop.set()
+
+    result = tail_transcribe(
+        str(audio),
+        output_formats="txt,srt,vtt",
+        window_seconds=5,
+        idle_seconds=5,
+        poll_seconds=0.05,
+        stop=stop,
+        on_segments=_on_segments,
+        decoder=_decoder([]),
+    )
+    assert result["status"] == "success", result
+    # The live files hold the committed prefix in the same layout as the final files.
+    for fmt in ("txt", "srt", "vtt"):
+        final = (tmp_path / "transcripts" / f"memo.{fmt}").read_text(encoding="utf-8")
+        assert final.startswith(captured[fmt].rstrip("\n"))
+
+
+def test_segment_directory_reads_as_one_stream(tmp_path):
+    segdir = tmp_path / "rec"
+    segdir.mkdir()
+    for n, first in enumerate((0, 7)):
+        with wave.open(str(segdir / f"part{n:03d}.wav"), "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            for i in range(first, first + 7):
+                w.writeframes(_second(i, 8000, 2))
+    (segdir / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    source = PcmSource(segdir)
+    assert source.seconds() == 14
+    assert source.rate == 8000 and source.channels == 2
+    assert len(source.read(6, 8)) == 2 * 8000 * 2 * 2
+
+    result = tail_transcribe(
+        str(segdir), window_seconds=6, idle_seconds=0.1, poll_seconds=0.05, decoder=_decoder([])
+    )
+    assert result["status"] == "success", result
+    assert Path(result["output_files"]["txt"]) == tmp_path / "transcripts" / "rec.txt"
+    texts = [s["text"] for s in load_transcript_json(result["output_files"]["json"])["segments"]]
+    assert texts == [f"t{i}" for i in range(0, 14, 2)]
+
+
+def test_raw_pcm_uses_configured_format(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_TAIL_PCM_RATE", "8000")
+    audio = tmp_path / "stream.pcm"
+    audio.write_bytes(b"".join(_second(i, 8000) for i in range(3)) + b"\x01")  # partial frame
+    assert PcmSource(audio).seconds() == 3
+
+
+def test_header_not_written_yet(tmp_path):
+    audio = tmp_path / "new.wav"
+    audio.write_bytes(b"RIFF")
+    assert PcmSource(audio).seconds() == 0.0
+
+
+def test_live_transcript_does_not_mark_meeting_processed(tmp_path):
+    transcripts = tmp_path / "transcripts"
+    transcripts.mkdir()
+    (transcripts / "meeting.live.txt").write_text("途中", encoding="utf-8")
+    assert not core._has_transcript(transcripts)
+    (transcripts / "meeting.txt").write_text("完了", encoding="utf-8")
+    assert core._has_transcript(transcripts)
@@ -0,0 +1,126 @@
+"""Tests for lib/upload.py and the API upload path in lib/core.py (fake encoder/client)."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import lib.core as core
+import lib.scheduler as scheduler
+import lib.upload as upload
+from lib.api_client import ApiDispatcher
+
+_durations: dict[str, float | None] = {}
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_API_UPLOAD_CACHE", str(tmp_path / "uploads"))
+    monkeypatch.setenv("WHISPER_SCHEDULE_STATE", str(tmp_path / "schedule.json"))
+    monkeypatch.setattr(scheduler, "_state", None)
+    monkeypatch.setattr(upload, "_hash_cache", {})
+    monkeypatch.setattr(upload, "duration_of", lambda q: _durations.get(Path(q).name))
+    _durations.clear()
+
+
+def _fake_encoder(monkeypatch, out_bytes: int):
+    calls = []
+
+    def _encode(src, dst, kbps):
+        calls.append(Path(src).name)
+        dst.write_bytes(b"O" * out_bytes)
+        return "ffmpeg"
+
+    monkeypatch.setattr(upload, "_encode", _encode)
+    return calls
+
+
+def _recording(tmp_path, name: str, size: int, duration: float | None) -> Path:
+    p = tmp_path / name
+    with open(p, "wb") as f:
+        f.truncate(size)  # sparse: only size and contents-hash matter here
+    _durations[name] = duration
+    return p
+
+
+def test_video_recording_is_prepared_once_and_cached(tmp_path, monkeypatch):
+    calls = _fake_encoder(monkeypatch, 90_000)
+    src = _recording(tmp_path, "zoom.mp4", 2_000_000, 30.0)
+
+    first = upload.prepare_upload(src)
+    assert first["method"] == "ffmpeg"
+    assert first["source_bytes"] == 2_000_000 and first["upload_bytes"] == 90_000
+    assert first["path"].suffix == ".ogg"
+
+    copy = _recording(tmp_path, "copy.mp4", 2_000_000, 30.0)
+    second = upload.prepare_upload(copy)  # same contents, other path
+    assert second["method"] == "cached" and second["path"] == first["path"]
+    assert calls == ["zoom.mp4"]
+
+
+def test_compact_source_is_uploaded_as_is(tmp_path, monkeypatch):
+    calls = _fake_encoder(monkeypatch, 10)
+    memo = _recording(tmp_path, "memo.m4a", 50_000, 30.0)  # ~13kbps already
+    info = upload.prepare_upload(memo)
+    assert info["method"] == "original" and info["path"] == memo
+    assert calls == []
+
+
+def test_larger_encode_is_discarded_and_not_retried(tmp_path, monkeypatch):
+    calls = _fake_encoder(monkeypatch, 5_000_000)
+    src = _recording(tmp_path, "odd.mp4", 1_000_000, None)
+    assert upload.prepare_upload(src)["method"] == "original"
+    assert upload.prepare_upload(src)["method"] == "original"
+    assert calls == ["odd.mp4"]
+    assert not list((tmp_path / "uploads").glob("*.ogg"))
+
+
+def test_cache_is_pruned_oldest_first(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_API_UPLOAD_CACHE_MB", str(250_000 / 1024 / 1024))
+    _fake_encoder(monkeypatch, 100_000)
+    for i in range(3):
+        src = _recording(tmp_path, f"r{i}.mp4", 1_000_000 + i, 60.0)
+        upload.prepare_upload(src)
+    assert len(list((tmp_path / "uploads").glob("*.ogg"))) == 2
+
+
+def test_held_upload_is_not_pruned(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_API_UPLOAD_CACHE_MB", str(150_000 / 1024 / 1024))
+    _fake_encoder(monkeypatch, 100_000)
+    with upload.prepared_upload(_recording(tmp_path, "held.mp4", 1_000_000, 60.0)) as held:
+        for i in range(2):  # each prepare prunes to one file, but not the held one
+            upload.prepare_upload(_recording(tmp_path, f"r{i}.mp4", 1_000_001 + i, 60.0))
+        assert held["path"].exists()
+    assert upload._in_flight == {}
+    upload.prepare_upload(_recording(tmp_path, "r9.mp4", 1_000_009, 60.0))
+    assert not held["path"].exists()
+
+
+def test_estimated_upload_bytes(tmp_path, monkeypatch):
+    src = _recording(tmp_path, "long.mp4", 400_000_000, 3600.0)
+    assert upload.estimated_upload_bytes(src) < 25 * 1024 * 1024
+    monkeypatch.setenv("WHISPER_API_PREPARE", "0")
+    assert upload.estimated_upload_bytes(src) == 400_000_000
+
+
+def test_transcribe_api_uploads_prepared_file(tmp_path, monkeypatch):
+    _fake_encoder(monkeypatch, 1234)
+    src = _recording(tmp_path, "zoom.mp4", 1_000_000, 60.0)
+    sent = []
+
+    def _create(**kwargs):
+        sent.append((Path(kwargs["file"].name).suffix, len(kwargs["file"].read())))
+        return SimpleNamespace(text="こんにちは", segments=[], language="ja")
+
+    client = SimpleNamespace(audio=SimpleNamespace(transcriptions=SimpleNamespace(create=_create)))
+    monkeypatch.setattr(core, "get_api_client", lambda: client)
+    monkeypatch.setattr(core, "get_api_dispatcher", lambda: ApiDispatcher(1, 6000, 0))
+
+    result = core._transcribe_api(src, "ja", "")
+    assert sent == [(".ogg", 1234)]
+    assert result.stats["upload"]["source_bytes"] == 1_000_000
+    assert result.stats["upload"]["upload_bytes"] == 1234
+    assert "request_seconds" in result.stats["upload"]
@@ -1,11 +1,21 @@
 """Tests for lib/vocabulary.py — no network or subprocess calls."""
 
 import sys
+import threading
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from lib.vocabulary import get_vocab_dirs, load_vocabulary, vocabulary_add
+import pytest
+
+import lib.vocabulary as vocabulary
+from lib.vocab_store import namespace_of, prompt_terms
+from lib.vocabulary import get_vocab_dirs, load_vocabulary, vocabulary_add, vocabulary_list
+
+
+@pytest.fixture(autouse=True)
+def _vocab_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPER_VOCAB_DB", str(tmp_path / "vocabulary.db"))
 
 
 def test_get_vocab_dirs_default():
@@ -49,3 +59,100 @@ def test_vocabulary_add_deduplication(tmp_path):
     result = vocabulary_add(str(vocab_file), ["termA", "termB"])
     assert result["added"] == 1
     assert result["skipped"] == 1
+
+
+def test_vocabulary_add_dedupes_nfkc(tmp_path):
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("ＡＩ\nウラナイロ", encoding="utf-8")  # no final newline
+    result = vocabulary_add(str(vocab_file), ["AI", "ｳﾗﾅｲﾛ", "モフモフ"])
+    assert result["added_terms"] == ["モフモフ"]
+    assert result["skipped"] == 2
+    assert result["total_terms"] == 3
+    assert vocab_file.read_text(encoding="utf-8").splitlines() == ["ＡＩ", "ウラナイロ", "モフモフ"]
+
+
+def test_add_does_not_reparse_file(tmp_path, monkeypatch):
+    vocab_file = tmp_path / "vocab.txt"
+    vocabulary_add(str(vocab_file), [f"term{i}" for i in range(50)])
+
+    def _no_read(*a, **kw):
+        raise AssertionError("file re-read")
+
+    monkeypatch.setattr(Path, "read_text", _no_read)
+    result = vocabulary_add(str(vocab_file), ["term3", "new"])
+    assert result["added"] == 1 and result["total_terms"] == 51
+
+
+def test_weights_order_prompt(tmp_path):
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("alpha\nbeta\t3\ngamma\n", encoding="utf-8")
+    vocabulary_add(str(vocab_file), [{"term": "delta", "weight": 2}])
+    assert "delta\t2" in vocab_file.read_text(encoding="utf-8")
+    assert load_vocabulary(str(vocab_file)) == "beta, delta, alpha, gamma"
+
+
+def test_namespaces_across_dirs(tmp_path, monkeypatch):
+    base = tmp_path / "base"
+    project = tmp_path / "project"
+    base.mkdir()
+    project.mkdir()
+    (base / "general_vocabulary.txt").write_text("KPI\nOKR\n", encoding="utf-8")
+    (project / "uranairo_vocabulary.txt").write_text("ウラナイロ\nＫＰＩ\n", encoding="utf-8")
+    monkeypatch.setattr(vocabulary, "_DEFAULT_VOCAB_DIR", base)
+
+    assert namespace_of(project / "uranairo_vocabulary.txt") == "uranairo"
+    prompt = load_vocabulary("", ["general", "uranairo"], [project])
+    assert prompt == "KPI, OKR, ウラナイロ"
+    assert prompt_terms(None, ["uranairo"], [base, project]) == ["ウラナイロ", "ＫＰＩ"]
+
+    listing = vocabulary_list([project])
+    assert [(v["namespace"], v["term_count"]) for v in listing["vocabularies"]] == [
+        ("general", 2),
+        ("uranairo", 2),
+    ]
+
+
+def test_index_refreshes_after_hand_edit(tmp_path):
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("one\n", encoding="utf-8")
+    assert load_vocabulary(str(vocab_file)) == "one"
+    vocab_file.write_text("one\ntwo\n", encoding="utf-8")
+    assert load_vocabulary(str(vocab_file)) == "one, two"
+
+
+def test_prompt_falls_back_to_files_without_the_index(tmp_path, monkeypatch):
+    base = tmp_path / "base"
+    base.mkdir()
+    (base / "general_vocabulary.txt").write_text("KPI\nOKR\t2\n", encoding="utf-8")
+    monkeypatch.setattr(vocabulary, "_DEFAULT_VOCAB_DIR", base)
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("alpha\nＫＰＩ\n", encoding="utf-8")
+    expected = load_vocabulary(str(vocab_file), ["general"])
+
+    corrupt = tmp_path / "corrupt.db"
+    corrupt.write_bytes(b"not a sqlite database" * 100)
+    monkeypatch.setenv("WHISPER_VOCAB_DB", str(corrupt))
+    assert load_vocabulary(str(vocab_file), ["general"]) == expected == "OKR, alpha, ＫＰＩ"
+
+    monkeypatch.setenv("WHISPER_VOCAB_DB", str(vocab_file / "unwritable" / "vocabulary.db"))
+    assert load_vocabulary(str(vocab_file), ["general"]) == expected
+
+
+def test_concurrent_adds_write_each_term_once(tmp_path):
+    vocab_file = tmp_path / "vocab.txt"
+    terms = [f"term{i}" for i in range(20)]
+    barrier = threading.Barrier(4)
+    results = []
+
+    def _add():
+        barrier.wait()
+        results.append(vocabulary_add(str(vocab_file), terms))
+
+    threads = [threading.Thread(target=_add) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [r["status"] for r in results] == ["success"] * 4
+    assert sum(r["added"] for r in results) == 20
+    assert vocab_file.read_text(encoding="utf-8").splitlines() == terms